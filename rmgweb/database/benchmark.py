@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+Compare the time taken to generate the reactions and kinetics for a set of
+reactants from the RMG-Py database in this process and in a pool of worker
+processes, and check that both give the same results. For example::
+
+    python rmgweb/database/benchmark.py --processes 8 "C=CC(C)C" "[H]"
+
+Reactants are given as SMILES strings. The database is loaded first, which
+is not included in the timings.
+"""
+
+import os
+import sys
+import time
+
+if __name__ == '__main__':
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    sys.path.insert(0, root)
+    sys.path.append(os.path.join(root, 'rmgweb'))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'rmgweb.settings')
+
+################################################################################
+
+def describeReactions(reactionList):
+    """
+    Return a list of strings describing each of the reactions in
+    `reactionList` and its kinetics, for comparing results.
+    """
+    return ['{0!s} {1} {2} {3!r}'.format(
+        reaction,
+        reaction.__class__.__name__,
+        getattr(reaction, 'estimator', None) or getattr(getattr(reaction, 'depository', None), 'label', None),
+        reaction.kinetics,
+    ) for reaction in reactionList]
+
+def benchmark(smiles, processes, repeats=3, only_families=None):
+    """
+    Generate the reactions for the reactants given as the list of SMILES
+    strings `smiles`, `repeats` times each in this process and in a pool of
+    the given number of worker `processes`. Returns the best serial and
+    parallel times in seconds, and raises an :class:`AssertionError` if the
+    results differ.
+    """
+    from rmgpy.molecule.molecule import Molecule
+    import tools
+    
+    database = tools.loadDatabase('kinetics')
+    tools.settings.DATABASE_WORKER_PROCESSES = processes
+    reactants = [Molecule().fromSMILES(s) for s in smiles]
+    
+    serialTimes = []; parallelTimes = []
+    for i in range(repeats):
+        t0 = time.time()
+        serial = tools.generateReactionsFromDatabase(database, reactants, only_families=only_families, parallel=False)
+        serialTimes.append(time.time() - t0)
+        # Create the pool first so that forking it is not included
+        tools.getWorkerPool()
+        t0 = time.time()
+        parallel = tools.generateReactionsFromDatabase(database, reactants, only_families=only_families, parallel=True)
+        parallelTimes.append(time.time() - t0)
+        assert describeReactions(serial) == describeReactions(parallel), 'Parallel results differ from serial results'
+    return min(serialTimes), min(parallelTimes), len(serial)
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('smiles', nargs='+', help='the SMILES strings of the reactants')
+    parser.add_argument('-p', '--processes', type=int, default=None, help='the number of worker processes (default: one per core)')
+    parser.add_argument('-r', '--repeats', type=int, default=3, help='the number of times to generate the reactions')
+    parser.add_argument('-f', '--family', action='append', dest='families', help='only use the given family (may be repeated)')
+    args = parser.parse_args()
+    
+    import multiprocessing
+    processes = args.processes or multiprocessing.cpu_count()
+    serialTime, parallelTime, count = benchmark(args.smiles, processes, args.repeats, args.families)
+    print 'Generated {0:d} reactions for {1}'.format(count, ' + '.join(args.smiles))
+    print 'Serial:   {0:.2f} s'.format(serialTime)
+    print 'Parallel: {0:.2f} s ({1:d} processes, {2:.1f}x speedup)'.format(parallelTime, processes, serialTime / parallelTime if parallelTime else 0)
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+This module contains a simple least-recently-used cache for results computed
+from the RMG database, which are discarded when the database is reloaded.
+"""
+
+import threading
+
+from collections import OrderedDict
+
+################################################################################
+
+class LRUCache(object):
+    """
+    A thread-safe dictionary-like cache holding at most `maxsize` units of
+    values, discarding the least recently used values first. The size of each
+    value is given by the function `getsize`, or is 1 if that is not given.
+    If a function `generation` is given, it should return the current reload
+    generation of the data the values were computed from; the whole cache is
+    cleared whenever this changes. The attributes are:
+
+    =============== ============================================================
+    Attribute       Description
+    =============== ============================================================
+    `name`          A name describing the cached values
+    `maxsize`       The maximum total size of the cached values
+    `hits`          The number of lookups that found a value
+    `misses`        The number of lookups that did not find a value
+    `evictions`     The number of values discarded to make room for others
+    =============== ============================================================
+    
+    """
+
+    def __init__(self, name, maxsize=1000, getsize=None, generation=None):
+        self.name = name
+        self.maxsize = maxsize
+        self.getsize = getsize
+        self.generation = generation
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        self._items = OrderedDict()
+        self._size = 0
+        self._generation = generation() if generation else None
+
+    def __len__(self):
+        return len(self._items)
+
+    def _check(self):
+        """
+        Clear the cache if the data it was computed from has been reloaded.
+        Must be called with the lock held.
+        """
+        if self.generation is not None:
+            generation = self.generation()
+            if generation != self._generation:
+                self._items.clear()
+                self._size = 0
+                self._generation = generation
+
+    def getGeneration(self):
+        """
+        Return the generation of the data the values should be computed from,
+        to pass to :meth:`set` once the value has been computed.
+        """
+        return self.generation() if self.generation else None
+
+    def get(self, key, default=None):
+        """
+        Return the value cached for `key`, or `default` if there is none.
+        """
+        with self._lock:
+            self._check()
+            try:
+                size, value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # Move it to the most recently used end
+            self._items[key] = (size, value)
+            self.hits += 1
+            return value
+
+    def peek(self, key, default=None):
+        """
+        Return the value cached for `key`, or `default` if there is none,
+        without counting the lookup or marking the value as recently used.
+        """
+        with self._lock:
+            self._check()
+            item = self._items.get(key)
+            return item[1] if item is not None else default
+
+    def set(self, key, value, generation=None):
+        """
+        Cache `value` for `key`. If a `generation` is given and the data has
+        been reloaded since (i.e. the value may be stale), it is not cached.
+        """
+        with self._lock:
+            self._check()
+            if generation is not None and generation != self._generation:
+                return
+            size = self.getsize(value) if self.getsize else 1
+            if key in self._items:
+                self._size -= self._items.pop(key)[0]
+            if size > self.maxsize:
+                return
+            self._items[key] = (size, value)
+            self._size += size
+            while self._size > self.maxsize:
+                oldSize, oldValue = self._items.popitem(last=False)[1]
+                self._size -= oldSize
+                self.evictions += 1
+
+    def remove(self, key):
+        """
+        Discard the value cached for `key`, if any.
+        """
+        with self._lock:
+            if key in self._items:
+                self._size -= self._items.pop(key)[0]
+
+    def clear(self):
+        """
+        Discard all of the cached values.
+        """
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def getStatistics(self):
+        """
+        Return a dictionary of statistics about the use of the cache.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._items),
+                'size': self._size,
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hitRate': float(self.hits) / lookups if lookups else None,
+            }
+
+# All of the caches created, so that their statistics can be reported
+_caches = []
+
+def createCache(name, maxsize=1000, getsize=None, generation=None):
+    """
+    Create and return a new :class:`LRUCache` whose statistics are reported by
+    :func:`getCacheStatistics`.
+    """
+    cache = LRUCache(name, maxsize, getsize, generation)
+    _caches.append(cache)
+    return cache
+
+def getCacheStatistics():
+    """
+    Return a list of the statistics of every cache created by
+    :func:`createCache`.
+    """
+    return [cache.getStatistics() for cache in _caches]
@@ -0,0 +1,219 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+This module records how long it takes to load each part of the RMG database,
+how much memory that uses, and how many entries it contains, so that we can
+see which files dominate the load time and notice when that changes.
+
+Calling :func:`install` wraps the section loading methods of
+:class:`RMGDatabase`, :class:`ThermoDatabase` and :class:`KineticsDatabase`
+and the ``load()`` method of every database class, so that each call records
+the wall time, the change in resident memory (the only measure of allocated
+memory available without tracemalloc), and the number of entries loaded.
+"""
+
+import functools
+import os
+import resource
+import threading
+import time
+
+import settings
+
+from rmgpy.data.base import Database
+from rmgpy.data.thermo import ThermoDatabase
+from rmgpy.data.kinetics import KineticsDatabase
+from rmgpy.data.rmg import RMGDatabase
+
+################################################################################
+
+# The most recent record for each file or directory loaded, by path
+_records = {}
+_lock = threading.Lock()
+# The paths being loaded by each thread, so that we can tell nested loads apart
+_stack = threading.local()
+
+_pageSize = resource.getpagesize()
+
+def getResidentMemory():
+    """
+    Return the resident memory of this process in kB.
+    """
+    try:
+        f = open('/proc/self/statm')
+        try:
+            return int(f.read().split()[1]) * _pageSize / 1024
+        finally:
+            f.close()
+    except (IOError, ValueError, IndexError):
+        # Not on Linux, so fall back to the peak resident memory
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def countEntries(obj):
+    """
+    Return the total number of entries in the given part of the database,
+    which may be a single :class:`Database`, a family, a whole thermo or
+    kinetics database, or a dictionary or list of any of these.
+    """
+    if obj is None:
+        return 0
+    elif isinstance(obj, dict):
+        return sum([countEntries(value) for value in obj.values()])
+    elif isinstance(obj, (list, tuple)):
+        return sum([countEntries(value) for value in obj])
+    count = 0
+    if isinstance(obj, Database):
+        count += len(obj.entries)
+    for attr in ['groups', 'rules', 'depositories', 'depository', 'libraries', 'families', 'forbiddenStructures']:
+        value = getattr(obj, attr, None)
+        if value is not None and value is not obj:
+            count += countEntries(value)
+    return count
+
+def getRelativePath(path):
+    """
+    Return the given `path` relative to the RMG database directory.
+    """
+    return os.path.relpath(path, settings.DATABASE_PATH)
+
+def profile(kind, path, obj, function, *args, **kwargs):
+    """
+    Call `function` with the given arguments to load the part of the
+    database of the given `kind` from the file or directory at `path` into
+    `obj`, recording how long that takes, the change in memory use, and the
+    number of entries in `obj` afterwards (or, if `obj` is ``None``, in the
+    object returned). Loads of a path that is already being loaded further
+    up the call stack are not recorded separately.
+    """
+    stack = getattr(_stack, 'paths', None)
+    if stack is None:
+        stack = _stack.paths = []
+    if path in stack:
+        return function(*args, **kwargs)
+    stack.append(path)
+    memory0 = getResidentMemory()
+    time0 = time.time()
+    try:
+        result = function(*args, **kwargs)
+    finally:
+        stack.pop()
+    seconds = time.time() - time0
+    memory = getResidentMemory() - memory0
+    record = {
+        'kind': kind,
+        'path': getRelativePath(path),
+        'depth': len(stack),
+        'seconds': seconds,
+        'memory': memory,
+        'entries': countEntries(obj if obj is not None else result),
+        'loaded': time0,
+        'pid': os.getpid(),
+    }
+    with _lock:
+        _records[record['path']] = record
+    return result
+
+def instrument(cls, name, kind=None):
+    """
+    Replace the method `name` of the class `cls`, which takes the path to
+    load from as its first argument, with one that records its cost. The
+    `kind` of the record defaults to the name of the class.
+    """
+    method = cls.__dict__.get(name)
+    if method is None or getattr(method, 'profiled', False):
+        return
+    kind = kind or cls.__name__
+    @functools.wraps(method)
+    def wrapper(self, path, *args, **kwargs):
+        return profile(kind, path, self, method, self, path, *args, **kwargs)
+    wrapper.profiled = True
+    try:
+        setattr(cls, name, wrapper)
+    except TypeError:
+        # An extension type, which cannot be modified
+        pass
+
+def getSubclasses(cls):
+    """
+    Return a list of `cls` and all of its subclasses, at any depth.
+    """
+    classes = [cls]
+    for subclass in cls.__subclasses__():
+        classes.extend([c for c in getSubclasses(subclass) if c not in classes])
+    return classes
+
+def install():
+    """
+    Start recording the cost of loading each part of the database.
+    """
+    instrument(RMGDatabase, 'loadForbiddenStructures', 'forbidden structures')
+    instrument(ThermoDatabase, 'loadDepository', 'thermo depository')
+    instrument(ThermoDatabase, 'loadLibraries', 'thermo libraries')
+    instrument(ThermoDatabase, 'loadGroups', 'thermo groups')
+    instrument(KineticsDatabase, 'loadLibraries', 'kinetics libraries')
+    instrument(KineticsDatabase, 'loadFamilies', 'kinetics families')
+    for cls in getSubclasses(Database):
+        instrument(cls, 'load')
+
+def getRecords():
+    """
+    Return a list of the most recent record for each file or directory
+    loaded, most expensive first. Each record is a dictionary giving the
+    `kind` and `path` (relative to the database directory) of what was
+    loaded, its `depth` in the nesting of loads, the wall time in `seconds`,
+    the change in resident `memory` in kB, the number of `entries`, the time
+    it was `loaded` (in seconds since the epoch), and the `pid` of the
+    process that loaded it.
+    """
+    with _lock:
+        records = [dict(record) for record in _records.values()]
+    records.sort(key=lambda record: -record['seconds'])
+    return records
+
+def takeRecords():
+    """
+    Return a list of the records made so far in this process, and forget
+    them. This is used to send the records made by the worker processes of
+    a database load pool back to the process that started the pool.
+    """
+    with _lock:
+        records = _records.values()
+        _records.clear()
+    return records
+
+def addRecords(records):
+    """
+    Add the given `records`, made in another process, to those of this
+    process.
+    """
+    with _lock:
+        for record in records:
+            _records[record['path']] = record
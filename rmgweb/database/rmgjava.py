@@ -0,0 +1,340 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+This module is the client for the RMG-Java PopulateReactions server, which
+estimates the kinetics of the reactions of a set of reactants. A request is
+the input file of a PopulateReactions job, and the response is the species
+dictionary and list of reactions that the job would output.
+
+The server closes the connection after sending each response, so each query
+needs a connection of its own. At most ``settings.RMG_JAVA_MAX_CONNECTIONS``
+queries are sent by each process at once, so that a burst of requests can't
+swamp the server; the others wait their turn. A query can also be made in a
+background thread (see :func:`queryInBackground`), so that it runs while the
+website does other work.
+
+The parsed responses are cached, in memory and on disk under
+``settings.DATABASE_CACHE_PATH``, by a key identifying the request (normally
+the request itself) and ``settings.RMG_JAVA_DATABASE_VERSION``, so that
+repeat searches don't query the server at all. Cached responses expire after
+``settings.RMG_JAVA_CACHE_TIMEOUT`` seconds, and are all discarded by
+:func:`flushCache` (e.g. after upgrading RMG-Java or its database).
+"""
+
+import cPickle
+import hashlib
+import os
+import socket
+import sys
+import threading
+import time
+
+import settings
+from cache import createCache
+
+################################################################################
+
+# Limits the number of queries this process sends to the server at once
+_semaphore = threading.BoundedSemaphore(getattr(settings, 'RMG_JAVA_MAX_CONNECTIONS', 4))
+
+def query(request):
+    """
+    Send the given `request` to the RMG-Java server and return its response,
+    or ``None`` if the server could not be reached or did not respond in
+    time. The host and port of the server, the timeouts for connecting and
+    for each read, and the size of the reads are taken from settings.
+    """
+    host = getattr(settings, 'RMG_JAVA_HOST', 'localhost')
+    port = getattr(settings, 'RMG_JAVA_PORT', 5000)
+    bufferSize = getattr(settings, 'RMG_JAVA_BUFFER_SIZE', 65536)
+    
+    with _semaphore:
+        try:
+            client_socket = socket.create_connection((host, port), getattr(settings, 'RMG_JAVA_CONNECT_TIMEOUT', 10))
+        except IOError:
+            print >> sys.stderr, 'Unable to query RMG-Java for kinetics. (Is the RMG-Java server running?)'
+            sys.stderr.flush()
+            return None
+        try:
+            client_socket.settimeout(getattr(settings, 'RMG_JAVA_TIMEOUT', 10))
+            print "SENDING REQUEST FOR RMG-JAVA SEARCH TO SERVER"
+            client_socket.sendall(request)
+            chunks = []
+            chunk = client_socket.recv(bufferSize)
+            while chunk:
+                chunks.append(chunk)
+                chunk = client_socket.recv(bufferSize)
+        except IOError, e:
+            print >> sys.stderr, 'Unable to query RMG-Java for kinetics: {0}'.format(e)
+            sys.stderr.flush()
+            return None
+        finally:
+            client_socket.close()
+    print "FINISHED REQUEST. CLOSED CONNECTION TO SERVER"
+    return ''.join(chunks)
+
+def parseSpecies(species):
+    """
+    Return the name and adjacency list of the species given in the string
+    `species` from the species dictionary of an RMG-Java response.
+    """
+    lines = species.split("\n")
+    species_name = lines[0]
+    adjlist = "\n".join(lines[1:])
+    return species_name, adjlist
+
+def parseResponse(response):
+    """
+    Return the species dictionary, as a list of (name, adjacency list) pairs,
+    and the list of reaction lines in the given `response` from the RMG-Java
+    server, or ``None`` if it can't be parsed.
+    """
+    try:
+        # Split species dictionary from reactions list
+        response = response.split("\n\n\n")
+        species_list = response[0].split("\n\n")
+        reactions = response[1].split("\n\n")[1]
+    except IndexError:
+        print >> sys.stderr, 'Unable to parse the response from RMG-Java.'
+        sys.stderr.flush()
+        return None
+    # split species into adjacency lists with names, and reactions into
+    # single lines
+    return [parseSpecies(item) for item in species_list], reactions.split("\n")
+
+################################################################################
+
+# The most recently used parsed responses, as (time, response) pairs by key
+responseCache = createCache('rmgjava', getattr(settings, 'RMG_JAVA_CACHE_SIZE', 1000))
+
+def getCachePath():
+    """
+    Return the directory in which the parsed responses are saved, or
+    ``None`` if they are not saved to disk.
+    """
+    cachePath = getattr(settings, 'DATABASE_CACHE_PATH', None)
+    if not cachePath:
+        return None
+    return os.path.join(cachePath, 'rmgjava')
+
+def getCacheFile(key):
+    """
+    Return the name of the file in which the parsed response for the given
+    `key` is saved, which also depends on the version of the RMG-Java
+    database.
+    """
+    version = getattr(settings, 'RMG_JAVA_DATABASE_VERSION', '')
+    return '{0}.pkl'.format(hashlib.sha1(repr((version, key))).hexdigest())
+
+def getFlushTime():
+    """
+    Return the time (in seconds since the epoch) at which the cache was last
+    flushed by any process, or 0 if never.
+    """
+    cachePath = getCachePath()
+    try:
+        return os.path.getmtime(os.path.join(cachePath, 'flushed')) if cachePath else 0
+    except OSError:
+        return 0
+
+def getCachedResponse(key):
+    """
+    Return the parsed response cached for the given `key`, or ``None`` if
+    there is none that is still valid.
+    """
+    timeout = getattr(settings, 'RMG_JAVA_CACHE_TIMEOUT', 7 * 24 * 3600)
+    oldest = max(time.time() - timeout, getFlushTime())
+    version = getattr(settings, 'RMG_JAVA_DATABASE_VERSION', '')
+    
+    value = responseCache.get((version, key))
+    if value is not None:
+        if value[0] >= oldest:
+            return value[1]
+        responseCache.remove((version, key))
+    
+    cachePath = getCachePath()
+    if cachePath is None:
+        return None
+    path = os.path.join(cachePath, getCacheFile(key))
+    try:
+        f = open(path, 'rb')
+        try:
+            saved, key0, response = cPickle.load(f)
+        finally:
+            f.close()
+    except IOError:
+        return None
+    except Exception, e:
+        print >> sys.stderr, 'Unable to load cached RMG-Java response {0}: {1}'.format(path, e)
+        sys.stderr.flush()
+        return None
+    if key0 != (version, key) or saved < oldest:
+        return None
+    responseCache.set((version, key), (saved, response))
+    return response
+
+def setCachedResponse(key, response):
+    """
+    Cache the given parsed `response` for the given `key`, in memory and on
+    disk. If there are then more than ``settings.RMG_JAVA_DISK_CACHE_SIZE``
+    responses on disk, the oldest are removed.
+    """
+    saved = time.time()
+    version = getattr(settings, 'RMG_JAVA_DATABASE_VERSION', '')
+    responseCache.set((version, key), (saved, response))
+    
+    cachePath = getCachePath()
+    if cachePath is None:
+        return
+    path = os.path.join(cachePath, getCacheFile(key))
+    tempPath = '{0}.{1:d}.{2:d}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+    try:
+        if not os.path.isdir(cachePath):
+            os.makedirs(cachePath)
+        f = open(tempPath, 'wb')
+        try:
+            cPickle.dump((saved, (version, key), response), f, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+        os.rename(tempPath, path)
+    except Exception, e:
+        print >> sys.stderr, 'Unable to save RMG-Java response {0}: {1}'.format(path, e)
+        sys.stderr.flush()
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        return
+    
+    # Remove the oldest responses if there are too many
+    maxsize = getattr(settings, 'RMG_JAVA_DISK_CACHE_SIZE', 10000)
+    names = [name for name in os.listdir(cachePath) if name.endswith('.pkl')]
+    if len(names) > maxsize:
+        paths = []
+        for name in names:
+            try:
+                paths.append((os.path.getmtime(os.path.join(cachePath, name)), name))
+            except OSError:
+                pass
+        paths.sort()
+        for mtime, name in paths[:len(paths) - maxsize]:
+            try:
+                os.remove(os.path.join(cachePath, name))
+            except OSError:
+                pass
+
+def flushCache():
+    """
+    Discard every cached response, in memory and on disk, and make the other
+    processes discard the ones they hold in memory. Returns the number of
+    responses removed from disk.
+    """
+    responseCache.clear()
+    cachePath = getCachePath()
+    if cachePath is None:
+        return 0
+    if not os.path.isdir(cachePath):
+        os.makedirs(cachePath)
+    # Mark the time of the flush for the other processes
+    f = open(os.path.join(cachePath, 'flushed'), 'w')
+    f.close()
+    count = 0
+    for name in os.listdir(cachePath):
+        if name.endswith('.pkl'):
+            try:
+                os.remove(os.path.join(cachePath, name))
+                count += 1
+            except OSError:
+                pass
+    return count
+
+def getCacheSize():
+    """
+    Return the number of responses cached on disk.
+    """
+    cachePath = getCachePath()
+    if cachePath is None or not os.path.isdir(cachePath):
+        return 0
+    return len([name for name in os.listdir(cachePath) if name.endswith('.pkl')])
+
+################################################################################
+
+def getResponse(request, key=None):
+    """
+    Return the parsed response of the RMG-Java server to the given `request`,
+    as :func:`parseResponse` returns, or ``None`` if it could not be found.
+    If a `key` identifying the request is given, a cached response is used
+    if there is one, and the response is cached otherwise. The key must
+    identify the request exactly, so the request itself is the safest key.
+    """
+    if key is not None:
+        response = getCachedResponse(key)
+        if response is not None:
+            return response
+    response = query(request)
+    if not response:
+        return None
+    response = parseResponse(response)
+    if response is not None and key is not None:
+        setCachedResponse(key, response)
+    return response
+
+class BackgroundQuery(object):
+    """
+    A query of the RMG-Java server made in a background thread, unless its
+    response is cached. Use :meth:`getResponse` to wait for the response.
+    """
+
+    def __init__(self, request, key=None):
+        self.response = getCachedResponse(key) if key is not None else None
+        self._thread = None
+        if self.response is None:
+            self._thread = threading.Thread(target=self._run, args=(request, key))
+            self._thread.setDaemon(True)
+            self._thread.start()
+
+    def _run(self, request, key):
+        self.response = getResponse(request, key)
+
+    def getResponse(self):
+        """
+        Wait for the query to finish, and return the parsed response as
+        :func:`getResponse` does.
+        """
+        if self._thread is not None:
+            self._thread.join()
+        return self.response
+
+def queryInBackground(request, key=None):
+    """
+    Start getting the parsed response to the given `request` from the
+    RMG-Java server in a background thread (unless it is cached for the
+    given `key`), and return the :class:`BackgroundQuery` for it.
+    """
+    return BackgroundQuery(request, key)
@@ -29,14 +29,27 @@
 ################################################################################
 
 """
-This file demonstrates two different styles of tests (one doctest and one
-unittest). These will both pass when you run "manage.py test".
-
-Replace these with more appropriate tests for your application.
+Unit tests for the parts of the database app that do not need the RMG
+database to be loaded. Run them with "manage.py test database".
 """
 
 from django.test import TestCase
 
+import numpy
+import os
+import shutil
+import tempfile
+
+from rmgpy.thermo import ThermoData, Wilhoit, NASA, NASAPolynomial
+from rmgpy.species import Species
+from rmgpy.reaction import Reaction
+from rmgpy.kinetics import Arrhenius
+
+from rmgweb.main.tools import evaluateThermoData, evaluateWilhoit, evaluateNASA, evaluateThermo
+from cache import LRUCache
+import watcher
+from tools import getReactionKey, ReactionIndex, deduplicateReactions, fitReverseArrheniusKinetics
+
 class SimpleTest(TestCase):
     def test_basic_addition(self):
         """
@@ -51,3 +64,315 @@ Another way to test that 1 + 1 is equal to 2.
 True
 """}
 
+################################################################################
+
+class LRUCacheTest(TestCase):
+    """
+    Tests of the :class:`LRUCache` class.
+    """
+
+    def setUp(self):
+        self.generation = 0
+        self.cache = LRUCache('test', maxsize=3, generation=lambda: self.generation)
+
+    def test_get_set(self):
+        """
+        Tests that cached values are returned, and lookups are counted.
+        """
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.cache.get('a', 0), 0)
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.peek('a'), 1)
+        self.assertEqual(self.cache.hits, 1)
+        self.assertEqual(self.cache.misses, 2)
+
+    def test_evict_least_recently_used(self):
+        """
+        Tests that the least recently used value is discarded first.
+        """
+        for key in 'abc':
+            self.cache.set(key, key)
+        self.cache.get('a')
+        self.cache.peek('b')
+        self.cache.set('d', 'd')
+        self.assertEqual(self.cache.peek('b'), None)
+        self.assertEqual(sorted(self.cache._items.keys()), ['a', 'c', 'd'])
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_size(self):
+        """
+        Tests that values are bounded by their total size, and that values
+        larger than the cache are not cached at all.
+        """
+        cache = LRUCache('test', maxsize=5, getsize=len)
+        cache.set('a', 'xx')
+        cache.set('b', 'xxx')
+        cache.set('c', 'x')
+        self.assertEqual(cache.peek('a'), None)
+        self.assertEqual(cache.getStatistics()['size'], 4)
+        cache.set('d', 'xxxxxx')
+        self.assertEqual(cache.peek('d'), None)
+        self.assertEqual(len(cache), 2)
+        cache.remove('b')
+        self.assertEqual(cache.getStatistics()['size'], 1)
+
+    def test_generation(self):
+        """
+        Tests that the cache is cleared when the generation changes, and that
+        values computed from an older generation are not cached.
+        """
+        self.cache.set('a', 1)
+        generation = self.cache.getGeneration()
+        self.generation += 1
+        self.assertEqual(self.cache.get('a'), None)
+        self.cache.set('a', 2, generation)
+        self.assertEqual(self.cache.get('a'), None)
+        self.cache.set('a', 3, self.cache.getGeneration())
+        self.assertEqual(self.cache.get('a'), 3)
+
+################################################################################
+
+class EvaluateThermoTest(TestCase):
+    """
+    Tests that the vectorized thermodynamics models agree with the methods of
+    the models themselves.
+    """
+
+    def setUp(self):
+        self.Tdata = numpy.arange(300., 3000., 37.)
+        self.thermoData = ThermoData(
+            Tdata = ([300,400,500,600,800,1000,1500],"K"),
+            Cpdata = ([12.7,15.5,18.1,20.3,23.9,26.6,31.0],"cal/(mol*K)"),
+            H298 = (-20.1,"kcal/mol"),
+            S298 = (54.8,"cal/(mol*K)"),
+        )
+        self.wilhoit = Wilhoit(
+            Cp0 = (33.2579,"J/(mol*K)"),
+            CpInf = (232.805,"J/(mol*K)"),
+            a0 = -0.280186,
+            a1 = -2.93963,
+            a2 = 5.76851,
+            a3 = -2.92648,
+            B = (487.534,"K"),
+            H0 = (-96.1913,"kJ/mol"),
+            S0 = (-86.3645,"J/(mol*K)"),
+        )
+        self.nasa = NASA(
+            polynomials = [
+                NASAPolynomial(coeffs=[4.30647,-0.00418659,4.97143e-05,-5.99127e-08,2.30506e-11,-11522.9,2.86734], Tmin=(200,"K"), Tmax=(1000,"K")),
+                NASAPolynomial(coeffs=[1.95469,0.0173979,-8.0533e-06,1.78002e-09,-1.5355e-13,-11462.4,13.5978], Tmin=(1000,"K"), Tmax=(6000,"K")),
+            ],
+            Tmin = (200,"K"),
+            Tmax = (6000,"K"),
+        )
+
+    def checkModel(self, thermo, curves):
+        """
+        Check the arrays of heat capacity, enthalpy and entropy `curves` of
+        the model `thermo` at each of the test temperatures.
+        """
+        for values, method in zip(curves, [thermo.getHeatCapacity, thermo.getEnthalpy, thermo.getEntropy]):
+            for T, value in zip(self.Tdata, values):
+                exact = method(T)
+                self.assertAlmostEqual(value / max(abs(exact), 1.0), exact / max(abs(exact), 1.0), 6)
+
+    def test_thermoData(self):
+        """
+        Tests evaluateThermoData() against the methods of ThermoData.
+        """
+        self.checkModel(self.thermoData, evaluateThermoData(self.thermoData, self.Tdata))
+
+    def test_wilhoit(self):
+        """
+        Tests evaluateWilhoit() against the methods of Wilhoit.
+        """
+        self.checkModel(self.wilhoit, evaluateWilhoit(self.wilhoit, self.Tdata))
+
+    def test_nasa(self):
+        """
+        Tests evaluateNASA() against the methods of NASA.
+        """
+        self.checkModel(self.nasa, evaluateNASA(self.nasa, self.Tdata))
+
+    def test_evaluateThermo(self):
+        """
+        Tests that evaluateThermo() also returns the Gibbs free energy.
+        """
+        for thermo in [self.thermoData, self.wilhoit, self.nasa]:
+            Cpdata, Hdata, Sdata, Gdata = evaluateThermo(thermo, self.Tdata)
+            self.checkModel(thermo, (Cpdata, Hdata, Sdata))
+            for T, G in zip(self.Tdata, Gdata):
+                self.assertAlmostEqual(G / 1000., thermo.getFreeEnergy(T) / 1000., 3)
+
+################################################################################
+
+class ReactionIndexTest(TestCase):
+    """
+    Tests of finding isomorphic reactions by key.
+    """
+
+    def makeReaction(self, reactants, products):
+        """
+        Return a new reaction of the given lists of `reactants` and
+        `products` SMILES, with new species for each.
+        """
+        return Reaction(
+            reactants = [Species(label=smiles).fromSMILES(smiles) for smiles in reactants],
+            products = [Species(label=smiles).fromSMILES(smiles) for smiles in products],
+        )
+
+    def test_getReactionKey(self):
+        """
+        Tests that the key of a reaction ignores the order of its species and
+        its direction, but not its species.
+        """
+        key = getReactionKey(self.makeReaction(['CC', '[OH]'], ['[CH2]C', 'O']))
+        self.assertEqual(getReactionKey(self.makeReaction(['[OH]', 'CC'], ['O', '[CH2]C'])), key)
+        self.assertEqual(getReactionKey(self.makeReaction(['O', '[CH2]C'], ['CC', '[OH]'])), key)
+        self.assertNotEqual(getReactionKey(self.makeReaction(['C', '[OH]'], ['[CH3]', 'O'])), key)
+
+    def test_find(self):
+        """
+        Tests that a reaction index finds isomorphic reactions, in either
+        direction, and only those.
+        """
+        reaction1 = self.makeReaction(['CC', '[OH]'], ['[CH2]C', 'O'])
+        reaction2 = self.makeReaction(['C', '[OH]'], ['[CH3]', 'O'])
+        index = ReactionIndex([(reaction1, 1), (reaction2, 2)])
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index.find(self.makeReaction(['O', '[CH2]C'], ['[OH]', 'CC']))[1], 1)
+        self.assertEqual(index.find(self.makeReaction(['[OH]', 'C'], ['O', '[CH3]']))[1], 2)
+        self.assertEqual(index.find(self.makeReaction(['CC'], ['[CH3]', '[CH3]'])), None)
+
+    def test_add_unique(self):
+        """
+        Tests that adding a unique reaction returns the isomorphic reaction
+        already in the index instead of adding it again.
+        """
+        index = ReactionIndex()
+        self.assertEqual(index.add(self.makeReaction(['CC'], ['[CH3]', '[CH3]']), 1, unique=True), None)
+        self.assertEqual(index.add(self.makeReaction(['[CH3]', '[CH3]'], ['CC']), 2, unique=True)[1], 1)
+        self.assertEqual(len(index), 1)
+        index.add(self.makeReaction(['[CH3]', '[CH3]'], ['CC']), 3)
+        self.assertEqual(len(index), 2)
+
+    def test_deduplicateReactions(self):
+        """
+        Tests that the first of each set of isomorphic reactions is kept, in
+        order, and the reactions in each set are counted.
+        """
+        reactionList = [
+            self.makeReaction(['CC', '[OH]'], ['[CH2]C', 'O']),
+            self.makeReaction(['CC'], ['[CH3]', '[CH3]']),
+            self.makeReaction(['O', '[CH2]C'], ['CC', '[OH]']),
+            self.makeReaction(['C', '[OH]'], ['[CH3]', 'O']),
+            self.makeReaction(['[OH]', 'CC'], ['O', '[CH2]C']),
+        ]
+        uniqueReactionList, uniqueReactionCount = deduplicateReactions(reactionList)
+        self.assertEqual(map(id, uniqueReactionList), map(id, [reactionList[0], reactionList[1], reactionList[3]]))
+        self.assertEqual(uniqueReactionCount, [3, 1, 1])
+
+################################################################################
+
+class ReverseKineticsTest(TestCase):
+    """
+    Tests that the vectorized fit of the reverse kinetics agrees with the
+    reactions themselves.
+    """
+
+    def makeSpecies(self, label, Cpdata, H298, S298):
+        """
+        Return a new species with the given `label` and thermo.
+        """
+        return Species(label=label, thermo=ThermoData(
+            Tdata = ([300,400,500,600,800,1000,1500],"K"),
+            Cpdata = (Cpdata,"cal/(mol*K)"),
+            H298 = (H298,"kcal/mol"),
+            S298 = (S298,"cal/(mol*K)"),
+        ))
+
+    def test_fitReverseArrheniusKinetics(self):
+        """
+        Tests that the reverse rate coefficients of reactions with one and
+        with two products match those from generateReverseRateCoefficient().
+        """
+        CH4 = self.makeSpecies('CH4', [8.5,9.8,11.1,12.5,14.8,16.8,20.6], -17.9, 44.5)
+        OH = self.makeSpecies('OH', [7.2,7.1,7.1,7.1,7.2,7.3,7.7], 8.9, 43.9)
+        CH3 = self.makeSpecies('CH3', [9.2,10.0,10.8,11.5,12.9,14.0,16.0], 35.1, 46.4)
+        H2O = self.makeSpecies('H2O', [8.0,8.2,8.4,8.6,9.1,9.6,10.8], -57.8, 45.1)
+        C2H6 = self.makeSpecies('C2H6', [12.6,15.7,18.7,21.3,25.8,29.3,35.0], -20.0, 54.8)
+        reactionList = [
+            Reaction(reactants=[CH4, OH], products=[CH3, H2O], kinetics=Arrhenius(
+                A=(1.0e6,"cm^3/(mol*s)"), n=2.0, Ea=(10.0,"kJ/mol"), T0=(1,"K"))),
+            Reaction(reactants=[CH3, CH3], products=[C2H6], kinetics=Arrhenius(
+                A=(8.0e12,"cm^3/(mol*s)"), n=-0.5, Ea=(0.5,"kJ/mol"), T0=(1,"K"))),
+        ]
+        reverseKineticsList = fitReverseArrheniusKinetics(reactionList)
+        self.assertEqual(len(reverseKineticsList), 2)
+        for reaction, kr in zip(reactionList, reverseKineticsList):
+            exact = reaction.generateReverseRateCoefficient()
+            for T in [400., 800., 1200., 1600.]:
+                self.assertAlmostEqual(kr.getRateCoefficient(T) / exact.getRateCoefficient(T), 1.0, 3)
+
+################################################################################
+
+class WatcherTest(TestCase):
+    """
+    Tests of the sets of changes found by the watcher when polling.
+    """
+
+    def setUp(self):
+        self.dirpath = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.dirpath, 'groups'))
+        self.paths = [os.path.join(self.dirpath, 'rules.py'), os.path.join(self.dirpath, 'groups', 'groups.py')]
+        for path in self.paths:
+            self.write(path, 1000000000)
+        # Watch the directory as watcher.watch() does when polling, without
+        # starting the polling thread, so that the test decides when to poll
+        with watcher._lock:
+            watcher._generations[self.dirpath] = 0
+            watcher._changes[self.dirpath] = set()
+            watcher._mtimes[self.dirpath] = watcher._getModificationTimes(self.dirpath)
+
+    def tearDown(self):
+        with watcher._lock:
+            watcher._generations.pop(self.dirpath, None)
+            watcher._changes.pop(self.dirpath, None)
+            watcher._mtimes.pop(self.dirpath, None)
+        shutil.rmtree(self.dirpath)
+
+    def write(self, path, mtime):
+        """
+        Write the file at `path`, and set its modification time to `mtime`
+        so that the change is seen however coarse the file system's times.
+        """
+        f = open(path, 'w')
+        f.write('{0}\n'.format(mtime))
+        f.close()
+        os.utime(path, (mtime, mtime))
+
+    def test_noChanges(self):
+        """
+        Tests that polling an unchanged directory records no changes.
+        """
+        watcher._poll()
+        self.assertEqual(watcher.popChanges(self.dirpath), (0, set()))
+
+    def test_changes(self):
+        """
+        Tests that modified, created and removed files are each recorded as
+        changed, and that popChanges() only returns each change once.
+        """
+        newPath = os.path.join(self.dirpath, 'groups', 'new.py')
+        self.write(self.paths[1], 1000000001)
+        self.write(newPath, 1000000000)
+        os.remove(self.paths[0])
+        watcher._poll()
+        self.assertEqual(watcher.popChanges(self.dirpath), (1, set([self.paths[0], self.paths[1], newPath])))
+        watcher._poll()
+        self.assertEqual(watcher.popChanges(self.dirpath), (1, set()))
+        self.write(newPath, 1000000002)
+        watcher._poll()
+        self.assertEqual(watcher.getGeneration(self.dirpath), 2)
+        self.assertEqual(watcher.popChanges(self.dirpath), (2, set([newPath])))
@@ -33,34 +33,70 @@ This module contains additional classes and functions used by the database
 app that don't belong to any other module.
 """
 
-import socket
+import atexit
+import copy
+import cPickle
+import gc
+import hashlib
+import math
+import multiprocessing
+import numpy
+import subprocess
 import sys
 import os
+import threading
+import time
+import traceback
+import uuid
+import weakref
 import settings
 import pybel
 import openbabel as ob
 import xlrd
 
 
-from rmgpy.kinetics import Arrhenius
+import rmgpy
+import rmgpy.constants as constants
+from rmgpy.kinetics import Arrhenius, ArrheniusEP
+from rmgpy.thermo import ThermoData, NASA
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.species import Species
 from rmgpy.reaction import Reaction
 from rmgpy.data.base import Entry
-from rmgpy.data.kinetics import TemplateReaction, DepositoryReaction
+from rmgpy.data.kinetics import TemplateReaction, DepositoryReaction, LibraryReaction
 from rmgweb.main.tools import *
+import watcher
+import profiler
+import rmgjava
+from cache import createCache
 
-from rmgpy.data.thermo import ThermoDatabase
-from rmgpy.data.kinetics import KineticsDatabase
+from rmgpy.data.thermo import ThermoDatabase, ThermoDepository, ThermoLibrary, ThermoGroups
+from rmgpy.data.kinetics import KineticsDatabase, KineticsLibrary, KineticsFamily
 from rmgpy.data.rmg import RMGDatabase
 
 ################################################################################
 
+if settings.DATABASE_PROFILE:
+    profiler.install()
+
 database = None
 
+# The sections of the RMG database that are loaded (and tracked for changes)
+# by loadDatabase(), as (component, section) pairs
+DATABASE_SECTIONS = [
+    ('thermo', 'depository'),
+    ('thermo', 'libraries'),
+    ('thermo', 'groups'),
+    ('kinetics', 'libraries'),
+    ('kinetics', 'families'),
+]
+
 ################################################################################
 
 _timestamps = {}
+# Held while _timestamps is iterated over or changed, as the sections of the
+# database may be reloaded in a background thread
+_timestampsLock = threading.Lock()
 # Some functions to determine if the database files have changed on disk since
 # they were last loaded. 
 def resetTimestamp(path):
@@ -68,176 +104,2153 @@ def resetTimestamp(path):
     Reset the files timestamp in the stored dictionary of timestamps.
     """
     mtime = os.stat(path).st_mtime
-    _timestamps[path] = mtime
+    with _timestampsLock:
+        _timestamps[path] = mtime
+
+def forgetDirTimestamps(dirpath):
+    """
+    Forget the timestamps of all of the files in the directory tree at
+    dirpath, so that they all appear to have been modified.
+    """
+    with _timestampsLock:
+        for path in [path for path in _timestamps if path.startswith(dirpath + os.sep)]:
+            del _timestamps[path]
 
 def resetDirTimestamps(dirpath):
     """
-    Walk the directory tree from dirpath, calling resetTimestamp(file) on each file.
+    Walk the directory tree from dirpath, resetting the timestamp of each file.
     """
     print "Resetting 'last loaded' timestamps for {0} in process {1}".format(dirpath, os.getpid())
+    timestamps = {}
     for root, dirs, files in os.walk(dirpath):
         for name in files:
-            resetTimestamp(os.path.join(root,name))
+            path = os.path.join(root,name)
+            timestamps[path] = os.stat(path).st_mtime
+    with _timestampsLock:
+        # Forget files that have since been removed
+        for path in [path for path in _timestamps if path.startswith(dirpath + os.sep)]:
+            del _timestamps[path]
+        _timestamps.update(timestamps)
 
 def isFileModified(path):
     """
-    Return True if the file at `path` has been modified since `resetTimestamp(path)` was last called.
+    Return True if the file at `path` has been modified since `resetTimestamp(path)` was last called.
+    """
+    try:
+        # If path doesn't denote a file and were previously
+        # tracking it, then it has been removed or the file type
+        # has changed, so return True.
+        if not os.path.isfile(path):
+            return path in _timestamps
+        
+        # If path wasn't being tracked then it's new, so return True
+        mtime = os.stat(path).st_mtime
+        timestamp = _timestamps.get(path)
+        if timestamp is None:
+            return True
+        
+        # Force restart when modification time has changed, even
+        # if time now older, as that could indicate older file
+        # has been restored.
+        if mtime != timestamp:
+            return True
+    except:
+        # for debugging, raise the exception
+        # If any exception occured, likely that file has been
+        # been removed just before stat(), so force a restart.
+        raise
+        return True
+    # passed all tests
+    return False
+
+def isDirModified(dirpath):
+    """
+    Returns True if anything in the directory at dirpath has been modified since resetDirTimestamps(dirpath).
+    """
+    with _timestampsLock:
+        to_check = set([path for path in _timestamps if path.startswith(dirpath)])
+    for root, dirs, files in os.walk(dirpath):
+        for name in files:
+            path = os.path.join(root,name)
+            if isFileModified(path):
+                return True
+            to_check.discard(path)
+    # If there's anything left in to_check, it's probably now gone and this will return True:
+    for path in to_check:
+        if isFileModified(path):
+            return True
+    # Passed all tests.
+    return False
+
+def getModifiedFiles(dirpath):
+    """
+    Returns the set of paths of the files in the directory at dirpath that have been modified, added or removed since resetDirTimestamps(dirpath).
+    """
+    modified = set()
+    with _timestampsLock:
+        to_check = set([path for path in _timestamps if path.startswith(dirpath)])
+    for root, dirs, files in os.walk(dirpath):
+        for name in files:
+            path = os.path.join(root,name)
+            if isFileModified(path):
+                modified.add(path)
+            to_check.discard(path)
+    # If there's anything left in to_check, it's probably now gone:
+    for path in to_check:
+        if isFileModified(path):
+            modified.add(path)
+    return modified
+
+# The watcher generation of each database section when it was last loaded
+_generations = {}
+# The directories of the database sections that have been loaded
+_loadedSections = set()
+# The directories of the loaded database sections that must be loaded in full
+# the next time they are modified, as a reload of them has failed
+_staleSections = set()
+
+def isSectionModified(dirpath):
+    """
+    Returns True if anything in the database section at dirpath has been modified since resetSectionTimestamps(dirpath).
+    
+    If the section is being watched for changes in this process this is just
+    a comparison of generation counters. Otherwise the directory tree is
+    walked with isDirModified(), and (if ``settings.DATABASE_WATCH`` is set)
+    the section is watched from now on so that the walk is not needed again.
+    """
+    if watcher.isWatching(dirpath):
+        return watcher.getGeneration(dirpath) != _generations.get(dirpath)
+    mode = getattr(settings, 'DATABASE_WATCH', None)
+    if mode and not _preloading:
+        # Start watching before walking the tree, so that no change is missed
+        watcher.start(interval=getattr(settings, 'DATABASE_POLL_INTERVAL', 2.0), mode=mode)
+        watcher.watch(dirpath)
+        _generations[dirpath] = watcher.getGeneration(dirpath)
+    return isDirModified(dirpath)
+
+def popSectionChanges(dirpath):
+    """
+    Return the current watcher generation of the database section at
+    `dirpath` and the set of paths within it that have changed since this
+    was last called, or ``(None, None)`` if it is not being watched. Call
+    this before loading the section, and pass the generation to
+    resetSectionTimestamps() afterwards, so that changes made while loading
+    are not missed.
+    """
+    if watcher.isWatching(dirpath):
+        return watcher.popChanges(dirpath)
+    return None, None
+
+def resetSectionTimestamps(dirpath, generation=None):
+    """
+    Mark the database section at `dirpath` as loaded as of the given watcher
+    `generation`.
+    """
+    resetDirTimestamps(dirpath)
+    _loadedSections.add(dirpath)
+    if generation is not None:
+        _generations[dirpath] = generation
+
+################################################################################
+
+# Bump this whenever a change to the website or to RMG-Py would make previously
+# saved snapshots of the database unusable
+SNAPSHOT_VERSION = 1
+
+def getSnapshotKey():
+    """
+    Return a string identifying the state of the RMG database on disk, made
+    from the git SHA of ``settings.DATABASE_PATH``, the RMG-Py version, and
+    the snapshot format version. Returns ``None`` if the database is not a
+    clean git checkout, since then the SHA does not describe its contents.
+    """
+    try:
+        sha = subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                      cwd=settings.DATABASE_PATH, stderr=subprocess.STDOUT).strip()
+        status = subprocess.check_output(['git', 'status', '--porcelain', '--', '.'],
+                                         cwd=settings.DATABASE_PATH, stderr=subprocess.STDOUT).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    if status:
+        # Uncommitted changes, so the SHA doesn't tell us what is on disk
+        return None
+    version = getattr(rmgpy, '__version__', 'unknown')
+    return '{0}-{1}-v{2:d}'.format(sha, version, SNAPSHOT_VERSION)
+
+def getSnapshotPath(key):
+    """
+    Return the path of the database snapshot file for the given `key`, or
+    ``None`` if snapshots are disabled.
+    """
+    cachePath = getattr(settings, 'DATABASE_CACHE_PATH', None)
+    if not cachePath:
+        return None
+    return os.path.join(cachePath, 'database-{0}.pkl'.format(key))
+
+def loadDatabaseSnapshot(key):
+    """
+    Return the :class:`RMGDatabase` saved in the snapshot for the given `key`,
+    or ``None`` if there is no usable snapshot.
+    """
+    path = getSnapshotPath(key)
+    if path is None or not os.path.exists(path):
+        return None
+    print "Loading database snapshot {0} in process {1}".format(path, os.getpid())
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        f = open(path, 'rb')
+        try:
+            if settings.DATABASE_PROFILE:
+                snapshot = profiler.profile('database snapshot', path, None, cPickle.load, f)
+            else:
+                snapshot = cPickle.load(f)
+        finally:
+            f.close()
+    except Exception, e:
+        print >> sys.stderr, 'Unable to load database snapshot {0}: {1}'.format(path, e)
+        sys.stderr.flush()
+        return None
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    if not isinstance(snapshot, RMGDatabase):
+        return None
+    return snapshot
+
+def saveDatabaseSnapshot(database, key):
+    """
+    Save the given fully-loaded `database` as the snapshot for the given
+    `key`, replacing any snapshots saved for other keys. The file is written
+    under a temporary name and renamed into place, so that other processes
+    never see a partially-written snapshot.
+    """
+    path = getSnapshotPath(key)
+    if path is None or os.path.exists(path):
+        return
+    dirpath = os.path.dirname(path)
+    tempPath = '{0}.{1:d}.tmp'.format(path, os.getpid())
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        if not os.path.isdir(dirpath):
+            os.makedirs(dirpath)
+        f = open(tempPath, 'wb')
+        try:
+            cPickle.dump(database, f, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+        os.rename(tempPath, path)
+    except Exception, e:
+        print >> sys.stderr, 'Unable to save database snapshot {0}: {1}'.format(path, e)
+        sys.stderr.flush()
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        return
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    print "Saved database snapshot {0} in process {1}".format(path, os.getpid())
+    # Remove the snapshots of older versions of the database
+    for name in os.listdir(dirpath):
+        if name.startswith('database-') and name.endswith('.pkl') and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(dirpath, name))
+            except OSError:
+                pass
+
+################################################################################
+
+def loadThermoDepository(thermo, path):
+    """
+    Load and return the thermodynamics depository in the file at `path`,
+    using the contexts of the given :class:`ThermoDatabase` `thermo`.
+    """
+    label = os.path.splitext(os.path.basename(path))[0]
+    depository = ThermoDepository(label=label)
+    depository.load(path, thermo.local_context, thermo.global_context)
+    return depository
+
+def loadThermoLibrary(thermo, path):
+    """
+    Load and return the thermodynamics library in the file at `path`, using
+    the contexts of the given :class:`ThermoDatabase` `thermo`.
+    """
+    library = ThermoLibrary()
+    library.load(path, thermo.local_context, thermo.global_context)
+    library.label = os.path.splitext(os.path.basename(path))[0]
+    return library
+
+def loadThermoGroups(thermo, path):
+    """
+    Load and return the thermodynamics group additivity values in the file at
+    `path`, using the contexts of the given :class:`ThermoDatabase` `thermo`.
+    """
+    label = os.path.splitext(os.path.basename(path))[0]
+    groups = ThermoGroups(label=label)
+    groups.load(path, thermo.local_context, thermo.global_context)
+    return groups
+
+def loadKineticsLibrary(kinetics, path, label):
+    """
+    Load and return the kinetics library with the given `label` from the file
+    at `path`, using the contexts of the given :class:`KineticsDatabase`
+    `kinetics`.
+    """
+    library = KineticsLibrary()
+    library.load(path, kinetics.local_context, kinetics.global_context)
+    library.label = label
+    return library
+
+def loadKineticsFamily(kinetics, path):
+    """
+    Load and return the kinetics family in the directory at `path`, using the
+    contexts of the given :class:`KineticsDatabase` `kinetics`.
+    """
+    family = KineticsFamily(label=os.path.basename(path))
+    family.load(path, kinetics.local_context, kinetics.global_context)
+    return family
+
+def sortThermoLibraries(thermo):
+    """
+    Put the libraries of the given :class:`ThermoDatabase` `thermo` in our
+    preferred order, so that when we look up thermo in order to estimate
+    kinetics, we use our favourite values first.
+    """
+    preferred_order = ['primaryThermoLibrary','DFT_QCI_thermo','GRI-Mech3.0','CBS_QB3_1dHR','KlippensteinH2O2']
+    new_order = [i for i in preferred_order if i in thermo.libraryOrder]
+    for i in thermo.libraryOrder:
+        if i not in new_order: new_order.append(i) 
+    thermo.libraryOrder = new_order
+
+def reloadDatabaseFiles(database, component, section, paths):
+    """
+    Reload, in place, only the parts of the given `section` of the given
+    `component` of `database` that own the modified files at `paths`. These
+    are individual depositories, libraries or sets of groups, or for kinetics
+    families, the whole family. Returns ``False`` if a path could not be
+    attributed to any such part, in which case nothing is reloaded and the
+    whole section should be loaded instead.
+    """
+    dirpath = os.path.join(settings.DATABASE_PATH, component, section)
+    labels = set()
+    for path in paths:
+        relpath = os.path.relpath(path, dirpath)
+        if component == 'kinetics' and section == 'families':
+            # Any change to a file in a family directory affects that family
+            if os.sep not in relpath:
+                return False
+            labels.add(relpath.split(os.sep)[0])
+        else:
+            label, ext = os.path.splitext(relpath)
+            if ext.lower() != '.py':
+                # Only the Python files are loaded from these sections
+                continue
+            if os.sep in label and not (component == 'kinetics' and section == 'libraries'):
+                return False
+            labels.add(label.replace(os.sep, '/'))
+
+    for label in labels:
+        print "Reloading {0}/{1}/{2} in process {3}".format(component, section, label, os.getpid())
+        if component == 'kinetics' and section == 'families':
+            path = os.path.join(dirpath, label)
+            if os.path.isdir(path):
+                database.kinetics.families[label] = loadKineticsFamily(database.kinetics, path)
+            else:
+                database.kinetics.families.pop(label, None)
+            continue
+        path = os.path.join(dirpath, label.replace('/', os.sep) + '.py')
+        exists = os.path.isfile(path)
+        if component == 'thermo' and section == 'depository':
+            if exists:
+                database.thermo.depository[label] = loadThermoDepository(database.thermo, path)
+            else:
+                database.thermo.depository.pop(label, None)
+        elif component == 'thermo' and section == 'groups':
+            if exists:
+                database.thermo.groups[label] = loadThermoGroups(database.thermo, path)
+            else:
+                database.thermo.groups.pop(label, None)
+        else:
+            db = database.thermo if component == 'thermo' else database.kinetics
+            if exists:
+                if component == 'thermo':
+                    db.libraries[label] = loadThermoLibrary(db, path)
+                else:
+                    db.libraries[label] = loadKineticsLibrary(db, path, label)
+                if label not in db.libraryOrder:
+                    db.libraryOrder.append(label)
+            else:
+                db.libraries.pop(label, None)
+                if label in db.libraryOrder:
+                    db.libraryOrder.remove(label)
+            if component == 'thermo':
+                sortThermoLibraries(db)
+    return True
+
+def loadDatabaseSection(database, component, section, walk=False):
+    """
+    Load the given `section` of the given `component` of `database` if it
+    has been modified on disk since it was last loaded. If the section was
+    already loaded, only the libraries, depositories, groups or families
+    whose files have changed are reloaded. If `walk` is ``True``, changes
+    the watcher has not seen yet are found by walking the section too.
+    Returns ``True`` if anything was loaded.
+    """
+    dirpath = os.path.join(settings.DATABASE_PATH, component, section)
+    if not isSectionModified(dirpath) and not (walk and isDirModified(dirpath)):
+        return False
+    generation, paths = popSectionChanges(dirpath)
+    if walk and paths is not None:
+        paths = paths | getModifiedFiles(dirpath)
+
+    try:
+        reloaded = False
+        if dirpath in _loadedSections and dirpath not in _staleSections:
+            if paths is None:
+                # Not being watched, so walk the tree to find what has changed
+                paths = getModifiedFiles(dirpath)
+            # If nothing appears to have changed (e.g. a change happened while
+            # we were last loading), play it safe and load the whole section
+            if paths:
+                reloaded = reloadDatabaseFiles(database, component, section, paths)
+
+        if not reloaded:
+            if component == 'thermo' and section == 'depository':
+                database.thermo.loadDepository(dirpath)
+            elif component == 'thermo' and section == 'libraries':
+                database.thermo.loadLibraries(dirpath)
+                sortThermoLibraries(database.thermo)
+            elif component == 'thermo' and section == 'groups':
+                database.thermo.loadGroups(dirpath)
+            elif component == 'kinetics' and section == 'libraries':
+                database.kinetics.loadLibraries(dirpath)
+            elif component == 'kinetics' and section == 'families':
+                database.kinetics.loadFamilies(dirpath)
+    except Exception:
+        if dirpath in _loadedSections:
+            # Don't try again until the files change again (e.g. to fix the
+            # error), and then load the whole section, since the changes
+            # seen this time are forgotten
+            _staleSections.add(dirpath)
+            resetSectionTimestamps(dirpath, generation)
+        raise
+
+    _staleSections.discard(dirpath)
+    resetSectionTimestamps(dirpath, generation)
+    return True
+
+def listDatabaseSection(component, section):
+    """
+    Return a list of the (path, label) pairs of the files (or for kinetics
+    families, the directories) that make up the given `section` of the given
+    `component` of the database, each of which can be loaded independently,
+    in the order in which RMG-Py would load them.
+    """
+    dirpath = os.path.join(settings.DATABASE_PATH, component, section)
+    units = []
+    if component == 'kinetics' and section == 'families':
+        for label in sorted(os.listdir(dirpath)):
+            if os.path.isdir(os.path.join(dirpath, label)):
+                units.append((os.path.join(dirpath, label), label))
+    elif section == 'libraries':
+        for root, dirs, files in os.walk(dirpath):
+            for f in files:
+                label, ext = os.path.splitext(os.path.relpath(os.path.join(root, f), dirpath))
+                if ext.lower() == '.py':
+                    units.append((os.path.join(root, f), label.replace(os.sep, '/')))
+    else:
+        for f in sorted(os.listdir(dirpath)):
+            label, ext = os.path.splitext(f)
+            if ext.lower() == '.py' and label != '__init__':
+                units.append((os.path.join(dirpath, f), label))
+    return units
+
+# The empty databases used for their contexts by each load worker process
+_workerDatabases = {}
+
+def initializeLoadWorker():
+    """
+    Prepare a worker process of a database load pool. The loaded objects are
+    deeply nested, so sending them back to the parent process needs a larger
+    recursion limit than the default. Any load profile records inherited
+    from the parent process are dropped, so that only the worker's own are
+    sent back.
+    """
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10000))
+    profiler.takeRecords()
+
+def loadDatabaseUnit(unit):
+    """
+    Load a single depository, library, set of groups, or family, given as a
+    (component, section, path, label) tuple, in a worker process of a
+    database load pool. Returns the loaded object and the list of load
+    profile records made while loading it.
+    """
+    component, section, path, label = unit
+    if component not in _workerDatabases:
+        _workerDatabases[component] = ThermoDatabase() if component == 'thermo' else KineticsDatabase()
+    db = _workerDatabases[component]
+    if component == 'thermo' and section == 'depository':
+        result = loadThermoDepository(db, path)
+    elif component == 'thermo' and section == 'libraries':
+        result = loadThermoLibrary(db, path)
+    elif component == 'thermo' and section == 'groups':
+        result = loadThermoGroups(db, path)
+    elif component == 'kinetics' and section == 'libraries':
+        result = loadKineticsLibrary(db, path, label)
+    elif component == 'kinetics' and section == 'families':
+        result = loadKineticsFamily(db, path)
+    return result, profiler.takeRecords()
+
+def loadDatabaseSectionsInParallel(database, sections, processes):
+    """
+    Load the given `sections` of `database`, a list of (component, section)
+    pairs, from scratch, parsing their files in a pool of the given number of
+    worker `processes`. The loaded objects are put in place in the same order
+    as when loading sequentially, and the thermo libraries are then sorted
+    into our preferred order.
+    """
+    generations = {}
+    units = []
+    for component, section in sections:
+        dirpath = os.path.join(settings.DATABASE_PATH, component, section)
+        generations[dirpath] = popSectionChanges(dirpath)[0]
+        units.extend([(component, section, path, label) for path, label in listDatabaseSection(component, section)])
+
+    print "Loading {0} database files in {1} processes from process {2}".format(len(units), processes, os.getpid())
+    sys.stdout.flush()
+    pool = multiprocessing.Pool(processes, initializeLoadWorker)
+    try:
+        # Send the most expensive units (the families) out first, so that
+        # the pool is not left waiting on one of them at the end
+        order = sorted(range(len(units)), key=lambda i: units[i][1] != 'families')
+        results = [None] * len(units)
+        for i, (result, records) in zip(order, pool.map(loadDatabaseUnit, [units[i] for i in order], chunksize=1)):
+            results[i] = result
+            profiler.addRecords(records)
+        pool.close()
+    except:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+    for component, section in sections:
+        if component == 'thermo' and section == 'depository':
+            database.thermo.depository = {}
+        elif component == 'thermo' and section == 'libraries':
+            database.thermo.libraries = {}
+            database.thermo.libraryOrder = []
+        elif component == 'thermo' and section == 'groups':
+            database.thermo.groups = {}
+        elif component == 'kinetics' and section == 'libraries':
+            database.kinetics.libraries = {}
+            database.kinetics.libraryOrder = []
+        elif component == 'kinetics' and section == 'families':
+            database.kinetics.families = {}
+    for (component, section, path, label), result in zip(units, results):
+        if component == 'thermo' and section == 'depository':
+            database.thermo.depository[label] = result
+        elif component == 'thermo' and section == 'libraries':
+            database.thermo.libraries[result.label] = result
+            database.thermo.libraryOrder.append(result.label)
+        elif component == 'thermo' and section == 'groups':
+            database.thermo.groups[label] = result
+        elif component == 'kinetics' and section == 'libraries':
+            database.kinetics.libraries[label] = result
+            database.kinetics.libraryOrder.append(label)
+        elif component == 'kinetics' and section == 'families':
+            database.kinetics.families[label] = result
+    if ('thermo', 'libraries') in sections:
+        sortThermoLibraries(database.thermo)
+
+    for dirpath, generation in generations.iteritems():
+        resetSectionTimestamps(dirpath, generation)
+
+def getDatabase():
+    """
+    Return the RMG database of this process, creating it if necessary. A new
+    database is loaded from a snapshot if a suitable one exists; otherwise
+    only the forbidden structures are loaded, and the other sections are left
+    to loadDatabase() or to be loaded piece by piece when first used.
+    """
+    global database
+    if not database:
+        snapshotKey = getSnapshotKey()
+        if snapshotKey is not None:
+            database = loadDatabaseSnapshot(snapshotKey)
+        if database is not None:
+            for dbtype, dbsection in DATABASE_SECTIONS:
+                resetSectionTimestamps(os.path.join(settings.DATABASE_PATH, dbtype, dbsection))
+            computeUntrainedReactionsInBackground(database)
+        else:
+            database = RMGDatabase()
+            database.thermo = ThermoDatabase()
+            database.kinetics = KineticsDatabase()
+            database.loadForbiddenStructures(os.path.join(settings.DATABASE_PATH, 'forbiddenStructures.py'))
+    if _preloaded and not _preloading and _startedPid != os.getpid():
+        startDeferredWork()
+    return database
+
+# The reload generation of the database, which is incremented every time
+# anything in the database is (re)loaded
+_generation = 0
+
+# Held while parts loaded on demand are added to the global database, and
+# while it is copied or replaced by a reload, so that no such part is lost
+_databaseLock = threading.Lock()
+
+# Information about the most recent reload of the database
+_reloadLock = threading.Lock()
+_reloadThread = None
+# The sections queued to be reloaded in the background
+_pendingReload = []
+# Held for the duration of each reload
+_reloadRunLock = threading.Lock()
+_reloadStatus = {
+    'generation': 0,
+    'running': False,
+    'sections': [],
+    'started': None,
+    'finished': None,
+    'duration': None,
+    'error': None,
+}
+
+# Set while preloadDatabase() is loading the database in a process that is
+# about to fork, in which no background threads may be started, and once it
+# has finished; and the id of the process in which the work it deferred has
+# since been started
+_preloading = False
+_preloaded = False
+_startedPid = None
+_startLock = threading.Lock()
+
+def getDatabaseGeneration():
+    """
+    Return the reload generation of the database, which is incremented every
+    time anything in the database is (re)loaded. Anything computed from the
+    database should be discarded when this changes.
+    """
+    return _generation
+
+def incrementDatabaseGeneration():
+    """
+    Record that something in the database has been (re)loaded.
+    """
+    global _generation
+    with _reloadLock:
+        _generation += 1
+
+def getReloadStatus():
+    """
+    Return a dictionary describing the most recent reload of the database:
+    the resulting `generation`, whether it is still `running`, the
+    `sections` involved, the `started` and `finished` times (in seconds since
+    the epoch), the `duration` in seconds, and the `error` if it failed.
+    """
+    with _reloadLock:
+        status = dict(_reloadStatus)
+    status['generation'] = _generation
+    return status
+
+def copyDatabase(database, sections):
+    """
+    Return a copy of the given `database` in which the given `sections`, a
+    list of (component, section) pairs, can be (re)loaded without affecting
+    the original. The libraries, depositories, groups and families are all
+    shared with the original, as are the dictionaries holding those of the
+    other sections, so that parts loaded on demand by getDatabasePart() in
+    the meantime end up in both.
+    """
+    with _databaseLock:
+        newDatabase = copy.copy(database)
+        newDatabase.thermo = copy.copy(database.thermo)
+        newDatabase.kinetics = copy.copy(database.kinetics)
+        for component, section in sections:
+            if component == 'thermo' and section == 'depository':
+                newDatabase.thermo.depository = dict(database.thermo.depository)
+            elif component == 'thermo' and section == 'libraries':
+                newDatabase.thermo.libraries = dict(database.thermo.libraries)
+                newDatabase.thermo.libraryOrder = list(database.thermo.libraryOrder)
+            elif component == 'thermo' and section == 'groups':
+                newDatabase.thermo.groups = dict(database.thermo.groups)
+            elif component == 'kinetics' and section == 'libraries':
+                newDatabase.kinetics.libraries = dict(database.kinetics.libraries)
+                newDatabase.kinetics.libraryOrder = list(database.kinetics.libraryOrder)
+            elif component == 'kinetics' and section == 'families':
+                newDatabase.kinetics.families = dict(database.kinetics.families)
+    return newDatabase
+
+def reloadDatabase(sections, walk=False):
+    """
+    Reload the given `sections` of the database, a list of (component,
+    section) pairs, into a copy of the database, and then replace the global
+    database with the copy. Requests holding on to the previous database can
+    keep using it safely. If every section of the database is loaded
+    afterwards, a snapshot is saved. Only one reload runs at a time in each
+    process; any other waits for it to finish. If `walk` is ``True``, the
+    files are compared with their timestamps to find what has changed, even
+    if the sections are being watched (see :func:`reloadDatabaseNow()`).
+    """
+    with _reloadRunLock:
+        modified = reloadDatabaseSections(sections, walk)
+    if modified and all([os.path.join(settings.DATABASE_PATH, component, section) in _loadedSections
+                         for component, section in DATABASE_SECTIONS]):
+        snapshotKey = getSnapshotKey()
+        if snapshotKey is not None:
+            saveDatabaseSnapshot(database, snapshotKey)
+
+def reloadDatabaseSections(sections, walk=False):
+    """
+    Do the work of :func:`reloadDatabase()`, apart from saving the snapshot,
+    with ``_reloadRunLock`` held. Returns ``True`` if anything was reloaded.
+    """
+    global database
+    started = time.time()
+    with _reloadLock:
+        _reloadStatus.update({
+            'running': True,
+            'sections': ['{0}/{1}'.format(component, section) for component, section in sections],
+            'started': started,
+            'finished': None,
+            'duration': None,
+            'error': None,
+        })
+    print "Reloading {0} in process {1}".format(', '.join(_reloadStatus['sections']), os.getpid())
+    loaded = []
+    try:
+        newDatabase = copyDatabase(database, sections)
+        modified = False
+        for component, section in sections:
+            if loadDatabaseSection(newDatabase, component, section, walk):
+                modified = True
+                loaded.append(os.path.join(settings.DATABASE_PATH, component, section))
+    except Exception, e:
+        traceback.print_exc()
+        sys.stderr.flush()
+        # The sections that were reloaded before the failure are thrown away
+        # with the copy, so make sure they are reloaded in full next time;
+        # the section that failed is left alone until its files change again
+        for dirpath in loaded:
+            _staleSections.add(dirpath)
+            _generations.pop(dirpath, None)
+            forgetDirTimestamps(dirpath)
+        error = '{0}: {1}'.format(e.__class__.__name__, e)
+        modified = False
+    else:
+        error = None
+        if modified:
+            # Replacing the reference is atomic, so other threads see either
+            # the previous database or the new one, never a partial one
+            with _databaseLock:
+                database = newDatabase
+            incrementDatabaseGeneration()
+            if ('kinetics', 'families') in sections:
+                computeUntrainedReactionsInBackground(database)
+    finished = time.time()
+    with _reloadLock:
+        _reloadStatus.update({
+            'running': False,
+            'finished': finished,
+            'duration': finished - started,
+            'error': error,
+        })
+    print "Finished reloading in process {0} ({1:.1f} s)".format(os.getpid(), finished - started)
+    return modified
+
+def reloadDatabaseInBackground(sections):
+    """
+    Reload the given `sections` of the database in a background thread. If
+    a reload is already running, they are queued, and reloaded by the same
+    thread once it has finished.
+    """
+    global _reloadThread
+    with _reloadLock:
+        for section in sections:
+            if section not in _pendingReload:
+                _pendingReload.append(section)
+        if _reloadThread is not None and _reloadThread.is_alive():
+            return
+        _reloadThread = threading.Thread(target=reloadPendingSections)
+        _reloadThread.setDaemon(True)
+        _reloadThread.start()
+
+def reloadPendingSections():
+    """
+    Reload the sections of the database queued by
+    :func:`reloadDatabaseInBackground()` until there are none left. This is
+    the body of the background reload thread.
+    """
+    global _reloadThread
+    while True:
+        with _reloadLock:
+            sections = _pendingReload[:]
+            del _pendingReload[:]
+            if not sections:
+                _reloadThread = None
+                return
+        try:
+            reloadDatabase(sections)
+        except Exception:
+            traceback.print_exc()
+            sys.stderr.flush()
+
+def reloadDatabaseNow(component='', section=''):
+    """
+    Reload, in this thread, the loaded sections of the given `component` of
+    the database that have been modified on disk, e.g. straight after a
+    request has written to them, so that the pages that follow show the
+    change. The files are compared with their timestamps instead of waiting
+    for the watcher to notice the change, and any reload already running in
+    the background is finished first. Sections that have not been loaded
+    are left to be loaded (or their parts loaded on demand) when next used.
+    """
+    reload = []
+    for dbtype, dbsection in DATABASE_SECTIONS:
+        if component in [dbtype, ''] and section in [dbsection, '']:
+            dirpath = os.path.join(settings.DATABASE_PATH, dbtype, dbsection)
+            if dirpath in _loadedSections and (isSectionModified(dirpath) or isDirModified(dirpath)):
+                reload.append((dbtype, dbsection))
+    if reload:
+        reloadDatabase(reload, walk=True)
+    return getDatabase()
+
+def loadDatabase(component='', section=''):
+    """
+    Load the requested `component` of the RMG database if modified since last loaded.
+    
+    The first time this is called in a process, a binary snapshot of the
+    whole database is used instead of parsing the database files if one
+    matching the current state of the database on disk is available. After a
+    full load of the database, such a snapshot is saved for use by other
+    processes.
+    
+    Sections that have never been loaded are loaded straight away. Sections
+    that were loaded but have since been modified are reloaded in the
+    background if ``settings.DATABASE_BACKGROUND_RELOAD`` is set, and the
+    previous version of the database is returned until that has finished.
+    """
+    global database
+    modified = False
+    database = getDatabase()
+
+    load = []
+    reload = []
+    for dbtype, dbsection in DATABASE_SECTIONS:
+        if component in [dbtype, ''] and section in [dbsection, '']:
+            dirpath = os.path.join(settings.DATABASE_PATH, dbtype, dbsection)
+            if dirpath not in _loadedSections:
+                # There is nothing to serve in the meantime, so load it now
+                load.append((dbtype, dbsection))
+            elif isSectionModified(dirpath):
+                reload.append((dbtype, dbsection))
+
+    processes = getattr(settings, 'DATABASE_LOAD_PROCESSES', 1) or multiprocessing.cpu_count()
+    if load and processes > 1:
+        loadDatabaseSectionsInParallel(database, load, processes)
+        modified = True
+    else:
+        for dbtype, dbsection in load:
+            if loadDatabaseSection(database, dbtype, dbsection):
+                modified = True
+
+    if modified:
+        incrementDatabaseGeneration()
+        if ('kinetics', 'families') in load:
+            computeUntrainedReactionsInBackground(database)
+        if component == '' and section == '' and not reload:
+            # The whole database is now loaded, so save a snapshot of it
+            snapshotKey = getSnapshotKey()
+            if snapshotKey is not None:
+                saveDatabaseSnapshot(database, snapshotKey)
+
+    if reload:
+        # Nothing else is served while preloading, and the worker processes
+        # of the pool (see getWorkerPool()) need the new database straight away
+        background = getattr(settings, 'DATABASE_BACKGROUND_RELOAD', False)
+        if background and not _preloading and not multiprocessing.current_process().daemon:
+            reloadDatabaseInBackground(reload)
+        else:
+            reloadDatabase(reload)
+
+    return database
+
+def preloadDatabase():
+    """
+    Load the whole RMG database in a parent process that is about to fork
+    worker processes (e.g. from the WSGI script), so that the workers share
+    the memory holding it (copy-on-write) instead of each loading a copy.
+    
+    No background threads are started while doing so, since they would not
+    survive the fork and could leave locks held in the workers. Watching the
+    database for changes and computing the untrained reactions are instead
+    started by startDeferredWork() in each process (the parent included)
+    when it first uses the database afterwards.
+    
+    The garbage collector writes to every object it visits, which would
+    un-share the memory pages holding the database. Where ``gc.freeze()`` is
+    available (Python 3.7 and later), the loaded objects are excluded from
+    future collections. Otherwise automatic collection is disabled before
+    forking, and each process only collects the younger generations, every
+    ``settings.DATABASE_GC_INTERVAL`` seconds, so the database (in the
+    oldest generation) is never visited. This is not as good: cyclic garbage
+    that survives into the oldest generation is only freed by a full
+    collection every ``settings.DATABASE_GC_FULL_INTERVAL`` seconds (which
+    un-shares pages as above), or by recycling the processes after a number
+    of requests (see apache/django.wsgi.example). Either way,
+    writes caused by reference counting cannot be avoided, so some pages
+    still become private to each worker over time.
+    """
+    global _preloading, _preloaded
+    _preloading = True
+    try:
+        database = loadDatabase()
+    finally:
+        _preloading = False
+    _preloaded = True
+    # Move everything loaded so far into the oldest generation
+    gc.collect()
+    if hasattr(gc, 'freeze'):
+        # Exclude those objects from all future collections
+        gc.freeze()
+    else:
+        gc.disable()
+    return database
+
+def collectYoungGarbage(interval, fullInterval=None):
+    """
+    Collect the two younger generations of garbage every `interval` seconds,
+    and all of the garbage every `fullInterval` seconds (if not ``None``),
+    forever. This is the body of the thread started by startDeferredWork()
+    when automatic garbage collection is disabled.
+    """
+    lastFull = time.time()
+    while True:
+        time.sleep(interval)
+        if fullInterval is not None and time.time() - lastFull >= fullInterval:
+            gc.collect()
+            lastFull = time.time()
+        else:
+            gc.collect(1)
+
+def startDeferredWork():
+    """
+    Start the work that preloadDatabase() deferred in this process, if not
+    already done: collecting the younger generations of garbage (if
+    automatic collection is disabled), and computing the untrained reactions
+    of the kinetics families. The pool of worker processes is forked first,
+    before this process starts any threads of its own. Watching the
+    database for changes starts by itself the next time a section is
+    checked by loadDatabase().
+    """
+    global _startedPid
+    with _startLock:
+        if _startedPid == os.getpid():
+            return
+        _startedPid = os.getpid()
+    print "Starting deferred work in process {0}".format(os.getpid())
+    getWorkerPool()
+    if not gc.isenabled():
+        thread = threading.Thread(target=collectYoungGarbage, args=(
+            getattr(settings, 'DATABASE_GC_INTERVAL', 1.0),
+            getattr(settings, 'DATABASE_GC_FULL_INTERVAL', None),
+        ))
+        thread.setDaemon(True)
+        thread.start()
+    if os.path.join(settings.DATABASE_PATH, 'kinetics', 'families') in _loadedSections:
+        computeUntrainedReactionsInBackground(database)
+
+def getMemoryUsage(pid=None):
+    """
+    Return a dictionary of the resident memory use, in kB, of the process
+    with the given `pid` (this process by default): the total `rss`, the
+    `shared` and `private` parts of it, and the proportional share `pss`.
+    Returns ``None`` if this cannot be determined (e.g. not on Linux).
+    """
+    if pid is None:
+        pid = os.getpid()
+    usage = {'rss': 0, 'shared': 0, 'private': 0, 'pss': 0}
+    fields = {
+        'Rss:': 'rss',
+        'Pss:': 'pss',
+        'Shared_Clean:': 'shared',
+        'Shared_Dirty:': 'shared',
+        'Private_Clean:': 'private',
+        'Private_Dirty:': 'private',
+    }
+    try:
+        f = open('/proc/{0:d}/smaps'.format(pid))
+        try:
+            for line in f:
+                tokens = line.split()
+                if len(tokens) == 3 and tokens[0] in fields:
+                    usage[fields[tokens[0]]] += int(tokens[1])
+        finally:
+            f.close()
+    except (IOError, ValueError):
+        return None
+    return usage
+
+def getWorkerMemoryUsage():
+    """
+    Return a list of (pid, usage) pairs giving the memory use, as returned by
+    :func:`getMemoryUsage`, of this process and of every other process
+    running the same program and forked from the same parent, i.e. the other
+    workers serving the website.
+    """
+    ppid = os.getppid()
+    try:
+        exe = os.readlink('/proc/self/exe')
+        pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        pids = []
+    workers = []
+    for pid in sorted(pids):
+        try:
+            f = open('/proc/{0:d}/stat'.format(pid))
+            try:
+                # The parent pid is the fourth field, after the parenthesized command name
+                parent = int(f.read().rsplit(')', 1)[1].split()[1])
+            finally:
+                f.close()
+            if pid != os.getpid() and (parent != ppid or os.readlink('/proc/{0:d}/exe'.format(pid)) != exe):
+                continue
+        except (IOError, OSError, IndexError, ValueError):
+            # The process has gone away, or belongs to another user
+            continue
+        usage = getMemoryUsage(pid)
+        if usage is not None:
+            workers.append((pid, usage))
+    return workers
+
+class LazyDatabase(object):
+    """
+    A stand-in for a single library, depository, set of groups or family of
+    the RMG database, which is only parsed from disk when one of its
+    attributes is first used. The function `load` is called to do this, and
+    must return the real object; all attribute access (including
+    ``isinstance()`` checks) is then passed on to that object.
+    """
+
+    def __init__(self, load):
+        object.__setattr__(self, '_load', load)
+        object.__setattr__(self, '_object', None)
+
+    def _materialize(self):
+        if self._object is None:
+            object.__setattr__(self, '_object', self._load())
+        return self._object
+
+    @property
+    def __class__(self):
+        return self._materialize().__class__
+
+    def __getattr__(self, name):
+        return getattr(self._materialize(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._materialize(), name, value)
+
+    def __repr__(self):
+        return repr(self._materialize())
+
+def getDatabasePart(getParts, label, path, load):
+    """
+    Return the part with the given `label` of the dictionary returned by
+    calling `getParts` with the global database, first (re)loading it using
+    the function `load` if it is missing or the file or directory at `path`
+    it was loaded from has been modified since. The part is stored in
+    whichever database is current once it has been loaded. Only replacing a
+    part that was already loaded increments the database generation, since
+    nothing can have been computed from a part that was missing.
+    """
+    isModified = isDirModified if os.path.isdir(path) else isFileModified
+    old = getParts(getDatabase()).get(label)
+    if old is not None and not isModified(path):
+        return old
+    print "Loading {0} in process {1}".format(path, os.getpid())
+    part = load()
+    with _databaseLock:
+        parts = getParts(getDatabase())
+        current = parts.get(label)
+        if current is not None and current is not old:
+            # Another thread (re)loaded it while we were loading it
+            return current
+        parts[label] = part
+        if os.path.isdir(path):
+            resetDirTimestamps(path)
+        else:
+            resetTimestamp(path)
+    if old is not None:
+        incrementDatabaseGeneration()
+    return part
+
+def getThermoDatabase(section, subsection):
+    """
+    Return the component of the thermodynamics database corresponding to the
+    given `section` and `subsection`. If either of these is invalid, a
+    :class:`ValueError` is raised.
+    
+    If the whole section has been loaded, the component is brought up to date
+    and returned. Otherwise a :class:`LazyDatabase` is returned, so that only
+    the file for this component is parsed, and only when it is first used.
+    """
+    if section not in ['depository', 'libraries', 'groups']:
+        raise ValueError('Invalid value "%s" for section parameter.' % section)
+    database = getDatabase()
+    dirpath = os.path.join(settings.DATABASE_PATH, 'thermo', section)
+
+    if dirpath in _loadedSections:
+        database = loadDatabase('thermo', section)
+        try:
+            if section == 'depository':
+                db = database.thermo.depository[subsection]
+            elif section == 'libraries':
+                db = database.thermo.libraries[subsection]
+            elif section == 'groups':
+                db = database.thermo.groups[subsection]
+        except KeyError:
+            raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
+        return db
+
+    path = os.path.join(dirpath, subsection + '.py')
+    if not os.path.isfile(path):
+        raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
+    if section == 'depository':
+        getParts, load = (lambda database: database.thermo.depository), loadThermoDepository
+    elif section == 'libraries':
+        getParts, load = (lambda database: database.thermo.libraries), loadThermoLibrary
+    elif section == 'groups':
+        getParts, load = (lambda database: database.thermo.groups), loadThermoGroups
+    return LazyDatabase(lambda: getDatabasePart(getParts, subsection, path, lambda: load(database.thermo, path)))
+
+def getKineticsDatabase(section, subsection):
+    """
+    Return the component of the kinetics database corresponding to the
+    given `section` and `subsection`. If either of these is invalid, a
+    :class:`ValueError` is raised.
+    
+    If the whole section has been loaded, the component is brought up to date
+    and returned. Otherwise a :class:`LazyDatabase` is returned, so that only
+    the library or family containing this component is parsed, and only when
+    it is first used.
+    """
+    if section not in ['libraries', 'families']:
+        raise ValueError('Invalid value "%s" for section parameter.' % section)
+    database = getDatabase()
+    dirpath = os.path.join(settings.DATABASE_PATH, 'kinetics', section)
+
+    if dirpath in _loadedSections:
+        database = loadDatabase('kinetics', section)
+        db = None
+        try:
+            if section == 'libraries':
+                db = database.kinetics.libraries[subsection]
+            elif section == 'families':
+                subsection = subsection.split('/')
+                if subsection[0] != '' and len(subsection) == 2:
+                    family = database.kinetics.families[subsection[0]]
+                    if subsection[1] == 'groups':
+                        db = family.groups
+                    elif subsection[1] == 'rules':
+                        db = family.rules
+                    else:
+                        label = '{0}/{1}'.format(family.label, subsection[1])
+                        db = (d for d in family.depositories if d.label==label).next()
+        except (KeyError, StopIteration):
+            raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
+        return db
+
+    if section == 'libraries':
+        path = os.path.join(dirpath, subsection + '.py')
+        if not os.path.isfile(path):
+            raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
+        return LazyDatabase(lambda: getDatabasePart(lambda database: database.kinetics.libraries, subsection, path,
+                                                    lambda: loadKineticsLibrary(database.kinetics, path, subsection)))
+
+    labels = subsection.split('/')
+    if labels[0] == '' or len(labels) != 2:
+        return None
+    familyLabel, name = labels
+    path = os.path.join(dirpath, familyLabel)
+    if not os.path.isfile(os.path.join(path, name + '.py')):
+        raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
+    def load():
+        family = getDatabasePart(lambda database: database.kinetics.families, familyLabel, path,
+                                 lambda: loadKineticsFamily(database.kinetics, path))
+        if name == 'groups':
+            return family.groups
+        elif name == 'rules':
+            return family.rules
+        label = '{0}/{1}'.format(family.label, name)
+        for depository in family.depositories:
+            if depository.label == label:
+                return depository
+        raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
+    return LazyDatabase(load)
+
+################################################################################
+
+def getMoleculeKey(molecule):
+    """
+    Return a string identifying the given :class:`Molecule` `molecule`. This
+    is its InChI, which is the same for all of its resonance isomers, plus the
+    number of radical electrons, which the InChI does not distinguish. If an
+    InChI cannot be generated, the adjacency list is used instead. Different
+    molecules may share a key (the InChI ignores the position of mobile
+    hydrogens, for example), so anything looked up by key must still be
+    checked for isomorphism.
+    """
+    try:
+        inchi = molecule.toInChI()
+    except Exception:
+        inchi = None
+    if not inchi:
+        return molecule.toAdjacencyList()
+    return '{0}/r{1:d}'.format(inchi, molecule.getRadicalCount())
+
+def getSpeciesKey(species):
+    """
+    Return a string identifying the given :class:`Species` (or
+    :class:`Molecule`) `species`; see :func:`getMoleculeKey()`.
+    """
+    if isinstance(species, Species):
+        return getMoleculeKey(species.molecule[0])
+    return getMoleculeKey(species)
+
+def getResonanceIsomers(species):
+    """
+    Return a list of the resonance isomers of the given :class:`Species` (or
+    :class:`Molecule`) `species`, generating them if necessary.
+    """
+    if isinstance(species, Species):
+        species.generateResonanceIsomers()
+        return species.molecule
+    return species.generateResonanceIsomers()
+
+def getCachedSpeciesResult(cache, species, compute):
+    """
+    Return the result of calling `compute()` for the given :class:`Species`
+    (or :class:`Molecule`) `species`, using the value saved in `cache` for an
+    isomorphic species if there is one. Each value in the cache is a list of
+    (resonance isomers, result) pairs for the species sharing a key.
+    """
+    key = getSpeciesKey(species)
+    molecule = species.molecule[0] if isinstance(species, Species) else species
+    bucket = cache.get(key, [])
+    for isomers, result in bucket:
+        for isomer in isomers:
+            if isomer.isIsomorphic(molecule):
+                return result
+    generation = cache.getGeneration()
+    result = compute()
+    cache.set(key, bucket + [(getResonanceIsomers(species), result)], generation)
+    return result
+
+# The index of the entries of each thermo library and depository by the key
+# of their structure, built when the library or depository is first searched
+_thermoIndexes = weakref.WeakKeyDictionary()
+
+def getThermoIndex(library):
+    """
+    Return a dictionary mapping the key (see :func:`getMoleculeKey()`) of the
+    structure of each entry in the given thermo library or depository to a
+    list of (position, entry) pairs for the entries with that key, where the
+    position is that of the entry when iterating over the library. The index
+    is built the first time it is needed; reloading a library replaces the
+    library object, so the index of the new one is built afresh.
+    """
+    try:
+        return _thermoIndexes[library]
+    except KeyError:
+        pass
+    index = {}
+    for position, entry in enumerate(library.entries.values()):
+        if isinstance(entry.item, Molecule):
+            index.setdefault(getMoleculeKey(entry.item), []).append((position, entry))
+    _thermoIndexes[library] = index
+    return index
+
+def findThermoEntries(species, library):
+    """
+    Return a list of the entries in the given thermo library or depository
+    whose structure is isomorphic to one of the resonance isomers of the
+    given :class:`Species` (or :class:`Molecule`) `species`, in the order in
+    which they appear in the library. Only the entries sharing a key with one
+    of the resonance isomers are tested for isomorphism.
+    """
+    index = getThermoIndex(library)
+    isomers = getResonanceIsomers(species)
+    candidates = {}
+    for key in set([getMoleculeKey(isomer) for isomer in isomers]):
+        for position, entry in index.get(key, []):
+            candidates[position] = entry
+    entries = []
+    for position in sorted(candidates):
+        entry = candidates[position]
+        for isomer in isomers:
+            if isomer.isIsomorphic(entry.item):
+                entries.append(entry)
+                break
+    return entries
+
+def getThermoDataFromLibrary(species, library):
+    """
+    Return the thermodynamics data for the given :class:`Species` (or
+    :class:`Molecule`) `species` from the given thermo `library` as a
+    (data, library, entry) tuple, or ``None`` if it is not in the library.
+    """
+    for entry in findThermoEntries(species, library):
+        if entry.data is not None:
+            return (copy.deepcopy(entry.data), library, entry)
+    return None
+
+def getThermoDataFromDepository(species, database):
+    """
+    Return a list of (data, depository, entry) tuples for all of the
+    thermodynamics data for the given :class:`Species` (or :class:`Molecule`)
+    `species` in the depositories of the provided `database`.
+    """
+    depository = database.thermo.depository
+    labels = [label for label in ['stable', 'radical'] if label in depository]
+    labels.extend(sorted([label for label in depository if label not in labels]))
+    items = []
+    for label in labels:
+        for entry in findThermoEntries(species, depository[label]):
+            items.append((copy.deepcopy(entry.data), depository[label], entry))
+    return items
+
+def getThermoDataFromGroups(species, database):
+    """
+    Return the group additivity estimate of the thermodynamics data for the
+    given :class:`Species` (or :class:`Molecule`) `species` from the provided
+    `database` as a (data, None, None) tuple, like the other sources.
+    """
+    return (database.thermo.getThermoDataFromGroups(species), None, None)
+
+thermoCache = createCache('thermo', getattr(settings, 'THERMO_CACHE_SIZE', 10000), generation=getDatabaseGeneration)
+
+def getThermoData(species, database):
+    """
+    Return the preferred thermodynamics data for the given :class:`Species`
+    (or :class:`Molecule`) `species` from the provided `database`: that from
+    the first library in the library order containing the species, or else
+    the group additivity estimate, as :meth:`ThermoDatabase.getThermoData`
+    does. The result from an earlier call for the same species is reused if
+    the database has not been reloaded since, so it must not be modified.
+    """
+    def compute():
+        getResonanceIsomers(species)
+        for label in database.thermo.libraryOrder:
+            data = getThermoDataFromLibrary(species, database.thermo.libraries[label])
+            if data is not None:
+                return data[0]
+        return getThermoDataFromGroups(species, database)[0]
+    return getCachedSpeciesResult(thermoCache, species, compute)
+
+allThermoCache = createCache('allThermo', getattr(settings, 'THERMO_CACHE_SIZE', 10000), generation=getDatabaseGeneration)
+
+def getAllThermoData(species, database):
+    """
+    Return a list of all of the thermodynamics data for the given
+    :class:`Species` `species` from the provided `database`, each with its
+    source library or depository and entry, as
+    :meth:`ThermoDatabase.getAllThermoData` does: those from the
+    depositories, then those from the libraries in the library order, and
+    finally the group additivity estimate. The result from an earlier call
+    for the same species is reused if the database has not been reloaded
+    since, so it must not be modified.
+    """
+    def compute():
+        getResonanceIsomers(species)
+        thermoDataList = getThermoDataFromDepository(species, database)
+        for label in database.thermo.libraryOrder:
+            data = getThermoDataFromLibrary(species, database.thermo.libraries[label])
+            if data is not None:
+                thermoDataList.append(data)
+        thermoDataList.append(getThermoDataFromGroups(species, database))
+        return thermoDataList
+    return getCachedSpeciesResult(allThermoCache, species, compute)
+
+thermoCurvesCache = createCache('thermoCurves', getattr(settings, 'THERMO_CACHE_SIZE', 10000), generation=getDatabaseGeneration)
+
+def getThermoCurves(thermo, key=None):
+    """
+    Return a tuple of arrays of the temperatures, and the heat capacity,
+    enthalpy, entropy and Gibbs free energy of the thermodynamics model
+    `thermo` at those temperatures, all in SI units. The temperatures are the
+    multiples of 10 K in the range over which the model is plotted, so that
+    the curves of different models line up. If a `key` identifying the model
+    (e.g. its library and index) is given, the curves are cached under it
+    until the database is reloaded.
+    """
+    if key is not None:
+        curves = thermoCurvesCache.get(key)
+        if curves is not None:
+            return curves
+        generation = thermoCurvesCache.getGeneration()
+    Tmin, Tmax = getThermoRange(thermo)
+    Tdata = numpy.arange(math.ceil(Tmin / 10.) * 10, math.floor(Tmax / 10.) * 10 + 1, 10)
+    curves = (Tdata,) + evaluateThermo(thermo, Tdata)
+    if key is not None:
+        thermoCurvesCache.set(key, curves, generation)
+    return curves
+
+def generateSpeciesThermo(species, database):
+    """
+    Generate the thermodynamics data for a given :class:`Species` object
+    `species` using the provided `database`.
+    """
+    species.thermo = getThermoData(species, database)
+
+################################################################################
+
+# The pool of worker processes used for batch requests by this process, and
+# the id of the process that forked it
+_workerPool = None
+_workerPoolPid = None
+_workerPoolLock = threading.Lock()
+
+def getWorkerPool():
+    """
+    Return the pool of worker processes for spreading the work of batch
+    requests, or ``None`` if ``settings.DATABASE_WORKER_PROCESSES`` is not
+    set. The pool is forked from this process the first time this is called
+    in it, so the workers share its copy of the database; each task then
+    brings the worker's copy up to date by calling loadDatabase() itself.
+    
+    Locks held by other threads at the time of the fork stay held forever in
+    the workers, so the pool should be forked before this process starts any
+    threads. startDeferredWork() does so in every process using a database
+    loaded by preloadDatabase(); otherwise the pool is forked when first
+    needed.
+    """
+    global _workerPool, _workerPoolPid
+    processes = getattr(settings, 'DATABASE_WORKER_PROCESSES', 0)
+    if not processes or multiprocessing.current_process().daemon:
+        # Worker processes can't have workers of their own
+        return None
+    with _workerPoolLock:
+        if _workerPoolPid != os.getpid():
+            # A pool inherited from the parent process belongs to the parent,
+            # so it can't be used (or shut down) from here
+            print "Forking {0:d} worker processes from process {1:d}".format(processes, os.getpid())
+            _workerPool = multiprocessing.Pool(processes)
+            _workerPoolPid = os.getpid()
+            atexit.register(stopWorkerPool)
+        return _workerPool
+
+def stopWorkerPool():
+    """
+    Stop the worker processes of the pool forked by this process, if any,
+    and wait for them to exit.
+    """
+    global _workerPool, _workerPoolPid
+    with _workerPoolLock:
+        if _workerPool is None or _workerPoolPid != os.getpid():
+            return
+        pool = _workerPool
+        _workerPool = None
+        _workerPoolPid = None
+    pool.terminate()
+    pool.join()
+
+def mapInWorkerPool(function, items):
+    """
+    Return the list of results of calling the module-level `function` for
+    each of the given `items`, in the worker pool if there is one.
+    """
+    pool = getWorkerPool()
+    if pool is None or len(items) < 2:
+        return map(function, items)
+    return pool.map(function, items)
+
+def getThermoDictionary(thermo, format='json'):
+    """
+    Return a dictionary describing the thermodynamics model `thermo` that can
+    be converted to JSON. In the default `format`, this gives the enthalpy
+    and entropy of formation at 298 K and the heat capacity at a range of
+    temperatures, all in SI units; if `format` is ``'nasa'``, the model is
+    converted to NASA polynomials, and their coefficients are given instead.
+    """
+    result = {'model': thermo.__class__.__name__, 'comment': getattr(thermo, 'comment', '')}
+    if format == 'nasa':
+        if not isinstance(thermo, NASA):
+            if isinstance(thermo, ThermoData):
+                thermo = thermo.toWilhoit()
+            thermo = thermo.toNASA(Tmin=298.0, Tmax=3000.0, Tint=1000.0)
+        result['polynomials'] = [{
+            'Tmin': polynomial.Tmin.value_si,
+            'Tmax': polynomial.Tmax.value_si,
+            'coeffs': [polynomial.cm2, polynomial.cm1, polynomial.c0, polynomial.c1,
+                       polynomial.c2, polynomial.c3, polynomial.c4, polynomial.c5, polynomial.c6],
+        } for polynomial in thermo.polynomials]
+    else:
+        result['H298'] = thermo.getEnthalpy(298.0)
+        result['S298'] = thermo.getEntropy(298.0)
+        result['Cp'] = [[T, thermo.getHeatCapacity(T)] for T in [300.0, 400.0, 500.0, 600.0, 800.0, 1000.0, 1500.0]]
+    return result
+
+def estimateThermo(item):
+    """
+    Return a list of dictionaries describing all of the thermodynamics data
+    in the database for the species with the adjacency list given in `item`,
+    an (adjacency list, format) pair, with their sources; the thermo itself
+    is described by :func:`getThermoDictionary()` in the given format. This
+    runs in the worker processes of batch thermo requests, using the copy
+    of the database inherited from the process that forked them, brought up
+    to date first.
+    """
+    adjlist, format = item
+    database = loadDatabase('thermo')
+    species = Species(molecule=[Molecule().fromAdjacencyList(adjlist)])
+    results = []
+    for data, library, entry in getAllThermoData(species, database):
+        if library is None:
+            source, label, index = 'Group additivity', None, None
+        elif library in database.thermo.depository.values():
+            source, label, index = 'Depository', library.label, entry.index
+        else:
+            source, label, index = library.name, library.label, entry.index
+        results.append({
+            'source': source,
+            'library': label,
+            'index': index,
+            'thermo': getThermoDictionary(data, format),
+        })
+    return results
+
+def moleculeFromIdentifier(identifier):
+    """
+    Return the :class:`Molecule` given by `identifier`, a SMILES string or an
+    adjacency list (in which lines may be separated by semicolons, as in
+    URLs).
+    """
+    if '\n' in identifier or ';' in identifier or '{' in identifier:
+        return Molecule().fromAdjacencyList(str(identifier.replace(';', '\n')))
+    else:
+        return Molecule().fromSMILES(str(identifier))
+
+def addUniqueMolecule(molecule, unique, buckets):
+    """
+    Return the index in the list `unique` of the molecule that is the same as
+    the given `molecule` (or a resonance isomer of it), appending it to the
+    list if there is none. `buckets` is a dictionary, shared by the calls for
+    the same list, of the indices and resonance isomers of the molecules in
+    the list by their keys.
+    """
+    bucket = buckets.setdefault(getMoleculeKey(molecule), [])
+    for index, isomers in bucket:
+        if any([isomer.isIsomorphic(molecule) for isomer in isomers]):
+            return index
+    index = len(unique)
+    unique.append(molecule)
+    bucket.append((index, molecule.generateResonanceIsomers()))
+    return index
+
+def estimateThermoBatch(identifiers, format='json'):
+    """
+    Return a list of the thermodynamics data in the database for each of the
+    species given in `identifiers`, a list of SMILES strings or adjacency
+    lists (in which lines may be separated by semicolons, as in URLs). Each
+    item of the list is a dictionary giving the `input` identifier, and
+    either the `thermo` (as returned by :func:`estimateThermo()`) or an
+    `error`. Each distinct species is only estimated once, and the work is
+    spread over the worker pool if there is one.
+    """
+    # Make sure the thermo database is loaded before forking any workers
+    loadDatabase('thermo')
+    results = []
+    unique = []
+    buckets = {}
+    for identifier in identifiers:
+        result = {'input': identifier}
+        results.append(result)
+        try:
+            molecule = moleculeFromIdentifier(identifier)
+        except Exception, e:
+            result['error'] = 'Invalid species: {0}'.format(e)
+            continue
+        result['index'] = addUniqueMolecule(molecule, unique, buckets)
+
+    items = [(molecule.toAdjacencyList(), format) for molecule in unique]
+    thermo = mapInWorkerPool(estimateThermo, items)
+    for result in results:
+        if 'index' in result:
+            result['thermo'] = thermo[result.pop('index')]
+    return results
+        
+################################################################################
+
+def getSpeciesListKey(speciesList):
+    """
+    Return a key identifying the given list of :class:`Species` (or
+    :class:`Molecule`) objects `speciesList` regardless of their order, made
+    from the keys of the individual species (see :func:`getSpeciesKey()`).
+    """
+    return tuple(sorted([getSpeciesKey(species) for species in speciesList]))
+
+def isSameSpeciesList(speciesList1, speciesList2):
+    """
+    Return ``True`` if the two lists of :class:`Species` (or
+    :class:`Molecule`) objects contain isomorphic species, regardless of
+    their order, or ``False`` if not.
+    """
+    if len(speciesList1) != len(speciesList2):
+        return False
+    remaining = list(speciesList2)
+    for species1 in speciesList1:
+        for species2 in remaining:
+            if species1.isIsomorphic(species2):
+                remaining.remove(species2)
+                break
+        else:
+            return False
+    return True
+
+def getFamiliesKey(only_families):
+    """
+    Return a key identifying the `only_families` argument of
+    :func:`generateReactions()`, which may be ``None``, a list of family
+    labels, or a string (in which the labels are looked for as substrings).
+    """
+    if only_families is None or isinstance(only_families, basestring):
+        return only_families
+    return tuple(sorted(only_families))
+
+def getReactionKey(reaction):
+    """
+    Return a key identifying the given `reaction` regardless of the order of
+    its reactants and products and of its direction, made from the keys of
+    its species (see :func:`getSpeciesKey()`). Isomorphic reactions have the
+    same key, as :meth:`Reaction.isIsomorphic` also ignores the direction.
+    """
+    return tuple(sorted([getSpeciesListKey(reaction.reactants), getSpeciesListKey(reaction.products)]))
+
+class ReactionIndex(object):
+    """
+    A collection of reactions, each with an associated value, that can be
+    searched for a reaction isomorphic to a given one. The reactions are
+    grouped by key (see :func:`getReactionKey()`), so only those sharing a
+    key with the given reaction are tested for isomorphism.
+    """
+
+    def __init__(self, items=None):
+        self.buckets = {}
+        self.count = 0
+        for reaction, value in items or []:
+            self.add(reaction, value)
+
+    def __len__(self):
+        return self.count
+
+    def find(self, reaction):
+        """
+        Return a (reaction, value) pair for a reaction in the index that is
+        isomorphic to the given `reaction`, or ``None`` if there is none.
+        """
+        for item in self.buckets.get(getReactionKey(reaction), []):
+            if reaction.isIsomorphic(item[0]):
+                return item
+        return None
+
+    def add(self, reaction, value=None, unique=False):
+        """
+        Add the given `reaction` to the index with the given `value`. If
+        `unique` is ``True``, the reaction is only added if there is no
+        isomorphic reaction in the index already. Returns the (reaction,
+        value) pair for the isomorphic reaction already in the index, or
+        ``None`` if there was none.
+        """
+        key = getReactionKey(reaction)
+        bucket = self.buckets.setdefault(key, [])
+        if unique:
+            for item in bucket:
+                if reaction.isIsomorphic(item[0]):
+                    return item
+        bucket.append((reaction, value))
+        self.count += 1
+        return None
+
+def deduplicateReactions(reactionList):
+    """
+    Return a list of the unique reactions in `reactionList`, i.e. the first
+    of each set of isomorphic reactions, in their original order, and a list
+    of the number of reactions in `reactionList` isomorphic to each.
+    """
+    index = ReactionIndex()
+    uniqueReactionList = []
+    uniqueReactionCount = []
+    for reaction in reactionList:
+        item = index.add(reaction, len(uniqueReactionList), unique=True)
+        if item is None:
+            uniqueReactionList.append(reaction)
+            uniqueReactionCount.append(1)
+        else:
+            uniqueReactionCount[item[1]] += 1
+    return uniqueReactionList, uniqueReactionCount
+
+# The index of the entries in each kinetics depository by reaction, and the
+# entries it was built from
+_reactionIndexes = weakref.WeakKeyDictionary()
+
+def getDepositoryReactionIndex(depository):
+    """
+    Return a :class:`ReactionIndex` of the reactions of the entries in the
+    given kinetics `depository`, with the entries as the values. The index is
+    kept until the entries of the depository change.
+    """
+    if type(depository) is LazyDatabase:
+        # Index the real depository, which outlives the stand-in
+        depository = depository._materialize()
+    state = tuple([id(entry.item) for entry in depository.entries.values()])
+    try:
+        state0, index = _reactionIndexes[depository]
+        if state0 == state:
+            return index
+    except KeyError:
+        pass
+    index = ReactionIndex([(entry.item, entry) for entry in depository.entries.values()])
+    _reactionIndexes[depository] = (state, index)
+    return index
+
+################################################################################
+
+# Bump this whenever a change to the website or to RMG-Py would make previously
+# saved lists of untrained reactions unusable
+UNTRAINED_VERSION = 1
+
+# The untrained reactions of each kinetics family, as (key, computed, reactions)
+untrainedCache = createCache('untrained', 1000, generation=getDatabaseGeneration)
+
+_untrainedLock = threading.Lock()
+_untrainedLocks = {}
+_untrainedThread = None
+
+# The key of the untrained reactions of each kinetics family object
+_untrainedKeys = weakref.WeakKeyDictionary()
+
+def getUntrainedReactionsKey(family):
+    """
+    Return a string identifying the state on disk of the depositories of the
+    given kinetics `family`, made from the modification times of their files.
+    This is only worked out the first time it is needed for each family
+    object, as reloading the family replaces the object.
+    """
+    key = _untrainedKeys.get(family)
+    if key is None:
+        key = _untrainedKeys[family] = getUntrainedReactionsKeyFromDisk(family)
+    return key
+
+def getUntrainedReactionsKeyFromDisk(family):
+    """
+    Return the key of the untrained reactions of the given kinetics `family`
+    (see :func:`getUntrainedReactionsKey()`), walking its depository
+    directory to find the modification times of the files.
+    """
+    dirpath = os.path.join(settings.DATABASE_PATH, 'kinetics', 'families', family.label, 'depository')
+    state = []
+    for root, dirs, files in os.walk(dirpath):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                state.append((os.path.relpath(path, dirpath), os.path.getmtime(path)))
+    return '{0}-v{1:d}'.format(hashlib.sha1(repr(state)).hexdigest(), UNTRAINED_VERSION)
+
+def getUntrainedReactionsPath(family, key):
+    """
+    Return the path of the file holding the untrained reactions of the given
+    kinetics `family` for the given `key`, or ``None`` if such files are
+    disabled.
+    """
+    cachePath = getattr(settings, 'DATABASE_CACHE_PATH', None)
+    if not cachePath:
+        return None
+    return os.path.join(cachePath, 'untrained', '{0}-{1}.pkl'.format(family.label, key))
+
+def loadUntrainedReactions(family, key):
+    """
+    Return the (computed, reactions) pair saved for the given kinetics
+    `family` and `key`, or ``None`` if nothing usable was saved.
+    """
+    path = getUntrainedReactionsPath(family, key)
+    if path is None or not os.path.exists(path):
+        return None
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        f = open(path, 'rb')
+        try:
+            computed, reactions = cPickle.load(f)
+        finally:
+            f.close()
+    except Exception, e:
+        print >> sys.stderr, 'Unable to load untrained reactions {0}: {1}'.format(path, e)
+        sys.stderr.flush()
+        return None
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    return computed, reactions
+
+def saveUntrainedReactions(family, key, computed, reactions):
+    """
+    Save the untrained `reactions` of the given kinetics `family`, computed
+    at time `computed`, for the given `key`, replacing any saved for other
+    keys. As with database snapshots, the file is written under a temporary
+    name and renamed into place.
+    """
+    path = getUntrainedReactionsPath(family, key)
+    if path is None:
+        return
+    dirpath = os.path.dirname(path)
+    tempPath = '{0}.{1:d}.tmp'.format(path, os.getpid())
+    recursionLimit = sys.getrecursionlimit()
+    sys.setrecursionlimit(max(recursionLimit, 10000))
+    try:
+        if not os.path.isdir(dirpath):
+            os.makedirs(dirpath)
+        f = open(tempPath, 'wb')
+        try:
+            cPickle.dump((computed, reactions), f, cPickle.HIGHEST_PROTOCOL)
+        finally:
+            f.close()
+        os.rename(tempPath, path)
+    except Exception, e:
+        print >> sys.stderr, 'Unable to save untrained reactions {0}: {1}'.format(path, e)
+        sys.stderr.flush()
+        if os.path.exists(tempPath):
+            os.remove(tempPath)
+        return
+    finally:
+        sys.setrecursionlimit(recursionLimit)
+    # Remove the files saved for older versions of the family
+    prefix = '{0}-'.format(family.label)
+    for name in os.listdir(dirpath):
+        if name.startswith(prefix) and name.endswith('.pkl') and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(dirpath, name))
+            except OSError:
+                pass
+
+def computeUntrainedReactions(family):
+    """
+    Return a list of the unique reactions in the depositories of the given
+    kinetics `family` for which no training data exists, sorted by the
+    number of heavy atoms in the reactants.
+    """
+    # Load training depository
+    for depository in family.depositories:
+        if 'training' in depository.label:
+            training = depository
+            break
+    else:
+        raise Exception('Could not find training depository in {0} family.'.format(family.label))
+    
+    # Load trained reactions
+    trainedReactions = getDepositoryReactionIndex(training)
+    
+    # Load untrained reactions
+    untrainedReactions = []
+    untrainedReactionIndex = ReactionIndex()
+    for depository in family.depositories:
+        if 'training' not in depository.label and 'untrained' not in depository.label:
+            for entry in depository.entries.values():
+                if trainedReactions.find(entry.item) is None:
+                    if untrainedReactionIndex.add(entry.item, unique=True) is None:
+                        untrainedReactions.append(entry.item)
+    
+    # Sort reactions by reactant size
+    untrainedReactions.sort(key=lambda reaction: sum([1 for r in reaction.reactants for a in r.atoms if a.isNonHydrogen()]))
+    
+    return untrainedReactions
+
+def getUntrainedReactions(family, wait=True):
+    """
+    Return a (computed, reactions) pair of the unique reactions in the
+    depositories of the given kinetics `family` for which no training data
+    exists, and the time (in seconds since the epoch) at which they were
+    computed. These are computed once per family and database generation,
+    and saved to disk for as long as the depository files are unchanged.
+    If they are not available and `wait` is ``False``, ``None`` is returned
+    instead of computing them.
+    """
+    key = getUntrainedReactionsKey(family)
+    generation = getDatabaseGeneration()
+    value = untrainedCache.get(family.label)
+    if value is not None and value[0] == key:
+        return value[1:]
+    
+    with _untrainedLock:
+        lock = _untrainedLocks.setdefault(family.label, threading.Lock())
+    if not lock.acquire(wait):
+        return None
+    try:
+        # Another thread might have computed them while we were waiting
+        value = untrainedCache.peek(family.label)
+        if value is not None and value[0] == key:
+            return value[1:]
+        result = loadUntrainedReactions(family, key)
+        if result is None:
+            if not wait:
+                return None
+            started = time.time()
+            reactions = computeUntrainedReactions(family)
+            result = (time.time(), reactions)
+            print "Computed untrained reactions of {0} in process {1} ({2:.1f} s)".format(family.label, os.getpid(), result[0] - started)
+            saveUntrainedReactions(family, key, result[0], result[1])
+        untrainedCache.set(family.label, (key,) + result, generation)
+        return result
+    finally:
+        lock.release()
+
+def computeAllUntrainedReactions(database):
+    """
+    Compute (or load from disk) the untrained reactions of every kinetics
+    family in the given `database`.
+    """
+    for label, family in sorted(database.kinetics.families.items()):
+        try:
+            getUntrainedReactions(family)
+        except Exception:
+            traceback.print_exc()
+            sys.stderr.flush()
+
+def computeUntrainedReactionsInBackground(database):
+    """
+    Start computing the untrained reactions of every kinetics family in the
+    given `database` in a background thread, unless that is already running
+    or ``settings.DATABASE_PRECOMPUTE_UNTRAINED`` is not set.
+    """
+    global _untrainedThread
+    if not getattr(settings, 'DATABASE_PRECOMPUTE_UNTRAINED', False) or _preloading:
+        return
+    if multiprocessing.current_process().daemon:
+        # Leave this to the process serving the pages that show them
+        return
+    with _untrainedLock:
+        if _untrainedThread is not None and _untrainedThread.is_alive():
+            return
+        _untrainedThread = threading.Thread(target=computeAllUntrainedReactions, args=(database,))
+        _untrainedThread.setDaemon(True)
+        _untrainedThread.start()
+
+################################################################################
+
+# The temperatures in K at which the rate coefficients of the entries of the
+# kinetics group trees are shown
+KINETICS_TREE_TEMPERATURES = [300, 400, 500, 600, 800, 1000, 1500, 2000]
+
+def getArrheniusParameters(kinetics):
+    """
+    Return the parameters (A, n, Ea, T0) in SI units with which the rate
+    coefficient of the given `kinetics` model is A * (T/T0)**n * exp(-Ea/RT),
+    or ``None`` if it is not an Arrhenius model. :class:`ArrheniusEP` models
+    are taken at a heat of reaction of zero.
     """
     try:
-        # If path doesn't denote a file and were previously
-        # tracking it, then it has been removed or the file type
-        # has changed, so return True.
-        if not os.path.isfile(path):
-            return path in _timestamps
-        
-        # If path wasn't being tracked then it's new, so return True
-        mtime = os.stat(path).st_mtime
-        if path not in _timestamps:
-            return True
-        
-        # Force restart when modification time has changed, even
-        # if time now older, as that could indicate older file
-        # has been restored.
-        if mtime != _timestamps[path]:
-            return True
-    except:
-        # for debugging, raise the exception
-        # If any exception occured, likely that file has been
-        # been removed just before stat(), so force a restart.
-        raise
-        return True
-    # passed all tests
-    return False
+        if isinstance(kinetics, Arrhenius):
+            return kinetics.A.value_si, kinetics.n.value_si, kinetics.Ea.value_si, kinetics.T0.value_si
+        elif isinstance(kinetics, ArrheniusEP):
+            return kinetics.A.value_si, kinetics.n.value_si, kinetics.E0.value_si, 1.0
+    except AttributeError:
+        pass
+    return None
 
-def isDirModified(dirpath):
+def getRateCoefficient(kinetics, T):
     """
-    Returns True if anything in the directory at dirpath has been modified since resetDirTimestamps(dirpath).
+    Return the rate coefficient in SI units of the given `kinetics` model at
+    temperature `T` in K and 1 bar (or, for :class:`ArrheniusEP` models, a
+    heat of reaction of zero).
     """
-    to_check = set([path for path in _timestamps if path.startswith(dirpath)])
-    for root, dirs, files in os.walk(dirpath):
-        for name in files:
-            path = os.path.join(root,name)
-            if isFileModified(path):
-                return True
-            to_check.remove(path)
-    # If there's anything left in to_check, it's probably now gone and this will return True:
-    for path in to_check:
-        if isFileModified(path):
-            return True
-    # Passed all tests.
-    return False
+    if isinstance(kinetics, ArrheniusEP):
+        return kinetics.getRateCoefficient(T, 0.0)
+    return kinetics.getRateCoefficient(T, P=1e5)
 
-################################################################################
+def evaluateRateCoefficientsLog10(kineticsList, Tdata):
+    """
+    Return an array of log10 of the rate coefficient in SI units of each of
+    the kinetics models in `kineticsList` (rows) at each of the temperatures
+    in K in `Tdata` (columns). Arrhenius models are evaluated all at once;
+    other models, and any model whose vectorized values disagree with its
+    own method, are evaluated one temperature at a time. Rows for models
+    that are ``None`` are ``nan``.
+    """
+    Tdata = numpy.asarray(Tdata, dtype=float)
+    logk = numpy.empty((len(kineticsList), len(Tdata)))
+    logk.fill(numpy.nan)
+    
+    rows = []
+    parameters = []
+    for i, kinetics in enumerate(kineticsList):
+        params = getArrheniusParameters(kinetics)
+        if params is not None:
+            rows.append(i)
+            parameters.append(params)
+    if rows:
+        A, n, Ea, T0 = [values[:,numpy.newaxis] for values in numpy.array(parameters, dtype=float).T]
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            logk[rows,:] = numpy.log10(A) + n * numpy.log10(Tdata / T0) - Ea / (constants.R * Tdata * math.log(10))
+    
+    vectorized = set(rows)
+    j = len(Tdata) / 2
+    for i, kinetics in enumerate(kineticsList):
+        if kinetics is None or len(Tdata) == 0:
+            continue
+        if i in vectorized:
+            # Check against the model itself at one temperature
+            exact = numpy.log10(getRateCoefficient(kinetics, Tdata[j]))
+            if abs(logk[i,j] - exact) <= 1e-6 * max(abs(exact), 1.0):
+                continue
+        logk[i,:] = numpy.log10([getRateCoefficient(kinetics, T) for T in Tdata])
+    return logk
 
-def loadDatabase(component='', section=''):
+def getKineticsTreeRates(database):
     """
-    Load the requested `component` of the RMG database if modified since last loaded.
+    Return a dictionary mapping the index of each entry in the tree of the
+    given kinetics groups `database` to an array of log10 of its rate
+    coefficient at each of the ``KINETICS_TREE_TEMPERATURES``. The arrays are
+    the rows of a single array evaluated for the whole tree at once.
     """
-    global database
-    if not database:
-        database = RMGDatabase()
-        database.thermo = ThermoDatabase()
-        database.kinetics = KineticsDatabase()
-        database.loadForbiddenStructures(os.path.join(settings.DATABASE_PATH, 'forbiddenStructures.py'))
-
-    if component in ['thermo', '']:
-        if section in ['depository', '']:
-            dirpath = os.path.join(settings.DATABASE_PATH, 'thermo', 'depository')
-            if isDirModified(dirpath):
-                database.thermo.loadDepository(dirpath)
-                resetDirTimestamps(dirpath)
-        if section in ['libraries', '']:
-            dirpath = os.path.join(settings.DATABASE_PATH, 'thermo', 'libraries')
-            if isDirModified(dirpath):
-                database.thermo.loadLibraries(dirpath)
-                # put them in our preferred order, so that when we look up thermo in order to estimate kinetics,
-                # we use our favourite values first.
-                preferred_order = ['primaryThermoLibrary','DFT_QCI_thermo','GRI-Mech3.0','CBS_QB3_1dHR','KlippensteinH2O2']
-                new_order = [i for i in preferred_order if i in database.thermo.libraryOrder]
-                for i in database.thermo.libraryOrder:
-                    if i not in new_order: new_order.append(i) 
-                database.thermo.libraryOrder = new_order
-                resetDirTimestamps(dirpath)
-        if section in ['groups', '']:
-            dirpath = os.path.join(settings.DATABASE_PATH, 'thermo', 'groups')
-            if isDirModified(dirpath):
-                database.thermo.loadGroups(dirpath)
-                resetDirTimestamps(dirpath)
-    if component in ['kinetics', '']:
-        if section in ['libraries', '']:
-            dirpath = os.path.join(settings.DATABASE_PATH, 'kinetics', 'libraries')
-            if isDirModified(dirpath):
-                database.kinetics.loadLibraries(dirpath)
-                resetDirTimestamps(dirpath)
-        if section in ['families', '']:
-            dirpath = os.path.join(settings.DATABASE_PATH, 'kinetics', 'families')
-            if isDirModified(dirpath):
-                database.kinetics.loadFamilies(dirpath)
-                resetDirTimestamps(dirpath)
+    entries = []
+    stack = list(reversed(database.top))
+    while stack:
+        entry = stack.pop()
+        entries.append(entry)
+        stack.extend(reversed(entry.children))
+    logk = evaluateRateCoefficientsLog10([entry.data for entry in entries], KINETICS_TREE_TEMPERATURES)
+    return dict([(entry.index, logk[i]) for i, entry in enumerate(entries)])
 
-    return database
+################################################################################
 
-def getThermoDatabase(section, subsection):
+# The temperatures in K at which the reverse rate coefficients of reactions are
+# evaluated to fit Arrhenius expressions to, as RMG-Py does
+REVERSE_KINETICS_TEMPERATURES = 1.0 / numpy.arange(0.0005, 0.0035, 0.0001)
+
+# The units of the rate coefficient of a reaction with each number of reactants
+RATE_COEFFICIENT_UNITS = {1: 's^-1', 2: 'm^3/(mol*s)', 3: 'm^6/(mol^2*s)'}
+
+# The fitted reverse kinetics of recent reactions, by the forward kinetics and
+# the thermo of the reactants and products
+reverseKineticsCache = createCache('reverseKinetics', getattr(settings, 'REVERSE_KINETICS_CACHE_SIZE', 10000), generation=getDatabaseGeneration)
+
+def getReverseKineticsKey(reaction):
     """
-    Return the component of the thermodynamics database corresponding to the
-    given `section` and `subsection`. If either of these is invalid, a
-    :class:`ValueError` is raised.
+    Return a key identifying the reverse kinetics of the given `reaction`,
+    made from its forward kinetics and the thermo of its reactants and
+    products, or ``None`` if any of those has no thermo.
     """
-    global database
+    thermo = []
+    for speciesList in [reaction.reactants, reaction.products]:
+        thermo.append([])
+        for species in speciesList:
+            if getattr(species, 'thermo', None) is None:
+                return None
+            thermo[-1].append(repr(species.thermo))
+    return (repr(reaction.kinetics), tuple(thermo[0]), tuple(thermo[1]))
 
-    try:
-        if section == 'depository':
-            db = database.thermo.depository[subsection]
-        elif section == 'libraries':
-            db = database.thermo.libraries[subsection]
-        elif section == 'groups':
-            db = database.thermo.groups[subsection]
+def fitReverseArrheniusKinetics(reactionList):
+    """
+    Return a list of the Arrhenius expressions fitted to the reverse rate
+    coefficients of each of the given reactions with :class:`Arrhenius`
+    kinetics, as :meth:`Reaction.generateReverseRateCoefficient()` does. The
+    forward rate coefficients and equilibrium constants of all of the
+    reactions are evaluated as arrays at once, using the free energy of each
+    distinct species thermo once. Reactions whose values disagree with
+    their own methods are reversed by them instead.
+    """
+    Tlist = REVERSE_KINETICS_TEMPERATURES
+    R = constants.R
+    P0 = 1e5
+    
+    # Evaluate the free energy of each distinct species thermo
+    freeEnergies = {}
+    dGrxn = numpy.zeros((len(reactionList), len(Tlist)))
+    for i, reaction in enumerate(reactionList):
+        for species, sign in [(species, -1) for species in reaction.reactants] + [(species, 1) for species in reaction.products]:
+            key = repr(species.thermo)
+            if key not in freeEnergies:
+                freeEnergies[key] = evaluateThermo(species.thermo, Tlist)[3]
+            dGrxn[i,:] += sign * freeEnergies[key]
+    dN = numpy.array([len(reaction.products) - len(reaction.reactants) for reaction in reactionList], dtype=float)
+    
+    # Evaluate ln(kf) and ln(Kc) for every reaction and temperature
+    A, n, Ea, T0 = [values[:,numpy.newaxis] for values in numpy.array([getArrheniusParameters(reaction.kinetics) for reaction in reactionList], dtype=float).T]
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        lnkf = numpy.log(A) + n * numpy.log(Tlist / T0) - Ea / (R * Tlist)
+        lnKc = -dGrxn / (R * Tlist) + dN[:,numpy.newaxis] * numpy.log(P0 / (R * Tlist))
+        klist = numpy.exp(lnkf - lnKc)
+    
+    j = len(Tlist) / 2
+    reverseKineticsList = []
+    for i, reaction in enumerate(reactionList):
+        kf = reaction.kinetics
+        # Check against the reaction itself at one temperature
+        exact = kf.getRateCoefficient(Tlist[j]) / reaction.getEquilibriumConstant(Tlist[j])
+        if numpy.all(numpy.isfinite(klist[i])) and abs(klist[i,j] - exact) <= 1e-6 * abs(exact):
+            kr = Arrhenius()
+            kr.fitToData(Tlist, klist[i], RATE_COEFFICIENT_UNITS[len(reaction.products)], kf.T0.value_si)
         else:
-            raise ValueError('Invalid value "%s" for section parameter.' % section)
-    except KeyError:
-        raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
-    return db
+            kr = reaction.generateReverseRateCoefficient()
+        reverseKineticsList.append(kr)
+    return reverseKineticsList
 
-def getKineticsDatabase(section, subsection):
+def generateReverseKinetics(reactionList):
     """
-    Return the component of the kinetics database corresponding to the
-    given `section` and `subsection`. If either of these is invalid, a
-    :class:`ValueError` is raised.
+    Return a list of the kinetics of the reverse of each of the given
+    reactions, as :meth:`Reaction.generateReverseRateCoefficient()` would
+    return. The reactants and products of each reaction must have thermo.
+    The reactions with :class:`Arrhenius` kinetics are reversed together by
+    :func:`fitReverseArrheniusKinetics()`, and the results are cached by the
+    forward kinetics and the thermo of the species; each call returns its
+    own copies of them.
     """
-    global database
-    
-    db = None
-    try:
-        if section == 'libraries':
-            db = database.kinetics.libraries[subsection]
-        elif section == 'families':
-            subsection = subsection.split('/')
-            if subsection[0] != '' and len(subsection) == 2:
-                family = database.kinetics.families[subsection[0]]
-                if subsection[1] == 'groups':
-                    db = family.groups
-                elif subsection[1] == 'rules':
-                    db = family.rules
-                else:
-                    label = '{0}/{1}'.format(family.label, subsection[1])
-                    db = (d for d in family.depositories if d.label==label).next()
+    generation = reverseKineticsCache.getGeneration()
+    reverseKineticsList = [None] * len(reactionList)
+    pending = []
+    for index, reaction in enumerate(reactionList):
+        key = getReverseKineticsKey(reaction)
+        if key is None:
+            reverseKineticsList[index] = reaction.generateReverseRateCoefficient()
+            continue
+        kinetics = reverseKineticsCache.get(key)
+        if kinetics is not None:
+            reverseKineticsList[index] = copy.deepcopy(kinetics)
         else:
-            raise ValueError('Invalid value "%s" for section parameter.' % section)
-    except (KeyError, StopIteration):
-        raise ValueError('Invalid value "%s" for subsection parameter.' % subsection)
-    return db
+            pending.append((index, key))
+    
+    arrhenius = [(index, key) for index, key in pending if type(reactionList[index].kinetics) is Arrhenius]
+    others = [(index, key) for index, key in pending if type(reactionList[index].kinetics) is not Arrhenius]
+    kineticsList = fitReverseArrheniusKinetics([reactionList[index] for index, key in arrhenius]) if arrhenius else []
+    kineticsList.extend([reactionList[index].generateReverseRateCoefficient() for index, key in others])
+    for (index, key), kinetics in zip(arrhenius + others, kineticsList):
+        reverseKineticsCache.set(key, kinetics, generation)
+        reverseKineticsList[index] = copy.deepcopy(kinetics)
+    
+    return reverseKineticsList
 
 ################################################################################
 
-def generateSpeciesThermo(species, database):
+# The reactions generated from the database for recent searches; each value
+# is a list of (reactants, products, reactions) for the searches sharing a
+# key, and its size is the number of reactions in it
+reactionCache = createCache('reactions', getattr(settings, 'REACTION_CACHE_SIZE', 20000),
+                            getsize=lambda bucket: sum([len(reactionList) + 1 for reactants, products, reactionList in bucket]),
+                            generation=getDatabaseGeneration)
+
+def copyReactions(reactionList):
     """
-    Generate the thermodynamics data for a given :class:`Species` object
-    `species` using the provided `database`.
+    Return a list of shallow copies of the reactions in `reactionList`, with
+    their own lists of reactants and products, so that callers can replace
+    e.g. their kinetics without affecting the originals.
     """
-    species.generateResonanceIsomers()
-    species.thermo = database.thermo.getThermoData(species)
-        
-################################################################################
+    reactionList0 = reactionList; reactionList = []
+    for reaction in reactionList0:
+        reaction = copy.copy(reaction)
+        reaction.reactants = reaction.reactants[:]
+        reaction.products = reaction.products[:]
+        reactionList.append(reaction)
+    return reactionList
 
 def generateReactions(database, reactants, products=None, only_families=None):
     """
@@ -246,27 +2259,300 @@ def generateReactions(database, reactants, products=None, only_families=None):
     returned, with a reaction for each matching kinetics entry in any part of
     the database. This means that the same reaction may appear multiple times
     with different kinetics in the output. If the RMG-Java server is running,
-    this function will also query it for reactions and kinetics.
+    this function will also query it for reactions and kinetics, in the
+    background while the RMG-Py database is searched.
     If `only_families` is a list of strings, only those labeled families are 
     used: no libraries and no RMG-Java kinetics are returned.
+    
+    The reactions found in the database are cached by the reactants,
+    products and families searched (in any order) until the database is
+    reloaded; each call returns its own copies of them.
     """
+    if only_families is None:
+        # Not restricted to certain families, so also check RMG-Java, which
+        # is queried while the RMG-Py database is searched
+        query = startRMGJavaKinetics(reactants)
     
-    # get RMG-py reactions
-    reactionList = []
+    reactionList = generateDatabaseReactions(database, reactants, products, only_families)
+    
+    # get RMG-java reactions
     if only_families is None:
-        # Not restricted to certain families, so also check libraries.
-        reactionList.extend(database.kinetics.generateReactionsFromLibraries(reactants, products))
-    reactionList.extend(database.kinetics.generateReactionsFromFamilies(reactants, products, only_families=only_families))
+        rmgJavaReactionList = getRMGJavaKinetics(reactants, products, query)
+    else:
+        rmgJavaReactionList = []
+    
+    return reactionList, rmgJavaReactionList
+
+def generateDatabaseReactions(database, reactants, products=None, only_families=None, libraries=True, families=True):
+    """
+    Return a list of the reactions (and associated kinetics) for a given set
+    of `reactants` and an optional set of `products` found in the RMG-Py
+    database, as :func:`generateReactions()` does, but without querying
+    RMG-Java. If `libraries` or `families` is ``False``, the reactions from
+    the kinetics libraries or families respectively are left out. The
+    results are cached as described for :func:`generateReactions()`.
+    """
+    key = (getSpeciesListKey(reactants),
+           getSpeciesListKey(products) if products is not None else None,
+           getFamiliesKey(only_families), libraries, families)
+    generation = reactionCache.getGeneration()
+    reactionList = None
+    for reactants0, products0, reactionList0 in reactionCache.get(key, []):
+        # Species with the same key are almost always the same, but check
+        if isSameSpeciesList(reactants, reactants0) and (products is None or isSameSpeciesList(products, products0)):
+            reactionList = reactionList0
+            break
+    if reactionList is None:
+        reactionList = generateReactionsFromDatabase(database, reactants, products, only_families, libraries=libraries, families=families)
+        bucket = reactionCache.peek(key, [])
+        reactionCache.set(key, bucket + [(reactants[:], products[:] if products is not None else None, reactionList)], generation)
+    return copyReactions(reactionList)
+
+# The time taken to find the reactions from each source of kinetics, by source
+_sourceTimings = {}
+_sourceTimingsLock = threading.Lock()
+
+def recordSourceTiming(source, duration):
+    """
+    Record that finding the reactions from the given `source` of kinetics
+    (one of ``REACTION_SOURCES``) took `duration` seconds.
+    """
+    with _sourceTimingsLock:
+        timing = _sourceTimings.setdefault(source, {'source': source, 'count': 0, 'total': 0.0, 'max': 0.0, 'last': None})
+        timing['count'] += 1
+        timing['total'] += duration
+        timing['max'] = max(timing['max'], duration)
+        timing['last'] = duration
+
+def getSourceTimings():
+    """
+    Return a list of dictionaries giving, for each source of kinetics, the
+    number of times (`count`) the reactions from it were found in this
+    process, and the `total`, `mean`, `max` and `last` time in seconds that
+    took.
+    """
+    with _sourceTimingsLock:
+        timings = [dict(timing) for source, timing in sorted(_sourceTimings.items())]
+    for timing in timings:
+        timing['mean'] = timing['total'] / timing['count']
+    return timings
+
+# The sources of kinetics from which a search can find the reactions
+# separately: the kinetics libraries, the depositories of the kinetics
+# families, the rate rule and group additivity estimates of the families,
+# and RMG-Java
+REACTION_SOURCES = ['libraries', 'depositories', 'estimates', 'RMG-Java']
+
+class ReactionSearch(object):
+    """
+    A kinetics search for the reactions of a set of reactants, and
+    optionally a set of products, whose results are kept for a short time
+    so that the pages a user visits next (the kinetics of one of the
+    reactions, or a group estimate) can reuse them instead of generating the
+    reactions again. Each search is identified by a random `token`, which is
+    passed from page to page in the ``search`` query parameter.
+    
+    The reactions for a more specific search, with given products and/or
+    only certain families, are found by filtering the results of this one
+    (if the reactions from all families have already been found; otherwise
+    only those of the given families are generated); only searches with the
+    same reactants (in the same direction) can be reused like this, since
+    the families are applied to the reactants.
+    """
+
+    def __init__(self, reactants, products=None):
+        self.token = uuid.uuid4().hex
+        self.reactants = reactants[:]
+        self.products = products[:] if products is not None else None
+        self.created = time.time()
+        self.results = {}
+        self.parts = {}
+        self._lock = threading.Lock()
+        self._partLocks = {}
+
+    def matches(self, reactants, products=None):
+        """
+        Return ``True`` if the reactions for the given `reactants` and
+        `products` can be found from the results of this search.
+        """
+        if not isSameSpeciesList(reactants, self.reactants):
+            return False
+        if self.products is None:
+            return True
+        return products is not None and isSameSpeciesList(products, self.products)
+
+    def generateReactions(self, database, products=None, only_families=None):
+        """
+        Return the lists of reactions from the RMG-Py database and from
+        RMG-Java for the reactants of this search and the given `products`
+        and `only_families`, as :func:`generateReactions()` does. Each call
+        returns its own copies of the reactions.
+        """
+        if self.products is not None:
+            products = self.products
+        key = (getSpeciesListKey(products) if products is not None else None, getFamiliesKey(only_families))
+        if key not in self.results:
+            if products is not None and self.products is None:
+                # Find the reactions with these products among those with any
+                reactionList, rmgJavaReactionList = self.generateReactions(database, None, only_families)
+                self.results[key] = (
+                    [reaction for reaction in reactionList if reactionHasSpecies(reaction, self.reactants, products)],
+                    [reaction for reaction in rmgJavaReactionList if reactionHasSpecies(reaction, self.reactants, products)],
+                )
+            elif only_families is not None:
+                fullKey = (key[0], getFamiliesKey(None))
+                if fullKey in self.results:
+                    # Find the reactions from these families among those from any
+                    reactionList = self.results[fullKey][0]
+                    self.results[key] = (
+                        [reaction for reaction in reactionList
+                         if isinstance(reaction, (TemplateReaction, DepositoryReaction)) and reaction.family.label in only_families],
+                        [],
+                    )
+                else:
+                    # Only generate the reactions of these families
+                    self.results[key] = (generateDatabaseReactions(database, self.reactants, products, only_families), [])
+            else:
+                self.results[key] = generateReactions(database, self.reactants, products)
+        reactionList, rmgJavaReactionList = self.results[key]
+        return copyReactions(reactionList), copyReactions(rmgJavaReactionList)
+
+    def generateSourceReactions(self, database, source, products=None):
+        """
+        Return the list of reactions from a single `source` of kinetics (one
+        of ``REACTION_SOURCES``) for the reactants of this search and the
+        given `products`. The reactions from the depositories and from the
+        estimates of the families are generated together, once. When the
+        reactions from every source have been found, they are reused by
+        :meth:`generateReactions` too. The reactions from different sources
+        can be found by several threads at once. Each call returns its own
+        copies of the reactions.
+        """
+        if source not in REACTION_SOURCES:
+            raise ValueError('Invalid value "{0}" for source parameter.'.format(source))
+        if self.products is not None:
+            products = self.products
+        key = (getSpeciesListKey(products) if products is not None else None, getFamiliesKey(None))
+        with self._lock:
+            result = self.results.get(key)
+        if result is None:
+            part = 'families' if source in ['depositories', 'estimates'] else source
+            reactionList = self.generatePartReactions(database, key, part, products)
+        else:
+            reactionList = result[1] if source == 'RMG-Java' else result[0]
+        if source == 'libraries':
+            reactionList = [reaction for reaction in reactionList if isinstance(reaction, LibraryReaction)]
+        elif source == 'depositories':
+            reactionList = [reaction for reaction in reactionList if isinstance(reaction, DepositoryReaction)]
+        elif source == 'estimates':
+            reactionList = [reaction for reaction in reactionList if isinstance(reaction, TemplateReaction)]
+        return copyReactions(reactionList)
+
+    def generatePartReactions(self, database, key, part, products):
+        """
+        Return the list of reactions from one `part` of the search with the
+        given results `key`: ``'libraries'``, ``'families'`` or
+        ``'RMG-Java'``, generating them unless another thread already has (or
+        is). Once all three parts have been found, they are combined into the
+        results of the search. The list returned must not be modified.
+        """
+        with self._lock:
+            lock = self._partLocks.setdefault((key, part), threading.Lock())
+        with lock:
+            with self._lock:
+                parts = self.parts.setdefault(key, {})
+                reactionList = parts.get(part)
+            if reactionList is None:
+                if part == 'libraries':
+                    reactionList = generateDatabaseReactions(database, self.reactants, products, families=False)
+                elif part == 'families':
+                    reactionList = generateDatabaseReactions(database, self.reactants, products, libraries=False)
+                else:
+                    reactionList = getRMGJavaKinetics(self.reactants, products)
+                with self._lock:
+                    parts[part] = reactionList
+                    if len(parts) == 3:
+                        self.results[key] = (parts['libraries'] + parts['families'], parts['RMG-Java'])
+                        self.parts.pop(key, None)
+                        for name in ['libraries', 'families', 'RMG-Java']:
+                            self._partLocks.pop((key, name), None)
+        return reactionList
+
+# The recent kinetics searches in this process, by token
+reactionSearchCache = createCache('searches', getattr(settings, 'REACTION_SEARCH_CACHE_SIZE', 1000), generation=getDatabaseGeneration)
+
+def getReactionSearch(token, reactants, products=None):
+    """
+    Return the recent :class:`ReactionSearch` with the given `token` if there
+    is one in this process and it can be reused for the given `reactants`
+    and `products`, or else a new search for them. Searches expire after
+    ``settings.REACTION_SEARCH_TIMEOUT`` seconds, and when the database is
+    reloaded.
+    """
+    search = reactionSearchCache.get(token) if token else None
+    if search is not None and search.created + getattr(settings, 'REACTION_SEARCH_TIMEOUT', 600) < time.time():
+        reactionSearchCache.remove(token)
+        search = None
+    if search is None or not search.matches(reactants, products):
+        search = ReactionSearch(reactants, products)
+        reactionSearchCache.set(search.token, search)
+    return search
+
+def generateReactionsFromDatabase(database, reactants, products=None, only_families=None, parallel=None, libraries=True, families=True):
+    """
+    Generate the reactions (and associated kinetics) for a given set of
+    `reactants` and an optional set of `products` from the RMG-Py database,
+    as described for :func:`generateReactions()`, and return them as a list.
+    If `libraries` or `families` is ``False``, the reactions from the kinetics
+    libraries or families respectively are left out.
+    
+    If `parallel` is not ``False`` and there is a worker pool (see
+    :func:`getWorkerPool()`), the reactions of each family are generated and
+    their kinetics estimated in the worker processes; the results are the
+    same, and in the same order, as when doing so in this process.
+    """
+    
+    # get RMG-py reactions
+    reactantsList = [reactants]
     if len(reactants) == 1:
         # if only one reactant, react it with itself bimolecularly, with RMG-py
         # the java version already does this (it includes A+A reactions when you react A)
-        reactants2 = [reactants[0], reactants[0]]
-        if only_families is None:
+        reactantsList.append([reactants[0], reactants[0]])
+    
+    familyReactionLists = None
+    if families and parallel is not False and database is globals()['database']:
+        # The workers use their copy of the database of the process that
+        # forked them, brought up to date with the files on disk
+        pool = getWorkerPool()
+        if pool is not None:
+            try:
+                familyReactionLists = generateFamilyReactionsInParallel(pool, database, reactantsList, products, only_families)
+            except ValueError, e:
+                # The workers have already reloaded a part of the database
+                # that this process is still reloading, so do it all here
+                print >> sys.stderr, 'Unable to use reactions generated by the worker processes: {0}'.format(e)
+                sys.stderr.flush()
+    
+    reactionList = []
+    for index, reactants0 in enumerate(reactantsList):
+        if only_families is None and libraries:
             # Not restricted to certain families, so also check libraries.
-            reactionList.extend(database.kinetics.generateReactionsFromLibraries(reactants2, products))
-        reactionList.extend(database.kinetics.generateReactionsFromFamilies(reactants2, products, only_families=only_families))
+            reactionList.extend(getReactionKinetics(database.kinetics.generateReactionsFromLibraries(reactants0, products)))
+        if not families:
+            continue
+        if familyReactionLists is not None:
+            reactionList.extend(familyReactionLists[index])
+        else:
+            reactionList.extend(getReactionKinetics(database.kinetics.generateReactionsFromFamilies(reactants0, products, only_families=only_families)))
     
-    # get RMG-py kinetics
+    return reactionList
+
+def getReactionKinetics(reactionList):
+    """
+    Return a list of the reactions in `reactionList`, in which each reaction
+    from a family that does not have kinetics yet is replaced by a reaction
+    for each of the estimates of its kinetics from that family.
+    """
     reactionList0 = reactionList; reactionList = []
     for reaction in reactionList0:
         # If the reaction already has kinetics (e.g. from a library),
@@ -323,17 +2609,120 @@ def generateReactions(database, reactants, products=None, only_families=None):
                     
                 reactionList.append(rxn)
     
-    # get RMG-java reactions
-    if only_families is None:
-        # Not restricted to certain families, so also check RMG-Java.
-        rmgJavaReactionList = getRMGJavaKinetics(reactants, products)
-    else:
-        rmgJavaReactionList = []
-    
-    return reactionList, rmgJavaReactionList
+    return reactionList
     
+def stripReaction(reaction):
+    """
+    Replace the references to parts of the database (families, templates,
+    depositories and entries) in the given `reaction` from a family by their
+    labels or indices, so that the reaction can be sent between processes
+    without sending those parts with it. Use :func:`relinkReaction()` to
+    restore the references.
+    """
+    reaction.family = reaction.family.label
+    if getattr(reaction, 'template', None):
+        reaction.template = [entry.label for entry in reaction.template]
+    if isinstance(reaction, DepositoryReaction):
+        if hasattr(reaction.depository, 'label'):
+            reaction.depository = reaction.depository.label
+        if reaction.entry is not None:
+            reaction.entry = reaction.entry.index
+    return reaction
+
+# The (key, entry) pairs of each kinetics depository by entry index, for
+# relinkReaction()
+_depositoryEntryIndexes = weakref.WeakKeyDictionary()
+
+def getDepositoryEntry(depository, index):
+    """
+    Return the entry of the given kinetics `depository` with the given
+    `index`, or ``None`` if there is none. The entries are looked up in a
+    dictionary built the first time it is needed. Since the entries can be
+    added or replaced in place (see kineticsEntryNew() and kineticsEntryEdit()
+    in views.py), the dictionary is rebuilt if the index is not found or
+    the entry found is no longer in the depository.
+    """
+    entries = _depositoryEntryIndexes.get(depository)
+    if entries is not None:
+        key, entry = entries.get(index, (None, None))
+        if entry is not None and depository.entries.get(key) is entry:
+            return entry
+    entries = dict([(entry.index, (key, entry)) for key, entry in depository.entries.iteritems()])
+    _depositoryEntryIndexes[depository] = entries
+    return entries.get(index, (None, None))[1]
+
+def relinkReaction(reaction, database):
+    """
+    Restore the references to parts of the given `database` in the given
+    `reaction` that were replaced by :func:`stripReaction()`. Raises a
+    :class:`ValueError` if any of them cannot be found, e.g. because the
+    reaction was generated from a different version of the database.
+    """
+    try:
+        family = database.kinetics.families[reaction.family]
+        if getattr(reaction, 'template', None):
+            reaction.template = [family.groups.entries[label] for label in reaction.template]
+    except KeyError, e:
+        raise ValueError('Unable to find {0} in the {1} family.'.format(e, reaction.family))
+    reaction.family = family
+    if isinstance(reaction, DepositoryReaction):
+        for depository in family.depositories:
+            if depository.label == reaction.depository:
+                break
+        else:
+            raise ValueError('Unable to find depository "{0}" in the {1} family.'.format(reaction.depository, family.label))
+        reaction.depository = depository
+        if reaction.entry is not None:
+            entry = getDepositoryEntry(depository, reaction.entry)
+            if entry is None:
+                raise ValueError('Unable to find entry {0} in depository "{1}".'.format(reaction.entry, depository.label))
+            reaction.entry = entry
+    return reaction
+
+def generateFamilyReactions(item):
+    """
+    Generate the reactions of the family with the given label for the given
+    reactants and optional products, and estimate their kinetics, given as a
+    (label, reactants, products) tuple `item`. This runs in the worker
+    processes, using the copy of the database inherited from the process
+    that forked them, brought up to date first, and the reactions are
+    returned stripped by :func:`stripReaction()`.
+    """
+    label, reactants, products = item
+    database = loadDatabase('kinetics')
+    reactionList = database.kinetics.generateReactionsFromFamilies(reactants, products, only_families=[label])
+    return [stripReaction(reaction) for reaction in getReactionKinetics(reactionList)]
+
+def generateFamilyReactionsInParallel(pool, database, reactantsList, products=None, only_families=None):
+    """
+    Generate the reactions of the families of the given `database` (or only
+    those in `only_families`) for each set of reactants in `reactantsList`,
+    and estimate their kinetics, using a separate task in the worker `pool`
+    for each family and set of reactants. Returns a list of the lists of
+    reactions for each set of reactants, in the order in which the families
+    would be applied in this process.
+    """
+    labels = [label for label in database.kinetics.families if only_families is None or label in only_families]
+    items = [(label, reactants, products) for reactants in reactantsList for label in labels]
+    results = pool.map(generateFamilyReactions, items, chunksize=1)
+    reactionLists = []
+    for index in range(len(reactantsList)):
+        reactionList = []
+        for result in results[index * len(labels):(index + 1) * len(labels)]:
+            reactionList.extend([relinkReaction(reaction, database) for reaction in result])
+        reactionLists.append(reactionList)
+    return reactionLists
+
 ################################################################################
 
+def reactionHasSpecies(reaction, reactants, products):
+    """
+    Return ``True`` if the given `reaction` converts the given `reactants`
+    to the given `products`, or vice versa, or ``False`` if not.
+    """
+    return ((isSameSpeciesList(reaction.reactants, reactants) and isSameSpeciesList(reaction.products, products)) or
+            (isSameSpeciesList(reaction.reactants, products) and isSameSpeciesList(reaction.products, reactants)))
+
 def reactionHasReactants(reaction, reactants):
     """
     Return ``True`` if the given `reaction` has all of the specified
@@ -352,6 +2741,164 @@ def reactionHasReactants(reaction, reactants):
             return False
     return True
 
+################################################################################
+
+def getKineticsDictionary(kinetics):
+    """
+    Return a dictionary describing the given `kinetics` model, suitable for
+    converting to JSON: its `type`, its Python `repr`, and its parameters in
+    SI units: `A`, `n`, `Ea` and `T0` for :class:`Arrhenius` models, or `A`,
+    `n`, `alpha` and `E0` for :class:`ArrheniusEP` models.
+    """
+    if kinetics is None:
+        return None
+    result = {'type': kinetics.__class__.__name__, 'repr': repr(kinetics)}
+    params = getArrheniusParameters(kinetics)
+    if params is not None and isinstance(kinetics, ArrheniusEP):
+        result.update({'A': params[0], 'n': params[1], 'alpha': kinetics.alpha.value_si, 'E0': params[2]})
+    elif params is not None:
+        result.update(zip(['A', 'n', 'Ea', 'T0'], params))
+    return result
+
+def getReactionSource(reaction, rmgJavaReactionList=()):
+    """
+    Return a dictionary describing where the kinetics of the given `reaction`
+    came from: the `source` (``'library'``, ``'depository'``, ``'rate
+    rules'``, ``'group additivity'`` or ``'RMG-Java'``) and, where relevant,
+    the `family`, the `library` or `depository` label and the `index` of the
+    entry used. Reactions in `rmgJavaReactionList` are from RMG-Java.
+    """
+    if reaction in rmgJavaReactionList:
+        return {'source': 'RMG-Java'}
+    elif isinstance(reaction, TemplateReaction):
+        return {'source': reaction.estimator, 'family': reaction.family.label}
+    elif isinstance(reaction, DepositoryReaction):
+        return {'source': 'depository', 'family': reaction.family.label, 'depository': reaction.depository.label,
+                'index': reaction.entry.index if reaction.entry is not None else None}
+    elif isinstance(reaction, LibraryReaction):
+        return {'source': 'library', 'library': reaction.library.label,
+                'index': reaction.entry.index if reaction.entry is not None else None}
+    return {'source': reaction.__class__.__name__}
+
+def getSpeciesSMILES(species):
+    """
+    Return the SMILES string of the given :class:`Species` or
+    :class:`Molecule`.
+    """
+    if isinstance(species, Species):
+        species = species.molecule[0]
+    return species.toSMILES()
+
+def estimateKinetics(item):
+    """
+    Return a list of dictionaries describing each of the reactions (and the
+    associated kinetics) from every source for the reactants and optional
+    products given as adjacency lists in the tuple `item`, as found by
+    :func:`generateReactions()`. This may run in the worker processes, using
+    the copy of the database inherited from the process that forked them,
+    brought up to date first.
+    """
+    reactants, products = item
+    database = loadDatabase('kinetics')
+    reactants = [Molecule().fromAdjacencyList(adjlist) for adjlist in reactants]
+    products = [Molecule().fromAdjacencyList(adjlist) for adjlist in products] if products is not None else None
+    reactionList, rmgJavaReactionList = generateReactions(database, reactants, products)
+    
+    results = []
+    for reaction in reactionList + rmgJavaReactionList:
+        if isinstance(reaction, DepositoryReaction) and reaction not in rmgJavaReactionList and 'untrained' in reaction.depository.name:
+            continue
+        result = getReactionSource(reaction, rmgJavaReactionList)
+        result.update({
+            'reactants': [getSpeciesSMILES(species) for species in reaction.reactants],
+            'products': [getSpeciesSMILES(species) for species in reaction.products],
+            'reversible': reaction.reversible,
+            'forward': reactionHasReactants(reaction, reactants),
+            'degeneracy': reaction.degeneracy,
+            'kinetics': getKineticsDictionary(reaction.kinetics),
+        })
+        results.append(result)
+    return results
+
+def estimateKineticsSafely(item):
+    """
+    Return the (reactions, error) pair for the reactants and products given
+    in the tuple `item`: the result of :func:`estimateKinetics()` and
+    ``None``, or ``None`` and a message describing why that failed.
+    """
+    try:
+        return estimateKinetics(item), None
+    except Exception, e:
+        traceback.print_exc()
+        sys.stderr.flush()
+        return None, '{0}: {1}'.format(e.__class__.__name__, e)
+
+def estimateKineticsBatch(reactions):
+    """
+    Generate a dictionary describing the reactions and kinetics from every
+    source for each of the given `reactions`, each a (reactants, products)
+    pair of lists of SMILES strings or adjacency lists (products may be
+    ``None``), in turn, as soon as they are available. Each dictionary gives
+    the `index` of the reaction in the list, its `reactants` and `products`
+    as given, and either the `reactions` (as returned by
+    :func:`estimateKinetics()`) or an `error`. Each distinct species is only
+    parsed once, each distinct reaction is only estimated once, and the work
+    is spread over the worker pool if there is one.
+    """
+    # Make sure the kinetics database is loaded before forking any workers
+    loadDatabase('kinetics')
+    unique = []
+    buckets = {}
+    molecules = {}
+    results = []
+    items = []
+    itemIndices = {}
+    for reactants, products in reactions:
+        result = {'index': len(results), 'reactants': reactants, 'products': products}
+        results.append(result)
+        try:
+            indices = []
+            for identifiers in [reactants, products or []]:
+                indices.append([])
+                for identifier in identifiers:
+                    if identifier not in molecules:
+                        molecules[identifier] = addUniqueMolecule(moleculeFromIdentifier(identifier), unique, buckets)
+                    indices[-1].append(molecules[identifier])
+            if not 1 <= len(indices[0]) <= 3 or len(indices[1]) > 3:
+                raise ValueError('Expected 1 to 3 reactants and at most 3 products')
+        except Exception, e:
+            result['error'] = 'Invalid reaction: {0}'.format(e)
+            continue
+        # The same reactants and products in any order are the same search
+        key = (tuple(sorted(indices[0])), tuple(sorted(indices[1])) if products else None)
+        if key not in itemIndices:
+            itemIndices[key] = len(items)
+            items.append(([unique[i].toAdjacencyList() for i in indices[0]],
+                          [unique[i].toAdjacencyList() for i in indices[1]] if products else None))
+        result['item'] = itemIndices[key]
+    
+    pool = getWorkerPool()
+    if pool is not None and len(items) > 1:
+        estimates = pool.imap(estimateKineticsSafely, items)
+    else:
+        estimates = (estimateKineticsSafely(item) for item in items)
+    
+    # Send the results in order, each as soon as its reaction is estimated
+    done = []
+    for result in results:
+        if 'item' in result:
+            index = result.pop('item')
+            while len(done) <= index:
+                done.append(estimates.next())
+            reactionList, error = done[index]
+            if error is not None:
+                result['error'] = error
+            else:
+                result['reactions'] = reactionList
+        yield result
+
+################################################################################
+
 def getRMGJavaKineticsFromReaction(reaction):
     """
     Get the kinetics for the given `reaction` (with reactants and products as :class:`Species`)
@@ -371,7 +2918,77 @@ def getRMGJavaKineticsFromReaction(reaction):
     return reactionList[0]
     
     
-def getRMGJavaKinetics(reactantList, productList=None):
+def getRMGJavaRequest(reactantList):
+    """
+    Return the input file of an RMG-Java PopulateReactions job for the given
+    list of reactants, which should be :class:`Molecule` objects. The
+    reactants are listed once each, in an order that does not depend on the
+    order they are given in, so that the request can also be used as the key
+    of the cached response.
+    """
+    added_reactants = []
+    for reactant in reactantList:
+        assert isinstance(reactant, Molecule)
+        reactant.clearLabeledAtoms()
+        for r in added_reactants:
+            if r.isIsomorphic(reactant):
+                break # already added this reactant
+        else: # exhausted the added_reactants list without finding duplicate and breaking
+            added_reactants.append(reactant)
+    adjlists = sorted([(getMoleculeKey(reactant), reactant.toAdjacencyList()) for reactant in added_reactants])
+    popreactants = ''
+    for index, (key, adjlist) in enumerate(adjlists):
+        popreactants += 'reactant{0:d} (molecule/cm3) 1\n{1}\n\n'.format(index+1, adjlist)
+    popreactants += 'END\n'
+    return popreactants
+
+# The parsed species dictionaries of recent RMG-Java responses, with their
+# indexes by molecule key, by the PopulateReactions request
+rmgJavaIndexCache = createCache('rmgjavaIndex', getattr(settings, 'RMG_JAVA_CACHE_SIZE', 1000))
+# Held while identifying species using one of those indexes, as checking for
+# isomorphism modifies the molecules involved
+_rmgJavaIndexLock = threading.Lock()
+
+def getRMGJavaSpeciesIndex(species_list, key=None):
+    """
+    Parse the adjacency list of each species in the given species dictionary
+    from an RMG-Java response, a list of (name, adjacency list) pairs. Returns
+    a dictionary of the resulting :class:`Molecule` objects by name, and a
+    dictionary of lists of the (name, molecule) pairs by molecule key (see
+    :func:`getMoleculeKey()`).
+    
+    If the `key` of the PopulateReactions job (its request, see
+    :func:`getRMGJavaRequest()`) is given, the result is cached by it for as
+    long as :mod:`rmgjava` keeps the same response in memory. The molecules
+    are then shared with other threads, so they should only be used with
+    ``_rmgJavaIndexLock`` held, and copied before being given to anything
+    else.
+    """
+    if key is not None:
+        value = rmgJavaIndexCache.get(key)
+        if value is not None and value[0] is species_list:
+            return value[1:]
+    species_dict = {}
+    species_index = {}
+    for name, adjlist in species_list:
+        molecule = Molecule().fromAdjacencyList(adjlist)
+        species_dict[name] = molecule
+        species_index.setdefault(getMoleculeKey(molecule), []).append((name, molecule))
+    if key is not None:
+        rmgJavaIndexCache.set(key, (species_list, species_dict, species_index))
+    return species_dict, species_index
+
+def startRMGJavaKinetics(reactantList):
+    """
+    Start querying RMG-Java for the reactions of the given list of reactants,
+    which should be :class:`Molecule` objects, in a background thread (unless
+    the response is cached). Pass the returned query to
+    :func:`getRMGJavaKinetics()` to get the reactions.
+    """
+    request = getRMGJavaRequest(reactantList)
+    return rmgjava.queryInBackground(request, request)
+
+def getRMGJavaKinetics(reactantList, productList=None, query=None):
     """
     Get the kinetics for the given `reaction` as estimated by RMG-Java. The
     reactants and products of the given reaction should be :class:`Molecule`
@@ -380,39 +2997,11 @@ def getRMGJavaKinetics(reactantList, productList=None):
     This is done by querying a socket running RMG-Java as a service. We
     construct the input file for a PopulateReactions job, pass that as input
     to the RMG-Java service, then parse the output to find the kinetics of
-    the reaction we are interested in.
+    the reaction we are interested in. The responses are cached by
+    :mod:`rmgjava`. If a `query` started by :func:`startRMGJavaKinetics()`
+    for the same reactants is given, its response is used instead.
     """
     
-    def formSpecies(species):
-        """
-        This function takes a species string from RMG-Java containing both name
-        and adjlist and returns them separately.
-        """
-        lines = species.split("\n")
-        species_name = lines[0]
-        adjlist = "\n".join(lines[1:])
-        return species_name, adjlist
-
-    def cleanResponse(response):
-        """
-        This function cleans up response from PopulateReactions server and gives a
-        species dictionary and reactions list.
-        """
-    
-        # Split species dictionary from reactions list
-        response = response.split("\n\n\n")
-        species_list = response[0].split("\n\n")
-        reactions = response[1].split("\n\n")
-        reactions = reactions[1]
-    
-        # split species into adjacency lists with names
-        species_dict = [formSpecies(item) for item in species_list]
-    
-        # split reactions into list of single line reactions
-        reactions_list = reactions.split("\n")
-    
-        return species_dict, reactions_list
-    
     def searchReaction(reactionline, reactantNames, productNames):
         """
         Reads reaction line and returns True if reaction occurs:
@@ -476,75 +3065,53 @@ def getRMGJavaKinetics(reactantList, productList=None):
     
         return reactants, products, kinetics, entry
     
-    def identifySpecies(species_dict, molecule):
+    def identifySpecies(species_dict, species_index, molecule):
         """
-        Given a species_dict list and the species adjacency list, identifies
-        whether species is found in the list and returns its name if found.
+        Given the parsed species_dict and its index by molecule key,
+        identifies whether species is found in the dictionary and returns its
+        name if found. The species sharing the molecule's key are checked for
+        isomorphism first, and all of the others only if none of those match.
         """
         resonance_isomers = molecule.generateResonanceIsomers()
-        for name, adjlist in species_dict:
-            listmolecule = Molecule().fromAdjacencyList(adjlist)
-            for isomer in resonance_isomers:
-                if isomer.isIsomorphic(listmolecule):
-                    return name
+        for candidates in [species_index.get(getMoleculeKey(molecule), []), species_dict.items()]:
+            for name, listmolecule in candidates:
+                for isomer in resonance_isomers:
+                    if isomer.isIsomorphic(listmolecule):
+                        return name
         return False
 
     productList = productList or []
     reactionList = []
 
-    # Generate species list for Java request
-    popreactants = ''
-    added_reactants = set()
-    for index, reactant in enumerate(reactantList):
-        assert isinstance(reactant, Molecule)
-        reactant.clearLabeledAtoms()
-        for r in added_reactants:
-            if r.isIsomorphic(reactant):
-                break # already added this reactant
-        else: # exhausted the added_reactants list without finding duplicate and breaking
-            added_reactants.add(reactant)
-            popreactants += 'reactant{0:d} (molecule/cm3) 1\n{1}\n\n'.format(index+1, reactant.toAdjacencyList())
-    popreactants += 'END\n'
-    
-    
-    # First send search request to PopulateReactions server
-    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    client_socket.settimeout(10)
-    try:
-        client_socket.connect(("localhost", 5000))
-    except IOError:
-        print >> sys.stderr, 'Unable to query RMG-Java for kinetics. (Is the RMG-Java server running?)'
-        sys.stderr.flush()
+    # Send the search request to the PopulateReactions server (or use its
+    # cached response), unless that has already been done
+    key = getRMGJavaRequest(reactantList)
+    if query is None:
+        response = rmgjava.getResponse(key, key)
+    else:
+        response = query.getResponse()
+    if response is None:
         return reactionList
-    
-    # Send request to server
-    print "SENDING REQUEST FOR RMG-JAVA SEARCH TO SERVER"
-    client_socket.sendall(popreactants)
-    partial_response = client_socket.recv(512)
-    response = partial_response
-    while partial_response:
-        partial_response = client_socket.recv(512)
-        response += partial_response
-    client_socket.close()
-    print "FINISHED REQUEST. CLOSED CONNECTION TO SERVER"
+    species_list, reactions_list = response
 
-    # Clean response from server
-    species_dict, reactions_list = cleanResponse(response)
+    # Parse each species in the dictionary once per response, and index
+    # them by key
+    species_dict, species_index = getRMGJavaSpeciesIndex(species_list, key)
 
     # Name the species in reaction
-    reactantNames = []
-    for reactant in reactantList:
-        reactantNames.append(identifySpecies(species_dict, reactant))
-    productNames = []
-    for product in productList:
-        productNames.append(identifySpecies(species_dict, product))
-        # identifySpecies(species_dict, product) returns "False" if it can't find product
-        if not identifySpecies(species_dict, product):
+    with _rmgJavaIndexLock:
+        reactantNames = []
+        for reactant in reactantList:
+            reactantNames.append(identifySpecies(species_dict, species_index, reactant))
+        productNames = []
+        for product in productList:
+            productNames.append(identifySpecies(species_dict, species_index, product))
+    for product, productName in zip(productList, productNames):
+        # identifySpecies() returns "False" if it can't find product
+        if not productName:
             print "Could not find this requested product in the species dictionary from RMG-Java:"
             print str(product)
     
-    species_dict = dict([(key, Molecule().fromAdjacencyList(value)) for key, value in species_dict])
-    
     # Both products were actually found in species dictionary or were blank
     if all(productNames):
 
@@ -553,6 +3120,7 @@ def getRMGJavaKinetics(reactantList, productList=None):
 
         # Search for da Reactions
         print 'Searching output for desired reaction...\n'
+        reaction = None
         for reactionline in reactions_list:
             if reactionline.strip().startswith('DUP'):
                 print "WARNING - DUPLICATE REACTION KINETICS ARE NOT BEING SUMMED"
@@ -569,9 +3137,13 @@ def getRMGJavaKinetics(reactantList, productList=None):
                 print 'Found a matching reaction:'
                 print reactionline
                 reactants, products, kinetics, entry = extractKinetics(reactionline)
+                # Each reaction gets its own copies of the shared molecules
+                with _rmgJavaIndexLock:
+                    reactants = [species_dict[reactant].copy(deep=True) for reactant in reactants]
+                    products = [species_dict[product].copy(deep=True) for product in products]
                 reaction = DepositoryReaction(
-                    reactants = [species_dict[reactant] for reactant in reactants],
-                    products = [species_dict[product] for product in products],
+                    reactants = reactants,
+                    products = products,
                     kinetics = kinetics,
                     degeneracy = degeneracy,
                     entry = entry,
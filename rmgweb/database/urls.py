@@ -38,6 +38,13 @@ urlpatterns = patterns('rmgweb.database',
     # Load the whole database into memory
     (r'^load/?$', 'views.load'),
     
+    # The state of the database held in memory, as JSON
+    (r'^status/?$', 'views.databaseStatus'),
+    (r'^memory/?$', 'views.databaseMemory'),
+    # The time and memory taken to load each part of the database
+    (r'^profile/?$', 'views.databaseProfile'),
+    (r'^rmgjava/?$', 'views.rmgJavaCache'),
+    
     # Export to an RMG-Java database
     (r'^export_(?P<type>zip|tar\.gz)/?$', 'views.export'),
     
@@ -51,7 +58,9 @@ urlpatterns = patterns('rmgweb.database',
     # Thermodynamics database
     (r'^thermo/$', 'views.thermo'),
     (r'^thermo/search/$', 'views.thermoSearch'),
+    (r'^thermo/batch/?$', 'views.thermoBatch'),
     (r'^thermo/molecule/(?P<adjlist>[\S\s]+)$', 'views.thermoData'),
+    (r'^thermo/curves/(?P<adjlist>[\S\s]+)$', 'views.thermoCurves'),
     (r'^thermo/(?P<section>\w+)/(?P<subsection>.+)/(?P<index>-?\d+)/$', 'views.thermoEntry'),
     (r'^thermo/(?P<section>\w+)/(?P<subsection>.+)/$', 'views.thermo'),
     (r'^thermo/(?P<section>\w+)/$', 'views.thermo'),
@@ -59,6 +68,7 @@ urlpatterns = patterns('rmgweb.database',
     # Kinetics database
     (r'^kinetics/$', 'views.kinetics'),
     (r'^kinetics/search/$', 'views.kineticsSearch'),
+    (r'^kinetics/batch/?$', 'views.kineticsBatch'),
     (r'^kinetics/results/reactant1=(?P<reactant1>[\S\s]+)__reactant2=(?P<reactant2>[\S\s]+)__product1=(?P<product1>[\S\s]+)__product2=(?P<product2>[\S\s]+)__product3=(?P<product3>[\S\s]+)$', 'views.kineticsResults'),
     (r'^kinetics/results/reactant1=(?P<reactant1>[\S\s]+)__product1=(?P<product1>[\S\s]+)__product2=(?P<product2>[\S\s]+)__product3=(?P<product3>[\S\s]+)$', 'views.kineticsResults'),
     (r'^kinetics/results/reactant1=(?P<reactant1>[\S\s]+)__reactant2=(?P<reactant2>[\S\s]+)__reactant3=(?P<reactant3>[\S\s]+)__product1=(?P<product1>[\S\s]+)__product2=(?P<product2>[\S\s]+)$', 'views.kineticsResults'),
@@ -89,6 +99,7 @@ urlpatterns = patterns('rmgweb.database',
     (r'^kinetics/families/(?P<family>[^/]+)/untrained/$', 'views.kineticsUntrained'),
     
     (r'^kinetics/(?P<section>\w+)/(?P<subsection>.+)/(?P<index>\d+)/edit$', 'views.kineticsEntryEdit'),
+    (r'^kinetics/(?P<section>\w+)/(?P<subsection>.+)/(?P<index>-?\d+)/tree/$', 'views.kineticsTree'),
     (r'^kinetics/(?P<section>\w+)/(?P<subsection>.+)/(?P<index>-?\d+)/$', 'views.kineticsEntry'),
     (r'^kinetics/(?P<section>\w+)/(?P<subsection>.+)/$', 'views.kinetics'),
     (r'^kinetics/(?P<section>\w+)/$', 'views.kinetics'),
@@ -30,6 +30,9 @@
 
 import cookielib
 import copy
+import datetime
+import json
+import numpy
 import os
 import re
 import shutil
@@ -46,10 +49,16 @@ from django.shortcuts import render_to_response
 from django.template import RequestContext
 from django.http import Http404, HttpResponseRedirect, HttpResponse
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
+from django.views.decorators.csrf import csrf_exempt
 from django.core.urlresolvers import reverse
+from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 import settings
 
 import exportOldDatabase
+import profiler
+import rmgjava
+from cache import createCache, getCacheStatistics
 
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.molecule.group import Group
@@ -84,6 +93,64 @@ def index(request):
     """
     return render_to_response('database.html', context_instance=RequestContext(request))
 
+@staff_member_required
+def databaseStatus(request):
+    """
+    Return a JSON description of the state of the RMG database held in memory
+    by this process, including the most recent reload, the caches, and the
+    time taken to find reactions from each source of kinetics.
+    """
+    status = {
+        'pid': os.getpid(),
+        'reload': getReloadStatus(),
+        'caches': getCacheStatistics(),
+        'kineticsSources': getSourceTimings(),
+    }
+    return HttpResponse(json.dumps(status), mimetype='application/json')
+
+@staff_member_required
+def databaseMemory(request):
+    """
+    Return a JSON report of the shared and private resident memory (in kB)
+    of each worker process serving the website, to check how much of the
+    database loaded before forking the workers is still shared.
+    """
+    workers = [dict(pid=pid, **usage) for pid, usage in getWorkerMemoryUsage()]
+    return HttpResponse(json.dumps({'pid': os.getpid(), 'workers': workers}), mimetype='application/json')
+
+@staff_member_required
+def databaseProfile(request):
+    """
+    Show how long it took to load each file and directory of the RMG database
+    in this process, and how much memory that used.
+    """
+    records = profiler.getRecords()
+    if request.GET.get('format') == 'json':
+        return HttpResponse(json.dumps({'pid': os.getpid(), 'records': records}), mimetype='application/json')
+    totals = {
+        'seconds': sum([record['seconds'] for record in records if record['depth'] == 0]),
+        'memory': sum([record['memory'] for record in records if record['depth'] == 0]),
+        'entries': sum([record['entries'] for record in records if record['depth'] == 0]),
+    }
+    return render_to_response('databaseProfile.html', {'records': records, 'totals': totals, 'enabled': settings.DATABASE_PROFILE, 'pid': os.getpid()}, context_instance=RequestContext(request))
+
+@staff_member_required
+def rmgJavaCache(request):
+    """
+    Show how many RMG-Java responses are cached, and flush them all when the
+    form on the page is POSTed (e.g. after upgrading RMG-Java or its
+    database).
+    """
+    flushed = None
+    if request.method == 'POST':
+        flushed = rmgjava.flushCache()
+    return render_to_response('rmgJavaCache.html', {'size': rmgjava.getCacheSize(),
+                                                    'flushed': flushed,
+                                                    'version': getattr(settings, 'RMG_JAVA_DATABASE_VERSION', ''),
+                                                    'timeout': getattr(settings, 'RMG_JAVA_CACHE_TIMEOUT', 7 * 24 * 3600),
+                                                    },
+                              context_instance=RequestContext(request))
+
 def export(request, type):
     """
     Export the RMG database to the old RMG-Java format.
@@ -130,6 +197,61 @@ def export(request, type):
     # Redirect to requested compressed database
     return HttpResponseRedirect('export/{0}'.format(file))
 
+# The rows of the tables of entries in each part of the thermo database
+thermoTableCache = createCache('thermoTables', getattr(settings, 'THERMO_TABLE_CACHE_SIZE', 100), generation=getDatabaseGeneration)
+
+def getThermoTable(database, section, subsection):
+    """
+    Return a dictionary containing the `rows` of the table of entries in the
+    given part `database` of the thermo database, sorted by index, and the
+    data `formats` of those entries. Each row is an (index, label, structure
+    markup, data format) tuple. The table is only built once for each
+    reload of the database.
+    """
+    key = (section, subsection)
+    table = thermoTableCache.get(key)
+    if table is not None:
+        return table
+    generation = thermoTableCache.getGeneration()
+
+    # Sort entries by index
+    entries0 = database.entries.values()
+    entries0.sort(key=lambda entry: entry.index)
+
+    rows = []
+    for entry in entries0:
+
+        structure = getStructureMarkup(entry.item)
+
+        if isinstance(entry.data, ThermoData): dataFormat = 'Group additivity'
+        elif isinstance(entry.data, Wilhoit): dataFormat = 'Wilhoit'
+        elif isinstance(entry.data, NASA): dataFormat = 'NASA'
+        elif isinstance(entry.data, basestring): dataFormat = 'Link'
+        else: dataFormat = entry.data.__class__.__name__
+        
+        if entry.data is None:
+            dataFormat = 'None'
+            entry.index = 0
+        
+        rows.append((entry.index,entry.label,structure,dataFormat))
+
+    table = {'rows': rows, 'formats': sorted(set([row[3] for row in rows])), 'sorted': {'index': rows}}
+    thermoTableCache.set(key, table, generation)
+    return table
+
+def getSortedThermoTableRows(table, sort):
+    """
+    Return the rows of the given thermo `table` sorted by `sort`, which is
+    ``'index'``, ``'label'`` or ``'format'``, optionally prefixed by ``'-'``
+    to sort in descending order. Each ordering is only sorted once.
+    """
+    rows = table['sorted'].get(sort)
+    if rows is None:
+        column = {'index': 0, 'label': 1, 'format': 3}[sort.lstrip('-')]
+        rows = sorted(table['rows'], key=lambda row: (row[column], row[0]), reverse=sort.startswith('-'))
+        table['sorted'][sort] = rows
+    return rows
+
 def thermo(request, section='', subsection=''):
     """
     The RMG database homepage.
@@ -138,45 +260,50 @@ def thermo(request, section='', subsection=''):
     if section not in ['depository', 'libraries', 'groups', '']:
         raise Http404
 
-    # Load the thermo database if necessary
-    database = loadDatabase('thermo', section)
-
     if subsection != '':
 
         # A subsection was specified, so render a table of the entries in
         # that part of the database
         
-        # Determine which subsection we wish to view
+        # Determine which subsection we wish to view (this loads it if necessary)
         try:
             database = getThermoDatabase(section, subsection)
         except ValueError:
             raise Http404
 
-        # Sort entries by index
-        entries0 = database.entries.values()
-        entries0.sort(key=lambda entry: entry.index)
-
-        entries = []
-        for entry in entries0:
-
-            structure = getStructureMarkup(entry.item)
-
-            if isinstance(entry.data, ThermoData): dataFormat = 'Group additivity'
-            elif isinstance(entry.data, Wilhoit): dataFormat = 'Wilhoit'
-            elif isinstance(entry.data, NASA): dataFormat = 'NASA'
-            elif isinstance(entry.data, str): dataFormat = 'Link'
-            
-            if entry.data is None:
-                dataFormat = 'None'
-                entry.index = 0
-            
-            entries.append((entry.index,entry.label,structure,dataFormat))
+        # Get the rows of the table, sorted and filtered as requested
+        table = getThermoTable(database, section, subsection)
+        sort = request.GET.get('sort', 'index')
+        if sort.lstrip('-') not in ['index', 'label', 'format']:
+            sort = 'index'
+        query = request.GET.get('q', '').strip()
+        dataFormat = request.GET.get('format', '')
+        rows = getSortedThermoTableRows(table, sort)
+        if query:
+            rows = [row for row in rows if query.lower() in row[1].lower()]
+        if dataFormat:
+            rows = [row for row in rows if row[3] == dataFormat]
+        
+        # Show one page of the table at a time
+        paginator = Paginator(rows, getattr(settings, 'THERMO_TABLE_PAGE_SIZE', 100))
+        try:
+            page = paginator.page(request.GET.get('page', 1))
+        except PageNotAnInteger:
+            page = paginator.page(1)
+        except EmptyPage:
+            page = paginator.page(paginator.num_pages)
+        parameters = request.GET.copy()
+        parameters.pop('page', None)
+        entries = page.object_list
 
-        return render_to_response('thermoTable.html', {'section': section, 'subsection': subsection, 'databaseName': database.name, 'entries': entries}, context_instance=RequestContext(request))
+        return render_to_response('thermoTable.html', {'section': section, 'subsection': subsection, 'databaseName': database.name, 'entries': entries, 'page': page, 'sort': sort, 'query': query, 'dataFormat': dataFormat, 'dataFormats': table['formats'], 'parameters': parameters.urlencode()}, context_instance=RequestContext(request))
 
     else:
         # No subsection was specified, so render an outline of the thermo
         # database components
+        
+        # Load the thermo database if necessary
+        database = loadDatabase('thermo', section)
         thermoDepository = [(label, depository) for label, depository in database.thermo.depository.iteritems()]
         thermoDepository.sort()
         thermoLibraries = [(label, database.thermo.libraries[label]) for label in database.thermo.libraryOrder]
@@ -190,10 +317,7 @@ def thermoEntry(request, section, subsection, index):
     A view for showing an entry in a thermodynamics database.
     """
 
-    # Load the thermo database if necessary
-    loadDatabase('thermo', section)
-
-    # Determine the entry we wish to view
+    # Determine the entry we wish to view (this loads it if necessary)
     try:
         database = getThermoDatabase(section, subsection)
     except ValueError:
@@ -267,11 +391,10 @@ def thermoData(request, adjlist):
     adjlist = str(adjlist.replace(';', '\n'))
     molecule = Molecule().fromAdjacencyList(adjlist)
     species = Species(molecule=[molecule])
-    species.generateResonanceIsomers()
     
     # Get the thermo data for the molecule
     thermoDataList = []
-    for data, library, entry in database.thermo.getAllThermoData(species):
+    for data, library, entry in getAllThermoData(species, database):
         if library is None:
             source = 'Group additivity'
             href = ''
@@ -294,8 +417,86 @@ def thermoData(request, adjlist):
     
     # Get the structure of the item we are viewing
     structure = getStructureMarkup(molecule)
+    
+    # The plots are drawn from data fetched separately
+    curvesUrl = reverse(thermoCurves, kwargs={'adjlist': adjlist.replace('\n', ';')})
 
-    return render_to_response('thermoData.html', {'structure': structure, 'thermoDataList': thermoDataList, 'symmetryNumber': symmetryNumber, 'plotWidth': 500, 'plotHeight': 400 + 15 * len(thermoDataList)}, context_instance=RequestContext(request))
+    return render_to_response('thermoData.html', {'structure': structure, 'thermoDataList': thermoDataList, 'symmetryNumber': symmetryNumber, 'curvesUrl': curvesUrl, 'plotWidth': 500, 'plotHeight': 400 + 15 * len(thermoDataList)}, context_instance=RequestContext(request))
+
+def thermoCurves(request, adjlist):
+    """
+    Return, as JSON, the heat capacity, enthalpy, entropy and Gibbs free
+    energy given by each source of thermodynamics data for the molecule with
+    the provided adjacency list `adjlist`, on a shared grid of temperatures,
+    in the user's preferred units. Each source's values are ``null`` outside
+    the range over which it is plotted.
+    """
+    
+    # Load the thermo database if necessary
+    loadDatabase('thermo')
+    from tools import database
+
+    adjlist = str(adjlist.replace(';', '\n'))
+    molecule = Molecule().fromAdjacencyList(adjlist)
+    species = Species(molecule=[molecule])
+    
+    sources = []
+    for data, library, entry in getAllThermoData(species, database):
+        if library is None:
+            sources.append(('Group additivity', getThermoCurves(data)))
+        elif library in database.thermo.depository.values():
+            sources.append(('Depository', getThermoCurves(data, ('depository', library.label, entry.index))))
+        else:
+            sources.append((library.name, getThermoCurves(data, ('libraries', library.label, entry.index))))
+    
+    # Put the curves of every source on the same grid of temperatures
+    units, factors = getThermoPlotUnits(request.user)
+    starts = [int(round(curves[0][0] / 10.)) for source, curves in sources if len(curves[0]) > 0]
+    ends = [int(round(curves[0][-1] / 10.)) for source, curves in sources if len(curves[0]) > 0]
+    if starts:
+        start = min(starts); count = max(ends) - start + 1
+    else:
+        start = 0; count = 0
+    Tdata = numpy.arange(start, start + count) * 10.0
+    series = []
+    for source, curves in sources:
+        item = {'source': source}
+        offset = int(round(curves[0][0] / 10.)) - start if len(curves[0]) > 0 else 0
+        for quantity, values in zip(['Cp', 'H', 'S', 'G'], curves[1:]):
+            values = values * factors[quantity]
+            item[quantity] = [None] * offset + [value if not numpy.isnan(value) else None for value in values.tolist()]
+            item[quantity].extend([None] * (count - len(item[quantity])))
+        series.append(item)
+    
+    result = {'units': units, 'T': (Tdata * factors['T']).tolist(), 'series': series}
+    return HttpResponse(json.dumps(result, separators=(',', ':')), mimetype='application/json')
+
+@csrf_exempt
+def thermoBatch(request):
+    """
+    Return, as JSON, the thermodynamics data for each of a list of species,
+    given as SMILES strings or adjacency lists. These are POSTed either as
+    a JSON object with a `species` list and an optional `format`, or as form
+    data with one `species` field per species. The `format` is ``'json'``
+    (the default) for tabulated values or ``'nasa'`` for NASA polynomials.
+    """
+    if request.method != 'POST':
+        return HttpResponse(json.dumps({'error': 'Species must be POSTed'}), mimetype='application/json', status=405)
+    if request.META.get('CONTENT_TYPE', '').startswith('application/json'):
+        try:
+            data = json.loads(request.raw_post_data)
+            identifiers = [unicode(identifier) for identifier in data['species']]
+        except (ValueError, KeyError, TypeError):
+            return HttpResponse(json.dumps({'error': 'Expected a JSON object with a list of species'}), mimetype='application/json', status=400)
+        format = data.get('format', request.GET.get('format', 'json'))
+    else:
+        identifiers = request.POST.getlist('species')
+        format = request.POST.get('format', request.GET.get('format', 'json'))
+    if format not in ['json', 'nasa']:
+        return HttpResponse(json.dumps({'error': 'Invalid format "{0}"'.format(format)}), mimetype='application/json', status=400)
+
+    results = estimateThermoBatch(identifiers, format)
+    return HttpResponse(json.dumps({'format': format, 'species': results}), mimetype='application/json')
 
 ################################################################################
 
@@ -312,90 +513,84 @@ def getDatabaseTreeAsList(database, entries):
         tree.extend(getDatabaseTreeAsList(database, entry.children))
     return tree
 
-def getKineticsTreeHTML(database, section, subsection, entries):
+# The rendered kinetics group trees, each a dictionary of the `entries` of the
+# tree by index, their log10 `rates`, and the HTML `fragments` rendered so far
+kineticsTreeCache = createCache('kineticsTrees', getattr(settings, 'KINETICS_TREE_CACHE_SIZE', 100), generation=getDatabaseGeneration)
+
+def getKineticsTree(database, section, subsection):
     """
-    Return a string of HTML markup used for displaying information about
-    kinetics entries in a given `database` as a tree of unordered lists.
+    Return the cached dictionary describing the tree of the given kinetics
+    groups `database`, creating it if necessary.
     """
-    html = ''
+    key = (section, subsection)
+    tree = kineticsTreeCache.get(key)
+    if tree is not None:
+        return tree
+    generation = kineticsTreeCache.getGeneration()
+    tree = {
+        'entries': dict([(entry.index, entry) for entry in getDatabaseTreeAsList(database, database.top)]),
+        'rates': getKineticsTreeRates(database),
+        'fragments': {},
+    }
+    kineticsTreeCache.set(key, tree, generation)
+    return tree
+
+def getKineticsTreeHTML(tree, section, subsection, entries, depth=0):
+    """
+    Return a string of HTML markup used for displaying information about the
+    given kinetics `entries` of a `tree` as a tree of unordered lists. The
+    subtrees more than ``settings.KINETICS_TREE_DEPTH`` levels down are
+    left collapsed and empty, to be loaded when they are expanded.
+    """
+    maxDepth = getattr(settings, 'KINETICS_TREE_DEPTH', 3)
+    html = []
     for entry in entries:
         # Write current node
         url = reverse(kineticsEntry, kwargs={'section': section, 'subsection': subsection, 'index': entry.index})
-        html += '<li class="kineticsEntry">\n'
-        html += '<div class="kineticsLabel">'
+        expanded = depth + 1 < maxDepth
+        html.append('<li class="kineticsEntry">\n')
+        html.append('<div class="kineticsLabel">')
         if len(entry.children) > 0:
-            html += '<img id="button_{0}" class="treeButton" src="/media/tree-collapse.png"/>'.format(entry.index)
+            html.append('<img id="button_{0}" class="treeButton" src="/media/{1}.png" onclick="toggleVisible(\'{0}\');"/>'.format(entry.index, 'tree-collapse' if expanded else 'tree-expand'))
         else:
-            html += '<img class="treeButton" src="/media/tree-blank.png"/>'
-        html += '<a href="{0}">{1}. {2}</a>\n'.format(url, entry.index, entry.label)
-        html += '<div class="kineticsData">\n'
+            html.append('<img class="treeButton" src="/media/tree-blank.png"/>')
+        html.append('<a href="{0}">{1}. {2}</a>\n'.format(url, entry.index, entry.label))
+        html.append('<div class="kineticsData">\n')
         if entry.data is not None:
-            for T in [300,400,500,600,800,1000,1500,2000]:
-                html += '<span class="kineticsDatum">{0:.2f}</span> '.format(math.log10(entry.data.getRateCoefficient(T, P=1e5)))
-        html += '</div>\n'
-        # Recursively descend children (depth-first)
+            for logk in tree['rates'][entry.index]:
+                html.append('<span class="kineticsDatum">{0:.2f}</span> '.format(logk))
+        html.append('</div>\n')
+        # Descend children (depth-first), unless they are to be loaded later
         if len(entry.children) > 0:
-            html += '<ul id="children_{0}" class="kineticsSubTree">\n'.format(entry.index)
-            html += getKineticsTreeHTML(database, section, subsection, entry.children)
-            html += '</ul>\n'
-        html += '</li>\n'
-    return html
+            if expanded:
+                html.append('<ul id="children_{0}" class="kineticsSubTree">\n'.format(entry.index))
+                html.append(getKineticsTreeHTML(tree, section, subsection, entry.children, depth + 1))
+            else:
+                url = reverse(kineticsTree, kwargs={'section': section, 'subsection': subsection, 'index': entry.index})
+                html.append('<ul id="children_{0}" class="kineticsSubTree" style="display: none;" data-url="{1}">\n'.format(entry.index, url))
+            html.append('</ul>\n')
+        html.append('</li>\n')
+    return ''.join(html)
 
-def getUntrainedReactions(family):
+def getKineticsSubtreeHTML(database, section, subsection, index=None):
     """
-    Return a depository containing unique reactions for which no
-    training data exists.
+    Return the HTML markup of the tree of the given kinetics groups
+    `database`, or of the subtree below the entry with the given `index`,
+    rendering it only if it was not rendered before for this version of the
+    database.
     """
-    
-    # Load training depository
-    for depository in family.depositories:
-        if 'training' in depository.label:
-            training = depository
-            break
+    tree = getKineticsTree(database, section, subsection)
+    try:
+        return tree['fragments'][index]
+    except KeyError:
+        pass
+    if index is None:
+        entries = database.top
     else:
-        raise Exception('Could not find training depository in {0} family.'.format(family.label))
-    
-    # Load trained reactions
-    trainedReactions = []
-    for entry in training.entries.values():
-        for reaction in trainedReactions:
-            if reaction.isIsomorphic(entry.item):
-                break
-        else:
-            trainedReactions.append(entry.item)
-    
-    # Load untrained reactions
-    untrainedReactions = []
-    for depository in family.depositories:
-        if 'training' not in depository.label:
-            for entry in depository.entries.values():
-                for reaction in trainedReactions:
-                    if reaction.isIsomorphic(entry.item):
-                        break
-                else:
-                    for reaction in untrainedReactions:
-                        if reaction.isIsomorphic(entry.item):
-                            break
-                    else:
-                        untrainedReactions.append(entry.item)
-    
-    # Sort reactions by reactant size
-    untrainedReactions.sort(key=lambda reaction: sum([1 for r in reaction.reactants for a in r.atoms if a.isNonHydrogen()]))
-    
-    # Build entries
-    untrained = KineticsDepository(name='{0}/untrained'.format(family.label),
-                                   label='{0}/untrained'.format(family.label))
-    count = 1
-    for reaction in untrainedReactions:
-        untrained.entries['{0}'.format(count)] = Entry(
-            item = reaction,
-            index = count,
-            label = getReactionUrl(reaction),
-        )
-        count += 1
-    
-    return untrained
-
+        entries = tree['entries'][index].children
+    html = getKineticsTreeHTML(tree, section, subsection, entries)
+    tree['fragments'][index] = html
+    return html
 
 def getCommit(entry):
 
@@ -788,10 +983,7 @@ def kinetics(request, section='', subsection=''):
     if section not in ['libraries', 'families', '']:
         raise Http404
 
-    # Load the kinetics database, if necessary
-    rmgDatabase = loadDatabase('kinetics', section)
-
-    # Determine which subsection we wish to view
+    # Determine which subsection we wish to view (this loads it if necessary)
     database = None
     try:
         database = getKineticsDatabase(section, subsection)
@@ -803,20 +995,36 @@ def kinetics(request, section='', subsection=''):
         # A subsection was specified, so render a table of the entries in
         # that part of the database
 
-        isGroupDatabase = False
+        isGroupDatabase = isinstance(database, KineticsGroups)
 
         # Sort entries by index
         if database.top is not None and len(database.top) > 0:
             # If there is a tree in this database, only consider the entries
             # that are in the tree
             entries0 = getDatabaseTreeAsList(database, database.top)
-            tree = '<ul class="kineticsTree">\n{0}\n</ul>\n'.format(getKineticsTreeHTML(database, section, subsection, database.top))
+            tree = '<ul class="kineticsTree">\n{0}\n</ul>\n'.format(getKineticsSubtreeHTML(database, section, subsection))
         else:
             # If there is not a tree, consider all entries
             entries0 = database.entries.values()
             # Sort the entries by index and label
             entries0.sort(key=lambda entry: (entry.index, entry.label))
             tree = ''
+
+        page = None
+        parameters = ''
+        if isGroupDatabase:
+            # Show one page of the table of groups at a time, below the tree
+            paginator = Paginator(entries0, getattr(settings, 'KINETICS_TABLE_PAGE_SIZE', 100))
+            try:
+                page = paginator.page(request.GET.get('page', 1))
+            except PageNotAnInteger:
+                page = paginator.page(1)
+            except EmptyPage:
+                page = paginator.page(paginator.num_pages)
+            parameters = request.GET.copy()
+            parameters.pop('page', None)
+            parameters = parameters.urlencode()
+            entries0 = page.object_list
             
         entries = []
 
@@ -841,8 +1049,7 @@ def kinetics(request, section='', subsection=''):
                 'label': entry0.label,
                 'dataFormat': dataFormat,
             }
-            if isinstance(database, KineticsGroups):
-                isGroupDatabase = True
+            if isGroupDatabase:
                 entry['structure'] = getStructureMarkup(entry0.item)
                 entry['parent'] = entry0.parent
                 entry['children'] = entry0.children
@@ -857,44 +1064,89 @@ def kinetics(request, section='', subsection=''):
             
             entries.append(entry)
             
-        return render_to_response('kineticsTable.html', {'section': section, 'subsection': subsection, 'databaseName': database.name, 'entries': entries, 'tree': tree, 'isGroupDatabase': isGroupDatabase}, context_instance=RequestContext(request))
+        return render_to_response('kineticsTable.html', {'section': section, 'subsection': subsection, 'databaseName': database.name, 'entries': entries, 'tree': tree, 'isGroupDatabase': isGroupDatabase, 'page': page, 'parameters': parameters}, context_instance=RequestContext(request))
 
     else:
         # No subsection was specified, so render an outline of the kinetics
         # database components
+        
+        # Load the kinetics database, if necessary
+        rmgDatabase = loadDatabase('kinetics', section)
         kineticsLibraries = [(label, library) for label, library in rmgDatabase.kinetics.libraries.iteritems() if subsection in label]
         kineticsLibraries.sort()
-        for family in rmgDatabase.kinetics.families.itervalues():
-            for i in range(0,len(family.depositories)):
-                if 'untrained' in family.depositories[i].name:
-                    family.depositories.pop(i)
-            family.depositories.append(getUntrainedReactions(family))
-        kineticsFamilies = [(label, family) for label, family in rmgDatabase.kinetics.families.iteritems() if subsection in label]
+        # Only list the untrained reactions of families for which they have
+        # already been computed
+        kineticsFamilies = []
+        for label, family in rmgDatabase.kinetics.families.iteritems():
+            if subsection in label:
+                result = getUntrainedReactions(family, wait=False)
+                untrained = len(result[1]) if result is not None else None
+                kineticsFamilies.append((label, family, untrained))
         kineticsFamilies.sort()
         return render_to_response('kinetics.html', {'section': section, 'subsection': subsection, 'kineticsLibraries': kineticsLibraries, 'kineticsFamilies': kineticsFamilies}, context_instance=RequestContext(request))
 
+def kineticsTree(request, section, subsection, index):
+    """
+    Return the HTML markup of the subtree below the entry with the given
+    `index` in a set of kinetics groups, for loading a collapsed part of the
+    tree when it is first expanded.
+    """
+    database = None
+    try:
+        database = getKineticsDatabase(section, subsection)
+    except ValueError:
+        pass
+    if database is None or not database.top:
+        raise Http404
+    try:
+        html = getKineticsSubtreeHTML(database, section, subsection, int(index))
+    except KeyError:
+        raise Http404
+    return HttpResponse(html)
+
 def kineticsUntrained(request, family):
+    """
+    A view of the unique reactions in the depositories of a kinetics family
+    for which no training data exists. These are computed in the background
+    after the family is loaded; if they are not ready yet, the page says so.
+    """
     rmgDatabase = loadDatabase('kinetics', 'families')
-    entries0 = getUntrainedReactions(rmgDatabase.kinetics.families[family]).entries.values()
-    entries0.sort(key=lambda entry: (entry.index, entry.label))
+    try:
+        kineticsFamily = rmgDatabase.kinetics.families[family]
+    except KeyError:
+        raise Http404
+    
+    if getattr(settings, 'DATABASE_PRECOMPUTE_UNTRAINED', False):
+        result = getUntrainedReactions(kineticsFamily, wait=False)
+        if result is None:
+            # Make sure they are being computed (e.g. in a process forked
+            # after the database was loaded)
+            computeUntrainedReactionsInBackground(rmgDatabase)
+    else:
+        result = getUntrainedReactions(kineticsFamily)
     
     entries = []
-    for entry0 in entries0:
-        entry = {
-                'index': entry0.index,
-                'url': entry0.label,
-            }
-        
-        entry['reactants'] = ' + '.join([moleculeToInfo(reactant) for reactant in entry0.item.reactants])
-        entry['products'] = ' + '.join([moleculeToInfo(reactant) for reactant in entry0.item.products])
-        entry['arrow'] = '&hArr;' if entry0.item.reversible else '&rarr;'
-        
-        entries.append(entry)
-    return render_to_response('kineticsTable.html', {'section': 'families', 'subsection': family, 'databaseName': '{0}/untrained'.format(family), 'entries': entries, 'tree': None, 'isGroupDatabase': False}, context_instance=RequestContext(request))
+    computed = None
+    if result is not None:
+        computed, reactions = result
+        computed = datetime.datetime.fromtimestamp(computed)
+        for index, reaction in enumerate(reactions):
+            entry = {
+                    'index': index + 1,
+                    'url': getReactionUrl(reaction),
+                }
+            
+            entry['reactants'] = ' + '.join([moleculeToInfo(reactant) for reactant in reaction.reactants])
+            entry['products'] = ' + '.join([moleculeToInfo(reactant) for reactant in reaction.products])
+            entry['arrow'] = '&hArr;' if reaction.reversible else '&rarr;'
+            
+            entries.append(entry)
+    return render_to_response('kineticsTable.html', {'section': 'families', 'subsection': family, 'databaseName': '{0}/untrained'.format(family), 'entries': entries, 'tree': None, 'isGroupDatabase': False, 'computed': computed}, context_instance=RequestContext(request))
 
-def getReactionUrl(reaction, family=None, estimator=None):
+def getReactionUrl(reaction, family=None, estimator=None, search=None):
     """
-    Get the URL (for kinetics data) of a reaction.
+    Get the URL (for kinetics data) of a reaction. If a :class:`ReactionSearch`
+    `search` is given, the page at the URL reuses its results if it can.
     
     Returns '' if the reaction contains functional Groups or LogicNodes instead
     of real Species or Molecules."""
@@ -917,6 +1169,8 @@ def getReactionUrl(reaction, family=None, estimator=None):
             reactionUrl = ''
     else:
         reactionUrl = reverse(kineticsData, kwargs=kwargs)
+    if reactionUrl and search is not None:
+        reactionUrl += '?search={0}'.format(search.token)
     return reactionUrl
     
 
@@ -925,9 +1179,7 @@ def kineticsEntryNew(request, family, type):
     """
     A view for creating a new entry in a kinetics family depository.
     """
-    # Load the kinetics database, if necessary
-    loadDatabase('kinetics', 'families')
-
+    # Determine the depository to add to (this loads it if necessary)
     subsection = '{0}/{1}'.format(family, type)
     try:
         database = getKineticsDatabase('families', subsection)
@@ -944,9 +1196,13 @@ def kineticsEntryNew(request, family, type):
             new_entry.index = max(database.entries.keys() or [0]) + 1
 
             # Confirm entry does not already exist in depository
-            for entry in database.entries.values():
-                if ((type == 'training' and new_entry.item.isIsomorphic(entry.item)) or
-                    (type == 'NIST' and new_entry.label == entry.label)):
+            if type == 'training':
+                item = getDepositoryReactionIndex(database).find(new_entry.item)
+                existingEntries = [item[1]] if item is not None else []
+            else:
+                existingEntries = database.entries.values()
+            for entry in existingEntries:
+                if type == 'training' or (type == 'NIST' and new_entry.label == entry.label):
                         kwargs = {'section': 'families',
                                   'subsection': subsection,
                                   'index': entry.index,
@@ -1011,6 +1267,8 @@ def kineticsEntryNew(request, family, type):
                 database.entries[index] = new_entry
                 path = os.path.join(settings.DATABASE_PATH, 'kinetics', 'families', family, '{0}.py'.format(type))
                 database.save(path)
+                # Make sure the pages the user sees next include the new entry
+                reloadDatabaseNow('kinetics', 'families')
                 commit_author = '{0.first_name} {0.last_name} <{0.email}>'.format(request.user)
                 commit_message = 'New Entry: {family}/{type}/{index}\n\n{msg}'.format(family=family,
                                                                                       type=type,
@@ -1051,10 +1309,7 @@ def kineticsEntryEdit(request, section, subsection, index):
     A view for editing an entry in a kinetics database.
     """
 
-    # Load the kinetics database, if necessary
-    loadDatabase('kinetics', section)
-
-    # Determine the entry we wish to view
+    # Determine the entry we wish to view (this loads it if necessary)
     try:
         database = getKineticsDatabase(section, subsection)
     except ValueError:
@@ -1103,6 +1358,8 @@ def kineticsEntryEdit(request, section, subsection, index):
                 database.entries[index] = new_entry
                 path = os.path.join(settings.DATABASE_PATH, 'kinetics', section, subsection + '.py' )
                 database.save(path)
+                # Make sure the pages the user sees next include the change
+                reloadDatabaseNow('kinetics', section)
                 commit_author = "{0.first_name} {0.last_name} <{0.email}>".format(request.user)
                 commit_message = "{1}:{2} {3}\n\nChange to kinetics/{0}/{1} entry {2} submitted through RMG website:\n{3}\n{4}".format(section,subsection,index, form.cleaned_data['change'], commit_author)
                 commit_result = subprocess.check_output(['git', 'commit',
@@ -1212,10 +1469,7 @@ def kineticsEntry(request, section, subsection, index):
     A view for showing an entry in a kinetics database.
     """
 
-    # Load the kinetics database, if necessary
-    loadDatabase('kinetics', section)
-
-    # Determine the entry we wish to view
+    # Determine the entry we wish to view (this loads it if necessary)
     try:
         database = getKineticsDatabase(section, subsection)
     except ValueError:
@@ -1323,8 +1577,10 @@ def kineticsGroupEstimateEntry(request, family, estimator, reactant1, product1,
     if product3 != '':
         productList.append(moleculeFromURL(product3))    
     
-    # Search for the corresponding reaction(s)
-    reactionList, empty_list = generateReactions(database, reactantList, productList, only_families=[family])
+    # Search for the corresponding reaction(s), reusing the results of the
+    # search the user came from if possible
+    search = getReactionSearch(request.GET.get('search'), reactantList, productList)
+    reactionList, empty_list = search.generateReactions(database, productList, only_families=[family])
     
     kineticsDataList = []
     
@@ -1384,7 +1640,7 @@ def kineticsGroupEstimateEntry(request, family, estimator, reactant1, product1,
     new_entry_form = KineticsEntryEditForm(initial={'entry':entry_string })
 
     forwardKinetics = reaction.kinetics
-    reverseKinetics = reaction.generateReverseRateCoefficient()
+    reverseKinetics = generateReverseKinetics([reaction])[0]
     
     forward = reactionHasReactants(reaction, reactantList) # boolean: true if template reaction in forward direction
     
@@ -1492,28 +1748,21 @@ def kineticsResults(request, reactant1, reactant2='', reactant3='', product1='',
     else:
         productList = None
     
-    # Search for the corresponding reaction(s)
-    reactionList, rmgJavaReactionList = generateReactions(database, reactantList, productList)
+    # Search for the corresponding reaction(s), keeping the results for the
+    # pages the user may go to next
+    search = getReactionSearch(request.GET.get('search'), reactantList, productList)
+    reactionList, rmgJavaReactionList = search.generateReactions(database, productList)
     reactionList.extend(rmgJavaReactionList)
         
     # Remove duplicates from the list and count the number of results
-    uniqueReactionList = []
-    uniqueReactionCount = []
-    for reaction in reactionList:
-        for i, rxn in enumerate(uniqueReactionList):
-            if reaction.isIsomorphic(rxn):
-                uniqueReactionCount[i] += 1
-                break
-        else:
-            uniqueReactionList.append(reaction)
-            uniqueReactionCount.append(1)
+    uniqueReactionList, uniqueReactionCount = deduplicateReactions(reactionList)
     
     reactionDataList = []
     for reaction, count in zip(uniqueReactionList, uniqueReactionCount):
         reactants = ' + '.join([moleculeToInfo(reactant) for reactant in reaction.reactants])
         arrow = '&hArr;' if reaction.reversible else '&rarr;'
         products = ' + '.join([moleculeToInfo(reactant) for reactant in reaction.products])
-        reactionUrl = getReactionUrl(reaction)
+        reactionUrl = getReactionUrl(reaction, search=search)
         
         forward = reactionHasReactants(reaction, reactantList)
         if forward:
@@ -1523,44 +1772,16 @@ def kineticsResults(request, reactant1, reactant2='', reactant3='', product1='',
         
     return render_to_response('kineticsResults.html', {'reactionDataList': reactionDataList}, context_instance=RequestContext(request))
 
-def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', product2='', product3=''):
+def getKineticsDataList(database, reactionList, rmgJavaReactionList, reactantList, search=None):
     """
-    A view used to present a list of reactions and the associated kinetics
-    for each.
+    Return a list describing each of the reactions in `reactionList` (which
+    includes those in `rmgJavaReactionList` from RMG-Java) for display,
+    in the direction of the given `reactantList`, and the name of the last
+    family the reactions came from (or '' if none). Links to other pages
+    reuse the given :class:`ReactionSearch` `search`.
     """
-    
-    # Load the kinetics database if necessary
-    loadDatabase('kinetics')
-    # Also load the thermo database so we can generate reverse kinetics if necessary
-    loadDatabase('thermo')
-    from tools import database # the global one with both thermo and kinetics
-
-    reactantList = []
-    reactantList.append(moleculeFromURL(reactant1))
-    if reactant2 != '':
-        reactantList.append(moleculeFromURL(reactant2))
-    if reactant3 != '':
-        reactantList.append(moleculeFromURL(reactant3))
-
-    if product1 != '' or product2 != '' or product3 != '':
-        productList = []
-        if product1 != '':
-            productList.append(moleculeFromURL(product1))
-        if product2 != '':
-            productList.append(moleculeFromURL(product2))
-        if product3 != '':
-            productList.append(moleculeFromURL(product3))
-            
-        reverseReaction = Reaction(reactants = productList, products = reactantList)
-        reverseReactionURL = getReactionUrl(reverseReaction)
-    else:
-        productList = None
-
-    # Search for the corresponding reaction(s)
-    reactionList, rmgJavaReactionList = generateReactions(database, reactantList, productList)
-    reactionList.extend(rmgJavaReactionList)
-    
     kineticsDataList = []
+    reverseReactions = []
     family = ''
     
     # Go through database and group additivity kinetics entries
@@ -1582,7 +1803,7 @@ def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', pr
         if isinstance(reaction, TemplateReaction):
             source = '%s (RMG-Py %s)' % (reaction.family.name, reaction.estimator)
             
-            href = getReactionUrl(reaction, family=reaction.family.name, estimator=reaction.estimator)
+            href = getReactionUrl(reaction, family=reaction.family.name, estimator=reaction.estimator, search=search)
             entry = Entry(data=reaction.kinetics)
             family = reaction.family.name
         elif reaction in rmgJavaReactionList:
@@ -1609,20 +1830,86 @@ def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', pr
             kineticsDataList.append([reactants, arrow, products, entry, forwardKinetics, source, href, is_forward])
         else:
             if isinstance(forwardKinetics, Arrhenius) or isinstance(forwardKinetics, KineticsData):
-                reverseKinetics = reaction.generateReverseRateCoefficient()
-                reverseKinetics.Tmin = forwardKinetics.Tmin
-                reverseKinetics.Tmax = forwardKinetics.Tmax
-                reverseKinetics.Pmin = forwardKinetics.Pmin
-                reverseKinetics.Pmax = forwardKinetics.Pmax
-            else:
-                reverseKinetics = None
-            kineticsDataList.append([products, arrow, reactants, entry, reverseKinetics, source, href, is_forward])
+                # The reverse kinetics are generated for all reactions at once below
+                reverseReactions.append((len(kineticsDataList), reaction))
+            kineticsDataList.append([products, arrow, reactants, entry, None, source, href, is_forward])
+
+    # Generate the kinetics of the reactions shown in reverse
+    reverseKineticsList = generateReverseKinetics([reaction for index, reaction in reverseReactions])
+    for (index, reaction), reverseKinetics in zip(reverseReactions, reverseKineticsList):
+        forwardKinetics = reaction.kinetics
+        reverseKinetics.Tmin = forwardKinetics.Tmin
+        reverseKinetics.Tmax = forwardKinetics.Tmax
+        reverseKinetics.Pmin = forwardKinetics.Pmin
+        reverseKinetics.Pmax = forwardKinetics.Pmax
+        kineticsDataList[index][4] = reverseKinetics
+
+    return kineticsDataList, family
+
+def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', product2='', product3=''):
+    """
+    A view used to present a list of reactions and the associated kinetics
+    for each.
+    """
+    
+    # Load the kinetics database if necessary
+    loadDatabase('kinetics')
+    # Also load the thermo database so we can generate reverse kinetics if necessary
+    loadDatabase('thermo')
+    from tools import database # the global one with both thermo and kinetics
+
+    reactantList = []
+    reactantList.append(moleculeFromURL(reactant1))
+    if reactant2 != '':
+        reactantList.append(moleculeFromURL(reactant2))
+    if reactant3 != '':
+        reactantList.append(moleculeFromURL(reactant3))
+
+    if product1 != '' or product2 != '' or product3 != '':
+        productList = []
+        if product1 != '':
+            productList.append(moleculeFromURL(product1))
+        if product2 != '':
+            productList.append(moleculeFromURL(product2))
+        if product3 != '':
+            productList.append(moleculeFromURL(product3))
+            
+        reverseReaction = Reaction(reactants = productList, products = reactantList)
+        reverseReactionURL = getReactionUrl(reverseReaction)
+    else:
+        productList = None
+        reverseReactionURL = ''
+
+    # Search for the corresponding reaction(s), reusing the results of the
+    # search the user came from if possible
+    search = getReactionSearch(request.GET.get('search'), reactantList, productList)
+    
+    source = request.GET.get('source')
+    if source is not None:
+        # Only show the results from one source, for the progressive version
+        # of this page
+        return kineticsDataSource(request, database, search, source, reactantList, productList)
+    if request.GET.get('stream'):
+        # Show the page straight away, and fetch the results from each source
+        # separately so that each is shown as soon as it is ready
+        return render_to_response('kineticsDataStream.html', {'sources': KINETICS_DATA_SOURCES,
+                                                              'search': search.token,
+                                                              'reactantList': reactantList,
+                                                              'productList': productList,
+                                                              'reverseReactionURL': reverseReactionURL,
+                                                              },
+                                  context_instance=RequestContext(request))
+    
+    reactionList, rmgJavaReactionList = search.generateReactions(database, productList)
+    reactionList.extend(rmgJavaReactionList)
+    
+    kineticsDataList, family = getKineticsDataList(database, reactionList, rmgJavaReactionList, reactantList, search)
 
     # Construct new entry form from group-additive result
     # Need to get group-additive reaction from generateReaction with only_families
     # +--> otherwise, adjacency list doesn't store reaction template properly
     if family:
-        additiveList, empty_list = generateReactions(database, reactantList, productList, only_families=family)
+        additiveList, empty_list = search.generateReactions(database, productList, only_families=family)
         additiveList = [rxn for rxn in additiveList if isinstance(rxn, TemplateReaction)]
         reaction = additiveList[0]
         new_entry = StringIO.StringIO(u'')
@@ -1639,6 +1926,17 @@ def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', pr
     else:
         new_entry_form = None
 
+    if request.GET.get('plot'):
+        # Only show the plot of all of the results, their average and the
+        # forms for a new entry, for the progressive version of this page
+        return render_to_response('kineticsDataPlot.html', {'kineticsDataList': kineticsDataList,
+                                                            'plotWidth': 500,
+                                                            'plotHeight': 400 + 15 * len(kineticsDataList),
+                                                            'new_entry_form': new_entry_form,
+                                                            'subsection': family,
+                                                            },
+                                  context_instance=RequestContext(request))
+
     rateForm = RateEvaluationForm()
     eval = []
     if request.method == 'POST':
@@ -1662,6 +1960,73 @@ def kineticsData(request, reactant1, reactant2='', reactant3='', product1='', pr
                                                     },
                                              context_instance=RequestContext(request))
 
+@csrf_exempt
+def kineticsBatch(request):
+    """
+    Return the reactions and kinetics from every source (libraries,
+    depositories, rate rules, group additivity and RMG-Java) for each of a
+    list of reactions, POSTed as a JSON object with a `reactions` list, each
+    item of which is an object with `reactants` and optional `products`
+    lists of SMILES strings or adjacency lists. The results are streamed as
+    newline-delimited JSON, one line per reaction in the order given, so
+    that they can be used before the whole batch is done.
+    """
+    if request.method != 'POST':
+        return HttpResponse(json.dumps({'error': 'Reactions must be POSTed'}), mimetype='application/json', status=405)
+    try:
+        data = json.loads(request.raw_post_data)
+        reactions = []
+        for reaction in data['reactions']:
+            reactants = [unicode(identifier) for identifier in reaction['reactants']]
+            products = [unicode(identifier) for identifier in reaction['products']] if reaction.get('products') else None
+            reactions.append((reactants, products))
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return HttpResponse(json.dumps({'error': 'Expected a JSON object with a list of reactions'}), mimetype='application/json', status=400)
+
+    lines = (json.dumps(result, separators=(',', ':')) + '\n' for result in estimateKineticsBatch(reactions))
+    return HttpResponse(lines, mimetype='application/x-ndjson')
+
+# The sources of kinetics whose results the progressive version of the
+# kinetics data page fetches separately (see REACTION_SOURCES), and their
+# headings
+KINETICS_DATA_SOURCES = [
+    ('libraries', 'Kinetics Libraries'),
+    ('depositories', 'Kinetics Depositories'),
+    ('estimates', 'Rate Rules and Group Additivity'),
+    ('RMG-Java', 'RMG-Java'),
+]
+
+def kineticsDataSource(request, database, search, source, reactantList, productList=None):
+    """
+    Return the results from a single `source` of kinetics (one of
+    ``KINETICS_DATA_SOURCES``) for the given reactants and products, as an
+    HTML fragment for the progressive version of the kinetics data page, or
+    as JSON if the ``format`` query parameter is ``'json'``. The reactions
+    are found through the :class:`ReactionSearch` `search`, so that the
+    pages visited next reuse them. The time taken to find the reactions is
+    recorded and included.
+    """
+    if source not in dict(KINETICS_DATA_SOURCES):
+        raise Http404
+    started = time.time()
+    reactionList = search.generateSourceReactions(database, source, productList)
+    rmgJavaReactionList = reactionList if source == 'RMG-Java' else []
+    duration = time.time() - started
+    recordSourceTiming(source, duration)
+    
+    kineticsDataList, family = getKineticsDataList(database, reactionList, rmgJavaReactionList, reactantList, search)
+    
+    if request.GET.get('format') == 'json':
+        results = []
+        for reactants, arrow, products, entry, kinetics, label, href, forward in kineticsDataList:
+            results.append({'source': label, 'href': href, 'forward': forward, 'kinetics': getKineticsDictionary(kinetics)})
+        return HttpResponse(json.dumps({'source': source, 'duration': duration, 'results': results}), mimetype='application/json')
+    return render_to_response('kineticsDataSource.html', {'kineticsDataList': kineticsDataList,
+                                                          'source': source,
+                                                          'duration': duration,
+                                                          },
+                              context_instance=RequestContext(request))
+
 def moleculeSearch(request):
     """
     Creates webpage form to display molecule chemgraph upon entering adjacency list, smiles, or inchi, as well as searches for thermochemistry data.
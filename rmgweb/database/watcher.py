@@ -0,0 +1,227 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+################################################################################
+#
+#	RMG Website - A Django-powered website for Reaction Mechanism Generator
+#
+#	Copyright (c) 2011 Prof. William H. Green (whgreen@mit.edu) and the
+#	RMG Team (rmg_dev@mit.edu)
+#
+#	Permission is hereby granted, free of charge, to any person obtaining a
+#	copy of this software and associated documentation files (the 'Software'),
+#	to deal in the Software without restriction, including without limitation
+#	the rights to use, copy, modify, merge, publish, distribute, sublicense,
+#	and/or sell copies of the Software, and to permit persons to whom the
+#	Software is furnished to do so, subject to the following conditions:
+#
+#	The above copyright notice and this permission notice shall be included in
+#	all copies or substantial portions of the Software.
+#
+#	THE SOFTWARE IS PROVIDED 'AS IS', WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#	IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#	FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#	AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#	LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#	FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#	DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+
+"""
+This module watches the directories of the RMG database for changes, so that
+:func:`loadDatabase` can tell whether a section of the database needs to be
+reloaded without walking the directory tree on every request.
+
+Each watched directory has a generation counter, which is incremented every
+time a change to a file within it is detected, and a set of the paths that
+have changed. Changes are detected using inotify if the ``pyinotify`` package
+is installed, and otherwise by periodically polling the modification times of
+the files from a background thread. Note that inotify does not see changes
+made to an NFS-mounted database from other hosts, so polling should be used
+in that case.
+
+The watcher runs in a thread of the process that started it. Threads do not
+survive a ``fork()``, so :func:`isWatching` returns ``False`` in a child
+process until :func:`start` is called again there.
+"""
+
+import os
+import sys
+import threading
+import time
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+################################################################################
+
+_lock = threading.Lock()
+_interval = 2.0
+_generations = {}
+_changes = {}
+_mtimes = {}
+
+_pid = None
+_mode = None
+_thread = None
+_watchManager = None
+_notifier = None
+
+def _getModificationTimes(dirpath):
+    """
+    Return a dictionary mapping the path of every file in the directory tree
+    at `dirpath` to its modification time.
+    """
+    mtimes = {}
+    for root, dirs, files in os.walk(dirpath):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                # The file was removed since os.walk() listed it
+                pass
+    return mtimes
+
+def _markChanged(dirpath, paths):
+    """
+    Record that the given `paths` within the watched directory `dirpath` have
+    changed, incrementing its generation counter.
+    """
+    if not paths:
+        return
+    with _lock:
+        _generations[dirpath] += 1
+        _changes[dirpath].update(paths)
+
+def _poll():
+    """
+    Compare the modification times of the files in each watched directory
+    with those seen last time, and record any changes.
+    """
+    with _lock:
+        dirpaths = _mtimes.keys()
+    for dirpath in dirpaths:
+        old = _mtimes[dirpath]
+        new = _getModificationTimes(dirpath)
+        changed = set([path for path, mtime in new.iteritems() if old.get(path) != mtime])
+        changed.update([path for path in old if path not in new])
+        _mtimes[dirpath] = new
+        _markChanged(dirpath, changed)
+
+def _run():
+    """
+    The body of the polling thread.
+    """
+    while True:
+        time.sleep(_interval)
+        try:
+            _poll()
+        except Exception, e:
+            print >> sys.stderr, 'watcher (pid={0:d}): Error while polling for changes: {1}'.format(os.getpid(), e)
+            sys.stderr.flush()
+
+if pyinotify is not None:
+    class _EventHandler(pyinotify.ProcessEvent):
+        """
+        Records the changes reported by inotify in the watched directories.
+        """
+        def process_default(self, event):
+            if event.dir:
+                return
+            with _lock:
+                dirpaths = [dirpath for dirpath in _generations if event.pathname.startswith(dirpath + os.sep)]
+            for dirpath in dirpaths:
+                _markChanged(dirpath, [event.pathname])
+
+################################################################################
+
+def start(interval=2.0, mode='auto'):
+    """
+    Start watching for changes in this process, if not already doing so.
+    The `mode` is ``'inotify'`` or ``'poll'`` to choose how changes are
+    detected, or ``'auto'`` to use inotify if available; when polling, the
+    files are checked every `interval` seconds.
+    """
+    global _pid, _mode, _interval, _thread, _watchManager, _notifier
+    with _lock:
+        if _pid == os.getpid():
+            return
+        # Either we've never started, or we are in a child process that was
+        # forked after starting, in which case the thread is gone
+        if mode == 'auto':
+            mode = 'inotify' if pyinotify is not None else 'poll'
+        if mode == 'inotify' and pyinotify is None:
+            raise ValueError('Cannot watch for changes using inotify, as pyinotify is not installed.')
+        elif mode not in ['inotify', 'poll']:
+            raise ValueError('Invalid value "{0}" for mode parameter.'.format(mode))
+        _generations.clear()
+        _changes.clear()
+        _mtimes.clear()
+        _interval = interval
+        _mode = mode
+        if mode == 'inotify':
+            _watchManager = pyinotify.WatchManager()
+            _notifier = pyinotify.ThreadedNotifier(_watchManager, _EventHandler())
+            _notifier.setDaemon(True)
+            _notifier.start()
+        else:
+            _thread = threading.Thread(target=_run)
+            _thread.setDaemon(True)
+            _thread.start()
+        _pid = os.getpid()
+    print >> sys.stderr, 'watcher (pid={0:d}): Watching database for changes using {1}.'.format(os.getpid(), mode)
+
+def isRunning():
+    """
+    Return ``True`` if the watcher is running in this process.
+    """
+    return _pid == os.getpid()
+
+def watch(dirpath):
+    """
+    Start watching the directory tree at `dirpath` for changes. The watcher
+    must already have been started in this process.
+    """
+    if not isRunning():
+        raise RuntimeError('The watcher has not been started in this process.')
+    with _lock:
+        if dirpath in _generations:
+            return
+        _generations[dirpath] = 0
+        _changes[dirpath] = set()
+    if _mode == 'inotify':
+        mask = (pyinotify.IN_MODIFY | pyinotify.IN_CLOSE_WRITE | pyinotify.IN_CREATE |
+                pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM | pyinotify.IN_MOVED_TO)
+        _watchManager.add_watch(dirpath, mask, rec=True, auto_add=True)
+    else:
+        mtimes = _getModificationTimes(dirpath)
+        with _lock:
+            _mtimes[dirpath] = mtimes
+
+def isWatching(dirpath):
+    """
+    Return ``True`` if the directory tree at `dirpath` is being watched for
+    changes in this process.
+    """
+    return isRunning() and dirpath in _generations
+
+def getGeneration(dirpath):
+    """
+    Return the generation counter of the watched directory `dirpath`, which
+    is incremented every time a change within it is detected.
+    """
+    return _generations[dirpath]
+
+def popChanges(dirpath):
+    """
+    Return the set of paths within the watched directory `dirpath` that have
+    changed since the last call, together with the current generation.
+    """
+    with _lock:
+        changes = _changes[dirpath]
+        _changes[dirpath] = set()
+        return _generations[dirpath], changes
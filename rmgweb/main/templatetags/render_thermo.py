@@ -39,9 +39,10 @@ register = template.Library()
 from django.utils.safestring import mark_safe
 from django.core.urlresolvers import reverse
 
+import json
 import numpy
 
-from rmgweb.main.tools import getLaTeXScientificNotation, getStructureMarkup
+from rmgweb.main.tools import getLaTeXScientificNotation, getStructureMarkup, getThermoPlotUnits, getThermoRange, evaluateThermo
 from rmgweb.main.models import UserProfile
 
 from rmgpy.quantity import Quantity
@@ -271,45 +272,18 @@ def get_thermo_data(thermo, user=None):
     if not isinstance(thermo, (ThermoData, Wilhoit, NASA)):
         return ''
     
-    # Define other units and conversion factors to use
-    if user and user.is_authenticated():
-        user_profile = UserProfile.objects.get(user=user)
-        Tunits = str(user_profile.temperatureUnits)
-        Punits = str(user_profile.pressureUnits)
-        Cpunits = str(user_profile.heatCapacityUnits)
-        Hunits = str(user_profile.energyUnits)
-        Sunits = str(user_profile.heatCapacityUnits)
-        Gunits = str(user_profile.energyUnits)
-    else:
-        Tunits = 'K'
-        Punits = 'bar'
-        Cpunits = 'cal/(mol*K)'
-        Hunits = 'kcal/mol'
-        Sunits = 'cal/(mol*K)'
-        Gunits = 'kcal/mol'
-    Tfactor = Quantity(1, Tunits).getConversionFactorFromSI()
-    Pfactor = Quantity(1, Punits).getConversionFactorFromSI()
-    Cpfactor = Quantity(1, Cpunits).getConversionFactorFromSI()
-    Hfactor = Quantity(1, Hunits).getConversionFactorFromSI()
-    Sfactor = Quantity(1, Sunits).getConversionFactorFromSI()
-    Gfactor = Quantity(1, Gunits).getConversionFactorFromSI()
-        
-    if thermo.Tmin is not None and thermo.Tmax is not None:
-        Tmin = thermo.Tmin.value_si
-        Tmax = thermo.Tmax.value_si
-    elif isinstance(thermo, ThermoData) and (thermo.Cp0 is None or thermo.CpInf is None):
-        Tmin = 300
-        Tmax = 1500
-    else:
-        Tmin = 300
-        Tmax = 2000
-    Tdata = []; Cpdata = []; Hdata = []; Sdata = []; Gdata = []
-    for T in numpy.arange(Tmin, Tmax+1, 10):
-        Tdata.append(T * Tfactor)
-        Cpdata.append(thermo.getHeatCapacity(T) * Cpfactor)
-        Hdata.append(thermo.getEnthalpy(T) * Hfactor)
-        Sdata.append(thermo.getEntropy(T) * Sfactor)
-        Gdata.append(thermo.getFreeEnergy(T) * Gfactor)
+    units, factors = getThermoPlotUnits(user)
+    Tunits = units['T']; Cpunits = units['Cp']; Hunits = units['H']; Sunits = units['S']; Gunits = units['G']
+    
+    Tmin, Tmax = getThermoRange(thermo)
+    Tdata = numpy.arange(Tmin, Tmax+1, 10)
+    Cpdata, Hdata, Sdata, Gdata = evaluateThermo(thermo, Tdata)
+    # NaN (outside the range of the model) is also valid JavaScript
+    Tdata = json.dumps((Tdata * factors['T']).tolist())
+    Cpdata = json.dumps((Cpdata * factors['Cp']).tolist())
+    Hdata = json.dumps((Hdata * factors['H']).tolist())
+    Sdata = json.dumps((Sdata * factors['S']).tolist())
+    Gdata = json.dumps((Gdata * factors['G']).tolist())
     
     return mark_safe("""
 Tlist = {0};
@@ -36,6 +36,7 @@ from django.core.urlresolvers import reverse
 
 import rmgpy.constants as constants
 from rmgpy.molecule.molecule import Molecule
+from rmgpy.thermo import ThermoData, Wilhoit, NASA
 
 ################################################################################
 
@@ -126,3 +127,148 @@ def getStructureMarkup(item):
     else:
         structure = ''
     return structure
+
+################################################################################
+
+def getThermoRange(thermo):
+    """
+    Return the range of temperatures in K over which to plot the given
+    thermodynamics model `thermo`: its own range of validity if it has one,
+    or else a range over which it can be sensibly extrapolated.
+    """
+    if thermo.Tmin is not None and thermo.Tmax is not None:
+        return thermo.Tmin.value_si, thermo.Tmax.value_si
+    elif isinstance(thermo, ThermoData) and (thermo.Cp0 is None or thermo.CpInf is None):
+        return 300.0, 1500.0
+    else:
+        return 300.0, 2000.0
+
+def evaluateWilhoit(thermo, Tdata):
+    """
+    Return arrays of the heat capacity, enthalpy and entropy in SI units of
+    the :class:`Wilhoit` model `thermo` at each of the temperatures in K in
+    the array `Tdata`.
+    """
+    Cp0 = thermo.Cp0.value_si; CpInf = thermo.CpInf.value_si; B = thermo.B.value_si
+    a0 = thermo.a0; a1 = thermo.a1; a2 = thermo.a2; a3 = thermo.a3
+    y = Tdata / (Tdata + B)
+    y2 = y * y
+    Cpdata = Cp0 + (CpInf - Cp0) * y2 * (1 + (y - 1) * (a0 + y * (a1 + y * (a2 + y * a3))))
+    Hdata = thermo.H0.value_si + Cp0 * Tdata - (CpInf - Cp0) * Tdata * (
+        y2 * ((3 * a0 + a1 + a2 + a3) / 6. + (4 * a1 + a2 + a3) * y / 12. + (5 * a2 + a3) * y2 / 20. + a3 * y2 * y / 5.)
+        + (2 + a0 + a1 + a2 + a3) * (y / 2. - 1 + (1 / y - 1) * numpy.log(B + Tdata)))
+    Sdata = thermo.S0.value_si + CpInf * numpy.log(Tdata) - (CpInf - Cp0) * (
+        numpy.log(y) + y * (1 + y * (a0 / 2. + y * (a1 / 3. + y * (a2 / 4. + y * a3 / 5.)))))
+    return Cpdata, Hdata, Sdata
+
+def evaluateNASA(thermo, Tdata):
+    """
+    Return arrays of the heat capacity, enthalpy and entropy in SI units of
+    the :class:`NASA` model `thermo` at each of the temperatures in K in the
+    array `Tdata`. Temperatures outside the range of all of the polynomials
+    give ``nan``.
+    """
+    Cpdata = numpy.empty_like(Tdata); Cpdata.fill(numpy.nan)
+    Hdata = Cpdata.copy(); Sdata = Cpdata.copy()
+    remaining = numpy.ones(Tdata.shape, dtype=bool)
+    R = constants.R
+    for polynomial in thermo.polynomials:
+        # Each temperature uses the first polynomial whose range includes it
+        mask = remaining & (Tdata >= polynomial.Tmin.value_si) & (Tdata <= polynomial.Tmax.value_si)
+        remaining &= ~mask
+        T = Tdata[mask]
+        cm2 = polynomial.cm2; cm1 = polynomial.cm1; c0 = polynomial.c0; c1 = polynomial.c1
+        c2 = polynomial.c2; c3 = polynomial.c3; c4 = polynomial.c4; c5 = polynomial.c5; c6 = polynomial.c6
+        logT = numpy.log(T)
+        Cpdata[mask] = R * (cm2 / T**2 + cm1 / T + c0 + T * (c1 + T * (c2 + T * (c3 + T * c4))))
+        Hdata[mask] = R * T * (-cm2 / T**2 + cm1 * logT / T + c0 + T * (c1 / 2. + T * (c2 / 3. + T * (c3 / 4. + T * c4 / 5.))) + c5 / T)
+        Sdata[mask] = R * (-0.5 * cm2 / T**2 - cm1 / T + c0 * logT + T * (c1 + T * (c2 / 2. + T * (c3 / 3. + T * c4 / 4.))) + c6)
+    return Cpdata, Hdata, Sdata
+
+def evaluateThermoData(thermo, Tdata):
+    """
+    Return arrays of the heat capacity, enthalpy and entropy in SI units of
+    the :class:`ThermoData` model `thermo` at each of the temperatures in K in
+    the array `Tdata`. The heat capacity is interpolated linearly between the
+    tabulated values and held constant beyond them, and the enthalpy and
+    entropy integrate it piecewise from 298 K.
+    """
+    Tpoints = thermo.Tdata.value_si; Cppoints = thermo.Cpdata.value_si
+    Cpdata = numpy.interp(Tdata, Tpoints, Cppoints)
+    # The slope and intercept of each linear piece, one column per piece
+    Tmin = Tpoints[:-1]; Tmax = Tpoints[1:]
+    slope = (Cppoints[1:] - Cppoints[:-1]) / (Tmax - Tmin)
+    intercept = (Cppoints[:-1] * Tmax - Cppoints[1:] * Tmin) / (Tmax - Tmin)
+    T = numpy.clip(Tdata[:,numpy.newaxis], Tmin, Tmax)
+    dH = numpy.sum(0.5 * slope * (T * T - Tmin * Tmin) + intercept * (T - Tmin), axis=1)
+    dS = numpy.sum(slope * (T - Tmin) + intercept * numpy.log(T / Tmin), axis=1)
+    above = Tdata > Tpoints[-1]
+    dH[above] += Cppoints[-1] * (Tdata[above] - Tpoints[-1])
+    dS[above] += Cppoints[-1] * numpy.log(Tdata[above] / Tpoints[-1])
+    # Only temperatures above 298 K are integrated
+    dH[Tdata <= 298] = 0; dS[Tdata <= 298] = 0
+    return Cpdata, thermo.H298.value_si + dH, thermo.S298.value_si + dS
+
+def evaluateThermo(thermo, Tdata):
+    """
+    Return arrays of the heat capacity, enthalpy, entropy and Gibbs free
+    energy in SI units of the thermodynamics model `thermo` at each of the
+    temperatures in K in the array `Tdata`. :class:`ThermoData`,
+    :class:`Wilhoit` and :class:`NASA` models are evaluated for all
+    temperatures at once; other models, and any model whose vectorized values
+    disagree with its own methods, are evaluated one temperature at a time.
+    """
+    Tdata = numpy.asarray(Tdata, dtype=float)
+    curves = None
+    try:
+        if isinstance(thermo, ThermoData):
+            curves = evaluateThermoData(thermo, Tdata)
+        elif isinstance(thermo, Wilhoit):
+            curves = evaluateWilhoit(thermo, Tdata)
+        elif isinstance(thermo, NASA):
+            curves = evaluateNASA(thermo, Tdata)
+    except (AttributeError, TypeError, ValueError):
+        curves = None
+    if curves is not None and len(Tdata) > 0:
+        # Check against the model itself at the lowest, middle and highest
+        # valid temperatures, which covers any extrapolation at either end
+        valid = numpy.flatnonzero(~numpy.isnan(curves[0]))
+        for i in sorted(set([valid[0], valid[len(valid) / 2], valid[-1]])) if len(valid) > 0 else []:
+            T = Tdata[i]
+            for values, exact in zip(curves, [thermo.getHeatCapacity(T), thermo.getEnthalpy(T), thermo.getEntropy(T)]):
+                if abs(values[i] - exact) > 1e-6 * max(abs(exact), 1.0):
+                    curves = None
+                    break
+            if curves is None:
+                break
+    if curves is None:
+        Cpdata = numpy.array([thermo.getHeatCapacity(T) for T in Tdata])
+        Hdata = numpy.array([thermo.getEnthalpy(T) for T in Tdata])
+        Sdata = numpy.array([thermo.getEntropy(T) for T in Tdata])
+    else:
+        Cpdata, Hdata, Sdata = curves
+    return Cpdata, Hdata, Sdata, Hdata - Tdata * Sdata
+
+def getThermoPlotUnits(user=None):
+    """
+    Return a dictionary of the units in which to plot temperature (`T`), heat
+    capacity (`Cp`), enthalpy (`H`), entropy (`S`) and Gibbs free energy
+    (`G`), and a dictionary of the factors converting each from SI units to
+    those units. If a `user` is specified, the user's preferred units are
+    used; otherwise default units are used.
+    """
+    from rmgpy.quantity import Quantity
+    from rmgweb.main.models import UserProfile
+    if user and user.is_authenticated():
+        user_profile = UserProfile.objects.get(user=user)
+        units = {
+            'T': str(user_profile.temperatureUnits),
+            'Cp': str(user_profile.heatCapacityUnits),
+            'H': str(user_profile.energyUnits),
+            'S': str(user_profile.heatCapacityUnits),
+            'G': str(user_profile.energyUnits),
+        }
+    else:
+        units = {'T': 'K', 'Cp': 'cal/(mol*K)', 'H': 'kcal/mol', 'S': 'cal/(mol*K)', 'G': 'kcal/mol'}
+    factors = dict([(key, Quantity(1, value).getConversionFactorFromSI()) for key, value in units.iteritems()])
+    return units, factors
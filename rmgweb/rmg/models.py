@@ -37,7 +37,7 @@ from django.utils.text import capfirst
 from rmgpy.molecule.molecule import Molecule
 from rmgpy.rmg.main import RMG
 from rmgweb.main.tools import *
-from rmgweb.database.views import loadDatabase
+from rmgweb.database.views import loadDatabase, generateReverseKinetics
 
 import rmgweb.settings as settings
 
@@ -122,7 +122,11 @@ class Chemkin(models.Model):
             # If the kinetics are ArrheniusEP, replace them with Arrhenius
             if isinstance(reaction.kinetics, ArrheniusEP):
                 reaction.kinetics = reaction.kinetics.toArrhenius(reaction.getEnthalpyOfReaction(298))
-
+        
+        # Fit the reverse kinetics of all of the reactions at once
+        reverseKineticsList = generateReverseKinetics(reactionList)
+        
+        for index, reaction in enumerate(reactionList):
             if os.path.exists(dictionaryPath):
                 reactants = ' + '.join([moleculeToInfo(reactant) for reactant in reaction.reactants])
                 arrow = '&hArr;' if reaction.reversible else '&rarr;'
@@ -136,12 +140,12 @@ class Chemkin(models.Model):
                 
             source = str(reaction).replace('<=>','=')
             entry = Entry()   
-            entry.result = reactionList.index(reaction)+1
+            entry.result = index + 1
             forwardKinetics = reaction.kinetics     
             forward = True
             chemkin = reaction.toChemkin(speciesList)
             
-            reverseKinetics = reaction.generateReverseRateCoefficient()
+            reverseKinetics = reverseKineticsList[index]
             reverseKinetics.comment = 'Fitted reverse reaction. ' + reaction.kinetics.comment
             
             rev_reaction = Reaction(reactants = reaction.products, products = reaction.reactants, kinetics = reverseKinetics)
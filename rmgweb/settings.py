@@ -137,3 +137,86 @@ INSTALLED_APPS = (
 LOGIN_URL = '/login'
 LOGIN_REDIRECT_URL = '/'
 AUTH_PROFILE_MODULE = 'main.UserProfile'
+
+# Settings relating to the copy of the RMG database held in memory
+# The directory in which data derived from the RMG database (e.g. binary
+# snapshots of the loaded database) is cached; set to None to disable
+DATABASE_CACHE_PATH = os.path.join(PROJECT_PATH, '..', 'database', 'cache')
+# How to detect changes to the database files: 'inotify' (requires the
+# pyinotify package), 'poll' (checks the files every DATABASE_POLL_INTERVAL
+# seconds; use this if the database is on NFS), 'auto' (inotify if available,
+# otherwise poll), or None to check the files on every request instead
+DATABASE_WATCH = 'auto'
+DATABASE_POLL_INTERVAL = 2.0
+# Whether to reload modified sections of the database in a background thread,
+# serving the previously loaded version until the reload has finished
+DATABASE_BACKGROUND_RELOAD = True
+# Whether to record the time and memory taken to load each file of the
+# database (viewable by staff at /database/profile); this slows loading down
+DATABASE_PROFILE = False
+# The number of processes used to parse the database files when loading the
+# database from scratch; 1 to load them in this process, or None to use one
+# per CPU core
+DATABASE_LOAD_PROCESSES = 1
+# How often, in seconds, the younger generations of garbage are collected by
+# each process when the database was loaded before forking the processes
+# (see preloadDatabase() in database/tools.py), which disables automatic
+# garbage collection so that the memory holding the database stays shared
+DATABASE_GC_INTERVAL = 1.0
+# How often, in seconds, all of the garbage is collected by those processes,
+# freeing garbage cycles that outlived the younger generations at the cost of
+# un-sharing some of that memory; None to never do so, in which case the
+# processes should be recycled instead (see apache/django.wsgi.example)
+DATABASE_GC_FULL_INTERVAL = 3600.0
+# The number of species whose thermo data is cached in memory by each process
+THERMO_CACHE_SIZE = 10000
+# The number of worker processes each process forks (once) to spread the work
+# of batch requests over; 0 to do the work in the process itself. Use this
+# with PRELOAD_DATABASE in the WSGI script, so that the workers are forked
+# before any threads are started
+DATABASE_WORKER_PROCESSES = 0
+# The number of entries shown on each page of the thermo library tables, and
+# the number of those tables cached in memory by each process
+THERMO_TABLE_PAGE_SIZE = 100
+THERMO_TABLE_CACHE_SIZE = 100
+# The number of groups shown on each page of the table below the tree of a
+# set of kinetics groups
+KINETICS_TABLE_PAGE_SIZE = 100
+# The total number of reactions from recent kinetics searches cached in
+# memory by each process
+REACTION_CACHE_SIZE = 20000
+# The number of recent kinetics searches whose results are kept in memory by
+# each process for the pages a user visits next, and for how many seconds
+REACTION_SEARCH_CACHE_SIZE = 1000
+REACTION_SEARCH_TIMEOUT = 600
+# Whether to compute the untrained reactions of each kinetics family in a
+# background thread after the families are loaded (they are also saved under
+# DATABASE_CACHE_PATH); if not, they are computed when first requested
+DATABASE_PRECOMPUTE_UNTRAINED = True
+# The number of levels of the kinetics group trees sent with each page (the
+# deeper subtrees are loaded when expanded), and the number of those trees
+# kept rendered in memory by each process
+KINETICS_TREE_DEPTH = 3
+KINETICS_TREE_CACHE_SIZE = 100
+# The number of fitted reverse kinetics of reactions cached in memory by each
+# process
+REVERSE_KINETICS_CACHE_SIZE = 10000
+# The RMG-Java PopulateReactions server queried for kinetics estimates, the
+# timeouts in seconds for connecting to it and for each read of its response,
+# the size in bytes of those reads, and the number of queries each process
+# may send it at once
+RMG_JAVA_HOST = 'localhost'
+RMG_JAVA_PORT = 5000
+RMG_JAVA_CONNECT_TIMEOUT = 10
+RMG_JAVA_TIMEOUT = 10
+RMG_JAVA_BUFFER_SIZE = 65536
+RMG_JAVA_MAX_CONNECTIONS = 4
+# A version stamp for the RMG-Java database, which is part of the key of the
+# cached RMG-Java responses; change it (or flush the cache at /database/rmgjava)
+# when RMG-Java or its database is upgraded
+RMG_JAVA_DATABASE_VERSION = ''
+# The number of seconds for which RMG-Java responses are cached, and the
+# number cached in memory by each process and on disk
+RMG_JAVA_CACHE_TIMEOUT = 7 * 24 * 3600
+RMG_JAVA_CACHE_SIZE = 1000
+RMG_JAVA_DISK_CACHE_SIZE = 10000